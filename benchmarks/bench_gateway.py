@@ -0,0 +1,224 @@
+# benchmarks/bench_gateway.py
+#
+# Per-call bus cost and throughput of every wrapper in lib/, plus gateway
+# startup time. Runs against the simulated bus by default:
+#
+#   python benchmarks/bench_gateway.py
+#   python benchmarks/bench_gateway.py --port "sim://?realtime=1" -n 200
+#   python benchmarks/bench_gateway.py --json results.json
+#
+# On a simulated bus with realtime=0 no time is actually slept; latencies
+# are the measured Python overhead plus the modelled bus time of the
+# frames each call sent. On real hardware only wall time is reported.
+# ----------------------------------------------------------------------
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import platform
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import Callable, Dict, List, Optional
+
+from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
+from lib.button import Button
+from lib.buzzer import Buzzer
+from lib.distance import DistanceSensor
+from lib.imu import Imu
+from lib.joystick import Joystick
+from lib.led import Led
+from lib.light import LightSensor
+from lib.motor import Motor
+from lib.pot import Potentiometer
+from lib.qtr import QTRArray
+
+DEFAULT_PORT = "sim://?realtime=0"
+
+
+def _percentile(sorted_vals: List[float], pct: float) -> float:
+    if not sorted_vals:
+        return float('nan')
+    k = (len(sorted_vals) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+class BusMeter:
+    """Reads frame/byte/bus-time counters from a master that keeps them."""
+    def __init__(self, master):
+        self._m = master
+        self.available = all(hasattr(master, a) for a in ('frames', 'bytes_tx', 'bytes_rx', 'bus_time'))
+        self.realtime = getattr(master, 'realtime', True)
+
+    def read(self):
+        if not self.available:
+            return (0, 0, 0, 0.0)
+        return (self._m.frames, self._m.bytes_tx, self._m.bytes_rx, self._m.bus_time)
+
+
+def bench_call(fn: Callable, meter: BusMeter, iterations: int, warmup: int = 3) -> Dict:
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    start = meter.read()
+    for _ in range(iterations):
+        before = meter.read()
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        if not meter.realtime:
+            dt += meter.read()[3] - before[3]
+        latencies.append(dt)
+    end = meter.read()
+    latencies.sort()
+    mean = sum(latencies) / len(latencies)
+    result = {
+        'iterations': iterations,
+        'p50_us': _percentile(latencies, 50) * 1e6,
+        'p99_us': _percentile(latencies, 99) * 1e6,
+        'mean_us': mean * 1e6,
+        'calls_per_s': 1.0 / mean if mean > 0 else float('inf'),
+    }
+    if meter.available:
+        result['frames_per_call'] = (end[0] - start[0]) / iterations
+        result['bytes_per_call'] = ((end[1] - start[1]) + (end[2] - start[2])) / iterations
+        result['bus_us_per_call'] = (end[3] - start[3]) / iterations * 1e6
+    return result
+
+
+def bench_startup(port: str, baudrate: int, modules_override: Optional[List[str]],
+                  module_cache=False) -> Dict:
+    t0 = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        gw = SMDGateway(port, baudrate=baudrate, modules_override=modules_override,
+                        module_cache=module_cache)
+    wall = time.perf_counter() - t0
+    meter = BusMeter(gw._master)
+    result = {'wall_s': wall, 'kind': gw.startup_kind, 'gateway_s': gw.startup_time}
+    if meter.available:
+        frames, tx, rx, bus = meter.read()
+        result.update(frames=frames, bytes=tx + rx, bus_s=bus)
+        if not meter.realtime:
+            result['total_s'] = wall + getattr(gw._master, 'virtual_time', bus)
+    gw.close()
+    return result
+
+
+def build_cases(gw: SMDGateway) -> Dict[str, Callable]:
+    btn   = Button(gw, 5)
+    light = LightSensor(gw, module_id=5)
+    dist  = DistanceSensor(gw, module_id=1)
+    pot   = Potentiometer(gw, module_id=5)
+    joy   = Joystick(gw, module_id=5)
+    imu   = Imu(gw, module_id=5)
+    qtr   = QTRArray(gw, module_id=1)
+    line  = qtr.line()
+    led   = Led(gw, module_id=5)
+    buzz  = Buzzer(gw, module_id=5)
+    with redirect_stdout(StringIO()):
+        motor = Motor(gw, cpr=6533)
+
+    colours = [(255, 0, 0), (0, 255, 0)]
+    state = {'n': 0}
+
+    def led_toggle():
+        state['n'] += 1
+        led.on(colours[state['n'] % 2])
+
+    sensors = (btn, light, dist, pot, joy, imu, qtr)
+    return {
+        'Button.is_pressed':      btn.is_pressed,
+        'LightSensor.read_lux':   light.read_lux,
+        'DistanceSensor.read_cm': dist.read_cm,
+        'Potentiometer.read':     pot.read,
+        'Joystick.read_axes':     joy.read_axes,
+        'Joystick.is_pressed':    joy.is_pressed,
+        'Imu.read':               imu.read,
+        'Imu.read_angles':        imu.read_angles,
+        'QTRArray.read_all':      qtr.read_all,
+        'QTRPipeline.read':       line.read,
+        'SMDGateway.snapshot(all sensors)': lambda: gw.snapshot(*sensors),
+        'Led.on (changing)':      led_toggle,
+        'Led.on (unchanged)':     lambda: led.on(colours[0]),
+        'Buzzer.on':              lambda: buzz.on(600),
+        'Motor.run_pwm (steady)': lambda: motor.run_pwm(40),
+    }
+
+
+def run(port: str, baudrate: int, iterations: int) -> Dict:
+    results = {
+        'meta': {
+            'port': port,
+            'baudrate': baudrate,
+            'iterations': iterations,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.time(),
+        },
+        'startup': {},
+        'calls': {},
+    }
+    # cold = full scan, warm = module list reused from the on-disk cache
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, 'modules.json')
+        results['startup']['cold'] = bench_startup(port, baudrate, None, cache)
+        results['startup']['warm'] = bench_startup(port, baudrate, None, cache)
+    results['startup']['modules_override'] = bench_startup(port, baudrate, DEFAULT_MODULES)
+
+    with redirect_stdout(StringIO()):
+        gw = SMDGateway(port, baudrate=baudrate, modules_override=DEFAULT_MODULES, module_cache=False)
+    meter = BusMeter(gw._master)
+    try:
+        for name, fn in build_cases(gw).items():
+            try:
+                results['calls'][name] = bench_call(fn, meter, iterations)
+            except Exception as e:
+                results['calls'][name] = {'error': f"{type(e).__name__}: {e}"}
+    finally:
+        gw.close()
+    return results
+
+
+def print_report(results: Dict):
+    meta = results['meta']
+    print(f"Bus: {meta['port']} @ {meta['baudrate']} baud, {meta['iterations']} calls each\n")
+    for kind, r in results['startup'].items():
+        total = r.get('total_s', r['wall_s'])
+        print(f"Startup ({kind}): {total * 1e3:9.1f} ms  (gateway reports {r['gateway_s'] * 1e3:.1f} ms)")
+    print()
+    print(f"{'call':34} {'frames':>6} {'bytes':>6} {'p50 us':>9} {'p99 us':>9} {'calls/s':>9}")
+    for name, r in results['calls'].items():
+        if 'error' in r:
+            print(f"{name:34} error: {r['error']}")
+            continue
+        print(f"{name:34} {r.get('frames_per_call', float('nan')):6.2f} "
+              f"{r.get('bytes_per_call', float('nan')):6.1f} {r['p50_us']:9.1f} "
+              f"{r['p99_us']:9.1f} {r['calls_per_s']:9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lib/ wrappers against a (simulated) SMD bus.")
+    parser.add_argument('--port', default=DEFAULT_PORT, help=f"serial port or sim:// URL (default {DEFAULT_PORT})")
+    parser.add_argument('--baudrate', type=int, default=115200)
+    parser.add_argument('-n', '--iterations', type=int, default=500)
+    parser.add_argument('--json', metavar='PATH', help="write machine-readable results to PATH ('-' for stdout)")
+    args = parser.parse_args()
+
+    results = run(args.port, args.baudrate, args.iterations)
+    if args.json == '-':
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,11 @@
 import os, sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import time
 from lib.usb_port_finder import USBPortFinder
 from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
 from lib.light import LightSensor
 from lib.led import Led
+from lib.rules import RuleEngine, value, set_rgb
 
 THRESHOLD_LUX = 100  # below this, turn on light
 
@@ -20,14 +20,15 @@ def main():
     sensor = LightSensor(gw, module_id=1)
     led    = Led(gw, module_id=5)
 
+    lux   = value(sensor.read_lux)
+    rules = RuleEngine(gw)
+    # 20 lux of hysteresis so the light does not flicker around the threshold
+    rules.when((lux < THRESHOLD_LUX).hysteresis(20)) \
+         .then(set_rgb(led, (255,255,255))) \
+         .otherwise(set_rgb(led, (0,0,0)))  # bright white / off
+
     try:
-        while True:
-            lux = sensor.read_lux()
-            if lux < THRESHOLD_LUX:
-                led.on((255,255,255))  # bright white
-            else:
-                led.off()
-            time.sleep(0.5)
+        rules.run(rate_hz=2)
     except KeyboardInterrupt:
         pass
     finally:
@@ -3,60 +3,47 @@
 import sys, os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import time
-
 from lib.usb_port_finder import USBPortFinder
 from lib.smd_gateway     import SMDGateway
 from lib.buzzer          import Buzzer
+from lib.led             import Led
+from lib.melody          import MelodyPlayer, load, parse_rtttl
+
+# full "Twinkle Twinkle Little Star" melody (quarter note = 0.3 s)
+TWINKLE = (
+    "twinkle:d=4,o=4,b=200:"
+    "c,c,g,g,a,a,2g,f,f,e,e,d,d,2c,"
+    "g,g,f,f,e,e,2d,g,g,f,f,e,e,2d,"
+    "c,c,g,g,a,a,2g,f,f,e,e,d,d,2c"
+)
 
-# note → frequency (Hz)
-NOTES = {
-    'C4': 261, 'D4': 294, 'E4': 329, 'F4': 349,
-    'G4': 392, 'A4': 440, 'B4': 493, 'C5': 523
-}
-
-# full "Twinkle Twinkle Little Star" melody
-# (note, duration in seconds)
-MELODY = [
-    ('C4', 0.3), ('C4', 0.3), ('G4', 0.3), ('G4', 0.3),
-    ('A4', 0.3), ('A4', 0.3), ('G4', 0.6),
-    ('F4', 0.3), ('F4', 0.3), ('E4', 0.3), ('E4', 0.3),
-    ('D4', 0.3), ('D4', 0.3), ('C4', 0.6),
-    ('G4', 0.3), ('G4', 0.3), ('F4', 0.3), ('F4', 0.3),
-    ('E4', 0.3), ('E4', 0.3), ('D4', 0.6),
-    ('G4', 0.3), ('G4', 0.3), ('F4', 0.3), ('F4', 0.3),
-    ('E4', 0.3), ('E4', 0.3), ('D4', 0.6),
-    ('C4', 0.3), ('C4', 0.3), ('G4', 0.3), ('G4', 0.3),
-    ('A4', 0.3), ('A4', 0.3), ('G4', 0.6),
-    ('F4', 0.3), ('F4', 0.3), ('E4', 0.3), ('E4', 0.3),
-    ('D4', 0.3), ('D4', 0.3), ('C4', 0.6),
-]
-
-PAUSE_BETWEEN_NOTES = 0.1  # short gap between tones
-
-def play_melody(buzzer: Buzzer):
-    for note, dur in MELODY:
-        freq = NOTES[note]
-        buzzer.beep(freq=freq, duration=dur)
-        time.sleep(PAUSE_BETWEEN_NOTES)
+GAP_BETWEEN_NOTES = 0.05  # short silence at the end of each tone
 
 def main():
+    # optional: an RTTTL or MIDI file, a tempo (bpm) and a transposition (semitones)
+    song      = load(sys.argv[1]) if len(sys.argv) > 1 else parse_rtttl(TWINKLE)
+    tempo     = float(sys.argv[2]) if len(sys.argv) > 2 else None
+    transpose = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
     port = USBPortFinder.first_gateway()
     if not port:
         print("❌ No USB gateway detected.")
         sys.exit(1)
 
     gw     = SMDGateway(port)
-    buzzer = Buzzer(gw, module_id=5)
+    player = MelodyPlayer(Buzzer(gw, module_id=5), Led(gw, module_id=5))
 
-    print("Playing melody...")
+    print(f"Playing {song.name or 'melody'} ({song.duration(tempo):.1f} s)...")
+    handle = player.play(song, tempo=tempo, transpose=transpose, gap=GAP_BETWEEN_NOTES)
     try:
-        play_melody(buzzer)
+        handle.wait()
         print("Done.")
     except KeyboardInterrupt:
+        handle.cancel()
+        handle.wait(1.0)
         print("\nInterrupted.")
     finally:
         gw.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -2,7 +2,7 @@
 #
 # Tkinter GUI for Morse-code transmitter + live code display
 # ----------------------------------------------------------
-import os, sys, threading, time, tkinter as tk
+import os, sys, threading, tkinter as tk
 from tkinter import ttk, messagebox
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -11,58 +11,16 @@ from lib.usb_port_finder import USBPortFinder
 from lib.smd_gateway     import SMDGateway, DEFAULT_MODULES
 from lib.led             import Led
 from lib.buzzer          import Buzzer
+from lib.morse           import MorsePlayer, to_morse_string
 
 # ─── Morse-code timing ─────────────────────────────────────────────────────────
-DOT_DURATION   = 0.1
-DASH_DURATION  = DOT_DURATION * 3
-SYMBOL_PAUSE   = DOT_DURATION
-LETTER_PAUSE   = DOT_DURATION * 3
-WORD_PAUSE     = DOT_DURATION * 7
-
-MORSE_CODE = {
-    'A': '.-',    'B': '-...',  'C': '-.-.', 'D': '-..',  'E': '.',
-    'F': '..-.',  'G': '--.',   'H': '....', 'I': '..',   'J': '.---',
-    'K': '-.-',   'L': '.-..',  'M': '--',   'N': '-.',   'O': '---',
-    'P': '.--.',  'Q': '--.-',  'R': '.-.',  'S': '...',  'T': '-',
-    'U': '..-',   'V': '...-',  'W': '.--',  'X': '-..-', 'Y': '-.--',
-    'Z': '--..',
-    '0': '-----', '1': '.----', '2': '..---','3': '...--','4': '....-',
-    '5': '.....', '6': '-....', '7': '--...','8': '---..','9': '----.'
-}
+WPM  = 12          # dot = 1.2 / WPM = 0.1 s
+FREQ = 600
 
 # ─── Hardware helpers ──────────────────────────────────────────────────────────
-def transmit_symbol(symbol: str, led: Led, buzzer: Buzzer):
-    dur = DOT_DURATION if symbol == '.' else DASH_DURATION
-    led.on((255, 255, 255))
-    buzzer.beep(freq=600, duration=dur)
-    time.sleep(dur)
-    led.off()
-    time.sleep(SYMBOL_PAUSE)
-
-def transmit_message(msg: str, led: Led, buzzer: Buzzer, on_progress=None):
-    cleaned = msg.strip().upper()
-    total   = sum(len(MORSE_CODE.get(c, '')) for c in cleaned if c != ' ')
-    sent    = 0
-    for word in cleaned.split():
-        for ch in word:
-            code = MORSE_CODE.get(ch, '')
-            for sym in code:
-                transmit_symbol(sym, led, buzzer)
-                sent += 1
-                if on_progress and total:
-                    on_progress(int(sent / total * 100))
-            time.sleep(LETTER_PAUSE - SYMBOL_PAUSE)
-        time.sleep(WORD_PAUSE - LETTER_PAUSE)
-    if on_progress:
-        on_progress(100)
-
-def to_morse_string(msg: str) -> str:
-    """Return a dot/dash string for display, using spaces between letters and / between words."""
-    words = []
-    for word in msg.strip().upper().split():
-        letters = [MORSE_CODE.get(ch, '') for ch in word]
-        words.append(' '.join(filter(None, letters)))
-    return ' / '.join(words)
+def transmit_message(msg: str, led: Led, buzzer: Buzzer, on_progress=None, stop_event=None):
+    """Play the compiled timeline of `msg`; progress is reported in whole percent."""
+    return MorsePlayer(led, buzzer, wpm=WPM, freq=FREQ).play(msg, on_progress, stop_event)
 
 # ─── Tkinter GUI ───────────────────────────────────────────────────────────────
 class MorseGUI(tk.Tk):
@@ -9,6 +9,7 @@ from lib.smd_gateway import SMDGateway
 from lib.distance import DistanceSensor
 from lib.led import Led
 from lib.buzzer import Buzzer
+from lib.filters import Hampel
 
 def main():
     port = USBPortFinder.first_gateway()
@@ -16,15 +17,21 @@ def main():
         print("No USB gateway.")
         sys.exit(1)
     gw = SMDGateway(port)
-    dist = DistanceSensor(gw, module_id=1)
+    # Hampel rejects single-sample ultrasonic spikes before they reach the threshold
+    dist = DistanceSensor(gw, module_id=1).filtered(Hampel(5))
     led  = Led(gw, module_id=5)
     buz  = Buzzer(gw, module_id=5)
 
+    alarm = []
     try:
         while True:
-            if dist.read_cm() < 10:
-                led.blink(on_rgb=(255,0,0), off_rgb=(0,0,0), period=0.2, cycles=5)
-                buz.beep(freq=1000, duration=0.1, pause=0.1, cycles=10)
+            # effects run on the gateway's scheduler, so the sensor keeps
+            # being read while the LED blinks and the buzzer beeps
+            if dist.read() < 10 and all(h.done for h in alarm):
+                alarm = [
+                    led.blink_async(on_rgb=(255,0,0), off_rgb=(0,0,0), period=0.2, cycles=5),
+                    buz.beep_async(freq=1000, duration=0.1, pause=0.1, cycles=10),
+                ]
             time.sleep(0.1)
     except KeyboardInterrupt:
         pass
@@ -3,40 +3,45 @@
 import os, sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import time
 from lib.usb_port_finder import USBPortFinder
 from lib.smd_gateway import SMDGateway
 from lib.distance import DistanceSensor
 from lib.led import Led
 from lib.buzzer import Buzzer
+from lib.filters import Hampel
+from lib.rules import RuleEngine, value, set_rgb, effect
 
 ALERT_DIST = 30  # cm
 BEEP_FREQ  = 1200  # Hz
 BEEP_DUR   = 0.2   # seconds
 
+def run(gw):
+    """Alarm rules; gw may also be a ReplayGateway replaying a recording."""
+    dist = DistanceSensor(gw, module_id=1)
+    led  = Led(gw, module_id=5)
+    buzz = Buzzer(gw, module_id=5)
+
+    # ultrasonic spikes would trip the alarm; a Hampel filter drops them
+    d = value(dist.filtered(Hampel(5)).read)
+    rules = RuleEngine(gw)
+    # warning LED on and beeping while something is close; the 5 cm
+    # hysteresis keeps it from flickering at the edge
+    rules.when((d > 0) & (d < ALERT_DIST).hysteresis(5)) \
+         .then(set_rgb(led, (255, 0, 0)),
+               effect(lambda: buzz.beep_async(freq=BEEP_FREQ, duration=BEEP_DUR,
+                                              pause=BEEP_DUR, cycles=None))) \
+         .otherwise(set_rgb(led, (0, 0, 0)))
+    rules.run(rate_hz=5)
+
 def main():
     port = USBPortFinder.first_gateway()
     if not port:
         print("No USB gateway.")
         sys.exit(1)
 
-    gw   = SMDGateway(port)
-    dist = DistanceSensor(gw, module_id=1)
-    led  = Led(gw, module_id=5)
-    buzz = Buzzer(gw, module_id=5)
-
+    gw = SMDGateway(port)
     try:
-        while True:
-            d = dist.read_cm()
-            if d > 0 and d < ALERT_DIST:
-                # turn the warning LED on
-                led.on((255, 0, 0))
-                # sound a single beep
-                buzz.beep(freq=BEEP_FREQ, duration=BEEP_DUR)
-            else:
-                # clear outputs
-                led.off()
-            time.sleep(0.2)
+        run(gw)
     except KeyboardInterrupt:
         pass
     finally:
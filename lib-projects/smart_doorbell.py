@@ -20,19 +20,25 @@ def main():
     buzz = Buzzer(gw, module_id=5)
     led  = Led(gw, module_id=5)
 
+    def ring(ev):
+        # runs on the gateway's callback pool: presses keep being sampled
+        print(f"Ding-dong (pressed at {ev.timestamp:.2f})")
+        # chime
+        buzz.beep(freq=1000, duration=0.1, pause=0.1, cycles=3)
+        # flash LED
+        for _ in range(5):
+            led.on((0,0,255))
+            time.sleep(0.1)
+            led.off()
+            time.sleep(0.1)
+
+    btn.on_press(ring)
+    btn.on_long_press(lambda ev: print(f"Held for {ev.duration:.1f} s"), hold=2.0)
+    gw.start_polling({btn: 50})
+
     try:
         while True:
-            if btn.is_pressed():
-                # chime
-                for _ in range(3):
-                    buzz.beep(freq=1000, duration=0.1, pause=0.1)
-                # flash LED
-                for _ in range(5):
-                    led.on((0,0,255))
-                    time.sleep(0.1)
-                    led.off()
-                    time.sleep(0.1)
-            time.sleep(0.1)
+            time.sleep(1)
     except KeyboardInterrupt:
         pass
     finally:
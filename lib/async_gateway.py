@@ -0,0 +1,303 @@
+### lib/async_gateway.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+from smd.red import Index, OperationMode
+from lib.smd_gateway import SMDGateway, Snapshot
+
+
+class _Read:
+    __slots__ = ("indexes", "future")
+
+    def __init__(self, indexes: List[Index], future: asyncio.Future):
+        self.indexes = indexes
+        self.future = future
+
+
+class _Call:
+    __slots__ = ("fn", "args", "future")
+
+    def __init__(self, fn: Callable, args: tuple, future: asyncio.Future):
+        self.fn = fn
+        self.args = args
+        self.future = future
+
+
+class AsyncSMDGateway:
+    """
+    asyncio front-end for SMDGateway.
+
+    A single owner task is the only thing that touches the serial port;
+    it runs the blocking SDK calls on one dedicated I/O thread so the
+    event loop never waits on pyserial. Reads submitted by any number
+    of coroutines in the same loop tick are merged into one
+    get_variables transaction, and an index requested several times is
+    only read once.
+
+    Usage:
+        async with await AsyncSMDGateway.open(port) as agw:
+            cm = await agw.read_distance(1)
+            await agw.blink(5, cycles=3)
+    """
+    def __init__(self, gateway: SMDGateway, executor: Optional[ThreadPoolExecutor] = None):
+        self._gw = gateway
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="smd-io")
+        self._queue: Optional[asyncio.Queue] = None
+        self._owner: Optional[asyncio.Task] = None
+        self.transactions = 0
+        self.coalesced = 0
+
+    @classmethod
+    async def open(cls, port: str, **kwargs) -> "AsyncSMDGateway":
+        """Construct the SMDGateway off the event loop and start the owner task."""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smd-io")
+        loop = asyncio.get_running_loop()
+        gateway = await loop.run_in_executor(executor, lambda: SMDGateway(port, **kwargs))
+        agw = cls(gateway, executor)
+        agw.start()
+        return agw
+
+    @property
+    def gateway(self) -> SMDGateway:
+        return self._gw
+
+    @property
+    def device_id(self) -> int:
+        return self._gw.device_id
+
+    def start(self):
+        if self._owner is None or self._owner.done():
+            self._queue = asyncio.Queue()
+            self._owner = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        """
+        Stop the owner task and close the gateway. Requests still queued
+        or in progress fail with RuntimeError instead of waiting forever.
+        """
+        if self._owner is not None:
+            self._owner.cancel()
+            try:
+                await self._owner
+            except asyncio.CancelledError:
+                pass
+            self._owner = None
+        if self._queue is not None:
+            pending = []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            self._fail(pending, RuntimeError("AsyncSMDGateway is closed"))
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._gw.close)
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # Owner task
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                await self._serve(loop, batch)
+            except asyncio.CancelledError:
+                self._fail(batch, RuntimeError("AsyncSMDGateway is closed"))
+                raise
+
+    async def _serve(self, loop, batch: list):
+        # let every coroutine that is ready this tick queue its request
+        await asyncio.sleep(0)
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        reads = [r for r in batch if isinstance(r, _Read)]
+        if reads:
+            requested = [idx for r in reads for idx in r.indexes]
+            indexes = list(dict.fromkeys(requested))
+            self.coalesced += len(requested) - len(indexes)
+            try:
+                snap = await loop.run_in_executor(self._executor, self._gw.read_many, indexes)
+                self.transactions += 1
+            except Exception as e:
+                self._fail(reads, e)
+            else:
+                for r in reads:
+                    if not r.future.done():
+                        r.future.set_result(snap)
+
+        for c in batch:
+            if not isinstance(c, _Call) or c.future.done():
+                continue
+            try:
+                result = await loop.run_in_executor(self._executor, c.fn, *c.args)
+                self.transactions += 1
+            except Exception as e:
+                self._fail([c], e)
+            else:
+                # the caller may have been cancelled while the call ran
+                if not c.future.done():
+                    c.future.set_result(result)
+
+    @staticmethod
+    def _fail(requests, error: BaseException):
+        for r in requests:
+            if not r.future.done():
+                r.future.set_exception(error)
+
+    def _submit(self, request):
+        if self._owner is None or self._owner.done():
+            raise RuntimeError("AsyncSMDGateway is not running; call start() or use open()")
+        self._queue.put_nowait(request)
+        return request.future
+
+    async def read_many(self, indexes: Iterable[Index]) -> Snapshot:
+        fut = asyncio.get_running_loop().create_future()
+        return await self._submit(_Read(list(indexes), fut))
+
+    async def read(self, index: Index):
+        return (await self.read_many([index]))[index]
+
+    async def snapshot(self, *sensors, indexes: Iterable[Index] = ()) -> Snapshot:
+        wanted = [idx for sensor in sensors for idx in sensor.indexes()]
+        wanted.extend(indexes)
+        return await self.read_many(wanted)
+
+    async def call(self, fn: Callable, *args) -> Any:
+        """Run any blocking gateway call on the I/O thread, in queue order."""
+        fut = asyncio.get_running_loop().create_future()
+        return await self._submit(_Call(fn, args, fut))
+
+    # Reads
+    async def read_button(self, module_id: int) -> bool:
+        return bool(await self.read(self._gw.index_for('button', module_id)))
+
+    async def read_light(self, module_id: int) -> float:
+        return await self.read(self._gw.index_for('light', module_id))
+
+    async def read_distance(self, module_id: int) -> float:
+        return await self.read(self._gw.index_for('distance', module_id))
+
+    async def read_capability(self, key: str, module_id: int):
+        """Decoded value of a capability ('pot', 'joy', 'qtr', ...)."""
+        raw = await self.read(self._gw.index_for(key, module_id))
+        decode = self._gw.DECODERS.get(key)
+        return decode(raw) if decode is not None else raw
+
+    async def read_pot(self, module_id: int) -> int:
+        return await self.read_capability('pot', module_id)
+
+    async def read_joystick(self, module_id: int) -> Tuple[int, int]:
+        return await self.read_capability('joy', module_id)
+
+    async def read_accel(self, module_id: int) -> tuple:
+        return await self.read_capability('accel', module_id)
+
+    async def read_gyro(self, module_id: int) -> tuple:
+        return await self.read_capability('gyro', module_id)
+
+    async def read_qtr(self, module_id: int) -> list:
+        return await self.read_capability('qtr', module_id)
+
+    # Writes
+    async def set_rgb(self, module_id: int, rgb: Tuple[int, int, int]):
+        await self.call(self._gw.set_rgb, module_id, rgb)
+
+    async def set_buzzer(self, module_id: int, freq_hz: int):
+        await self.call(self._gw.set_buzzer, module_id, freq_hz)
+
+    async def set_operation_mode(self, mode: OperationMode):
+        await self.call(self._gw.set_operation_mode, mode)
+
+    async def enable_torque(self, enabled: bool = True):
+        await self.call(self._gw.enable_torque, enabled)
+
+    async def set_duty_cycle(self, duty: int):
+        await self.call(self._gw.set_duty_cycle, duty)
+
+    async def set_shaft_rpm(self, rpm: float):
+        await self.call(self._gw.set_shaft_rpm, rpm)
+
+    # Effects (asyncio.sleep on absolute deadlines, cancellable)
+    async def _sleep_until(self, deadline: float):
+        await asyncio.sleep(max(0.0, deadline - asyncio.get_running_loop().time()))
+
+    async def blink(
+        self,
+        module_id: int,
+        on_rgb: Tuple[int, int, int] = (255, 0, 0),
+        off_rgb: Tuple[int, int, int] = (0, 0, 0),
+        period: float = 0.5,
+        cycles: Optional[int] = None
+    ):
+        """Async Led.blink; cycles=None blinks until the task is cancelled."""
+        t = asyncio.get_running_loop().time()
+        try:
+            n = 0
+            while cycles is None or n < cycles:
+                await self.set_rgb(module_id, on_rgb)
+                t += period
+                await self._sleep_until(t)
+                await self.set_rgb(module_id, off_rgb)
+                t += period
+                await self._sleep_until(t)
+                n += 1
+        finally:
+            await self.set_rgb(module_id, (0, 0, 0))
+
+    async def beep(
+        self,
+        module_id: int,
+        freq: int = 600,
+        duration: float = 0.2,
+        pause: float = 0.2,
+        cycles: int = 1
+    ):
+        """Async Buzzer.beep."""
+        t = asyncio.get_running_loop().time()
+        try:
+            for _ in range(cycles):
+                await self.set_buzzer(module_id, freq)
+                t += duration
+                await self._sleep_until(t)
+                await self.set_buzzer(module_id, 0)
+                t += pause
+                await self._sleep_until(t)
+        finally:
+            await self.set_buzzer(module_id, 0)
+
+    async def play(
+        self,
+        module_id: int,
+        melody: Iterable[Tuple[int, float]],
+        inter_note: float = 0.05
+    ):
+        """Async Buzzer.play for a sequence of (freq, duration) notes."""
+        t = asyncio.get_running_loop().time()
+        try:
+            for freq, dur in melody:
+                await self.set_buzzer(module_id, freq)
+                t += dur
+                await self._sleep_until(t)
+                await self.set_buzzer(module_id, 0)
+                t += inter_note
+                await self._sleep_until(t)
+        finally:
+            await self.set_buzzer(module_id, 0)
+
+    async def run_pwm(self, duty: int, duration_s: Optional[float] = None):
+        """Async Motor.run_pwm; stops the motor after `duration_s` if given."""
+        await self.set_operation_mode(OperationMode.PWM)
+        await self.enable_torque(True)
+        await self.set_duty_cycle(duty)
+        if duration_s is not None:
+            try:
+                await asyncio.sleep(duration_s)
+            finally:
+                await self.set_duty_cycle(0)
+                await self.enable_torque(False)
@@ -1,17 +1,151 @@
 ### lib/button.py
 
+import threading
+from collections import deque
+from typing import Callable, List, NamedTuple, Optional
+
+PRESS, RELEASE, LONG_PRESS = 'press', 'release', 'long_press'
+
+
+class ButtonEvent(NamedTuple):
+    """
+    kind: 'press', 'release' or 'long_press'.
+    timestamp: monotonic time the button went down (press, long_press)
+               or up (release), from the first sample in the new state.
+    duration: seconds held (release, long_press); 0 for press.
+    """
+    kind: str
+    timestamp: float
+    duration: float
+
+
+class Debouncer:
+    """
+    Turns raw button samples into debounced press/release/long-press
+    events. A new state counts once every sample for `debounce` seconds
+    agrees with it; the event is stamped with when that started.
+    """
+    def __init__(self, debounce: float = 0.02, long_press: float = 1.0):
+        self.debounce = debounce
+        self.long_press = long_press
+        self.pressed = False
+        self._candidate: Optional[bool] = None
+        self._since = 0.0
+        self._down_at = 0.0
+        self._long_sent = False
+
+    def sample(self, raw: bool, t: float) -> List[ButtonEvent]:
+        events = []
+        if raw == self.pressed:
+            self._candidate = None
+        elif self._candidate != raw:
+            self._candidate, self._since = raw, t
+        if self._candidate is not None and t - self._since >= self.debounce:
+            self.pressed, self._candidate = self._candidate, None
+            if self.pressed:
+                self._down_at, self._long_sent = self._since, False
+                events.append(ButtonEvent(PRESS, self._since, 0.0))
+            else:
+                events.append(ButtonEvent(RELEASE, self._since, self._since - self._down_at))
+        if self.pressed and not self._long_sent and t - self._down_at >= self.long_press:
+            self._long_sent = True
+            events.append(ButtonEvent(LONG_PRESS, self._down_at, t - self._down_at))
+        return events
+
+
 class Button:
     """
     Wrapper for a digital push-button module.
 
+    Callbacks are driven by the gateway's polling thread: every polled
+    sample goes through a Debouncer, and handlers run on the gateway's
+    callback pool, in event order per button, so a slow handler never
+    delays sampling.
+
     Usage:
         btn = Button(gateway, module_id)
         state = btn.is_pressed()
+
+        snap  = gateway.snapshot(btn, ...)   # one transaction
+        state = btn.is_pressed(snap)
+
+        btn.on_press(lambda ev: print("down at", ev.timestamp))
+        btn.on_long_press(lambda ev: print("held", ev.duration), hold=2.0)
+        gateway.start_polling({btn: 100})     # events need the button polled
     """
-    def __init__(self, gateway, module_id: int):
+    def __init__(self, gateway, module_id: int, debounce: float = 0.02):
         self._gw = gateway
         self._id = module_id
+        self._debouncer = Debouncer(debounce)
+        self._handlers = {PRESS: [], RELEASE: [], LONG_PRESS: []}
+        self._listening = False
+        self._queue = deque()
+        self._queue_lock = threading.Lock()
+        self._draining = False
+        self.callback_errors = 0
 
-    def is_pressed(self) -> bool:
+    def indexes(self) -> list:
+        return [self._gw.index_for('button', self._id)]
+
+    def is_pressed(self, snapshot=None) -> bool:
         # returns True if pressed (digital read)
-        return bool(self._gw._master.get_button(self._gw.device_id, self._id))
\ No newline at end of file
+        if snapshot is not None:
+            return bool(snapshot[self._gw.index_for('button', self._id)])
+        return bool(self._gw.get_button(self._id))
+
+    def sample(self):
+        """Button state with its read timestamp and age (cached if polled)."""
+        return self._gw.sample(self._gw.index_for('button', self._id))
+
+    # Event callbacks
+    def on_press(self, fn: Callable[[ButtonEvent], None]):
+        self._subscribe(PRESS, fn)
+
+    def on_release(self, fn: Callable[[ButtonEvent], None]):
+        self._subscribe(RELEASE, fn)
+
+    def on_long_press(self, fn: Callable[[ButtonEvent], None], hold: float = 1.0):
+        """Call fn once per press held for `hold` seconds (one hold time per button)."""
+        self._debouncer.long_press = hold
+        self._subscribe(LONG_PRESS, fn)
+
+    def clear_callbacks(self):
+        for handlers in self._handlers.values():
+            handlers.clear()
+        if self._listening:
+            self._gw.remove_listener(self._on_snapshot)
+            self._listening = False
+
+    def _subscribe(self, kind: str, fn: Callable[[ButtonEvent], None]):
+        self._handlers[kind].append(fn)
+        if not self._listening:
+            self._gw.add_listener(self._on_snapshot)
+            self._listening = True
+
+    def _on_snapshot(self, snapshot):
+        idx = self._gw.index_for('button', self._id)
+        if idx not in snapshot:
+            return
+        events = self._debouncer.sample(bool(snapshot[idx]), snapshot.timestamp)
+        calls = [(fn, ev) for ev in events for fn in self._handlers[ev.kind]]
+        if not calls:
+            return
+        with self._queue_lock:
+            self._queue.extend(calls)
+            if self._draining:
+                return
+            self._draining = True
+        self._gw.callback_pool.submit(self._drain)
+
+    def _drain(self):
+        # one drain task per button at a time keeps its handlers in order
+        while True:
+            with self._queue_lock:
+                if not self._queue:
+                    self._draining = False
+                    return
+                fn, ev = self._queue.popleft()
+            try:
+                fn(ev)
+            except Exception:
+                self.callback_errors += 1
@@ -11,16 +11,16 @@ class Buzzer:
         self._gw = gateway
         self._id = module_id
 
-    def _tone(self, freq: int):
-        self._gw.set_buzzer(self._id, freq)
+    def _tone(self, freq: int, force: bool = False):
+        self._gw.set_buzzer(self._id, freq, force=force)
 
-    def on(self, freq: int = 600):
-        """Start continuous tone."""
-        self._tone(freq)
+    def on(self, freq: int = 600, force: bool = False):
+        """Start continuous tone (skipped if already sounding `freq`)."""
+        self._tone(freq, force)
 
-    def off(self):
-        """Stop tone."""
-        self._tone(0)
+    def off(self, force: bool = False):
+        """Stop tone (skipped if already silent)."""
+        self._tone(0, force)
 
     def beep(
         self,
@@ -41,19 +41,69 @@ class Buzzer:
         finally:
             self.off()
 
+    def beep_async(
+        self,
+        freq: int = 600,
+        duration: float = 0.2,
+        pause: float = 0.2,
+        cycles: Optional[int] = 1
+    ):
+        """
+        Non-blocking beep on the gateway's effect scheduler; cycles=None
+        beeps until the returned handle is cancelled.
+        """
+        tone = self._gw.encode_buzzer(self._id, freq)
+        silence = self._gw.encode_buzzer(self._id, 0)
+
+        def steps():
+            n, t = 0, 0.0
+            while cycles is None or n < cycles:
+                yield t, [tone]
+                yield t + duration, [silence]
+                t += duration + pause
+                n += 1
+            yield t, []
+
+        return self._gw.scheduler.schedule(steps(), final=[silence])
+
+    def play_async(
+        self,
+        melody: Iterable[Tuple[int, float]],
+        inter_note: float = 0.05
+    ):
+        """
+        Non-blocking play on the gateway's effect scheduler; with
+        inter_note=0 notes run into each other (legato).
+        """
+        notes = [(self._gw.encode_buzzer(self._id, freq), dur) for freq, dur in melody]
+        silence = self._gw.encode_buzzer(self._id, 0)
+
+        def steps():
+            t = 0.0
+            for tone, dur in notes:
+                yield t, [tone]
+                if inter_note > 0:
+                    yield t + dur, [silence]
+                t += dur + inter_note
+            yield t, []
+
+        return self._gw.scheduler.schedule(steps(), final=[silence])
+
     def play(
         self,
         melody: Iterable[Tuple[int, float]],
         inter_note: float = 0.05
     ):
         """
-        Play a sequence of (freq, duration) notes.
+        Play a sequence of (freq, duration) notes; with inter_note=0
+        notes run into each other (legato).
         """
         try:
             for freq, dur in melody:
                 self._tone(freq)
                 time.sleep(dur)
-                self._tone(0)
-                time.sleep(inter_note)
+                if inter_note > 0:
+                    self._tone(0)
+                    time.sleep(inter_note)
         finally:
             self.off()
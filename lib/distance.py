@@ -1,5 +1,7 @@
 ### lib/distance.py
 
+from lib.filters import FilteredSensor
+
 class DistanceSensor:
     """
     Ultrasonic distance sensor module.
@@ -7,10 +9,27 @@ class DistanceSensor:
     Usage:
         dist = DistanceSensor(gateway, module_id)
         cm   = dist.read_cm()
+
+        gateway.start_polling({dist: 20})   # background refresh at 20 Hz
+        cm   = dist.read_cm()               # served from the cache
+        age  = dist.sample().age
     """
     def __init__(self, gateway, module_id: int):
         self._gw = gateway
         self._id = module_id
 
-    def read_cm(self) -> float:
+    def indexes(self) -> list:
+        return [self._gw.index_for('distance', self._id)]
+
+    def read_cm(self, snapshot=None) -> float:
+        if snapshot is not None:
+            return snapshot[self._gw.index_for('distance', self._id)]
         return self._gw.get_distance(self._id)
+
+    def sample(self):
+        """Distance with its read timestamp and age (cached if polled)."""
+        return self._gw.sample(self._gw.index_for('distance', self._id))
+
+    def filtered(self, *filters):
+        """read_cm() through streaming filters, e.g. filtered(Hampel(7), EMA(0.3))."""
+        return FilteredSensor(self.read_cm, *filters)
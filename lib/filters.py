@@ -0,0 +1,303 @@
+### lib/filters.py
+
+import heapq
+from typing import Any, Callable, List, Optional
+
+# MAD → standard deviation for normally distributed noise
+_MAD_SCALE = 1.4826
+
+
+class StreamFilter:
+    """
+    A filter fed one sample at a time: update(x) returns the filtered
+    value in constant (or logarithmic) time using preallocated state.
+    process(array) runs a whole recorded array (requires NumPy) and
+    gives the same result as calling update() on every element of a
+    fresh filter. Filters compose with |: Hampel(7) | EMA(0.3).
+    """
+    def update(self, x: float) -> float:
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+    def process(self, values):
+        import numpy as np
+        self.reset()
+        out = np.array([self.update(x) for x in np.asarray(values, dtype=np.float64).tolist()])
+        return out
+
+    def __or__(self, other: "StreamFilter") -> "Chain":
+        return Chain(self, other)
+
+
+class Chain(StreamFilter):
+    """Filters applied in order."""
+    def __init__(self, *filters: StreamFilter):
+        self.filters: List[StreamFilter] = []
+        for f in filters:
+            self.filters.extend(f.filters if isinstance(f, Chain) else [f])
+
+    def update(self, x):
+        for f in self.filters:
+            x = f.update(x)
+        return x
+
+    def reset(self):
+        for f in self.filters:
+            f.reset()
+
+    def process(self, values):
+        for f in self.filters:
+            values = f.process(values)
+        return values
+
+
+class EMA(StreamFilter):
+    """Exponential moving average: y += alpha * (x - y); the first sample passes through."""
+    def __init__(self, alpha: float):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        self._y: Optional[float] = None
+
+    def update(self, x):
+        self._y = x if self._y is None else self._y + self.alpha * (x - self._y)
+        return self._y
+
+
+class MovingAverage(StreamFilter):
+    """Mean of the last `window` samples (fewer while filling), from a running sum."""
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError(f"window must be at least 1, got {window}")
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._buf = [0.0] * self.window
+        self._n = 0
+        self._sum = 0.0
+
+    def update(self, x):
+        i = self._n % self.window
+        self._sum += x - self._buf[i]
+        self._buf[i] = x
+        self._n += 1
+        if self._n % (self.window * 1024) == 0:
+            self._sum = sum(self._buf)   # shed accumulated rounding error
+        return self._sum / min(self._n, self.window)
+
+    def process(self, values):
+        import numpy as np
+        self.reset()
+        x = np.asarray(values, dtype=np.float64)
+        csum = np.cumsum(np.concatenate(([0.0], x)))
+        n = np.arange(1, len(x) + 1)
+        lo = np.maximum(n - self.window, 0)
+        # leave the filter as update() would
+        for k in range(max(0, len(x) - self.window), len(x)):
+            self._buf[k % self.window] = float(x[k])
+        self._n = len(x)
+        self._sum = sum(self._buf)
+        return (csum[n] - csum[lo]) / (n - lo)
+
+
+class _WindowMedian:
+    """
+    Median of a sliding window with two heaps and lazy deletion:
+    O(log n) per sample; samples leaving the window are only removed
+    once they reach the top of their heap, and the heaps are rebuilt
+    from the window if too many stale samples stay buried.
+    """
+    def __init__(self, window: int):
+        self.window = window
+        self._buf = [0.0] * window
+        self._n = 0
+        self._low: List[float] = []    # max-heap (negated) of the lower half
+        self._high: List[float] = []   # min-heap of the upper half
+        self._low_size = self._high_size = 0
+        self._stale = {}               # value → copies still in a heap
+
+    def push(self, x: float) -> float:
+        if self._n >= self.window:
+            old = self._buf[self._n % self.window]
+            self._stale[old] = self._stale.get(old, 0) + 1
+            # heap tops are always live, so this finds the half holding it
+            if old <= -self._low[0]:
+                self._low_size -= 1
+            else:
+                self._high_size -= 1
+        self._buf[self._n % self.window] = x
+        self._n += 1
+        # x goes through the lower half so both halves stay ordered
+        self._prune()
+        heapq.heappush(self._low, -x)
+        heapq.heappush(self._high, -heapq.heappop(self._low))
+        self._high_size += 1
+        self._prune()
+        while self._low_size > self._high_size + 1:
+            heapq.heappush(self._high, -heapq.heappop(self._low))
+            self._low_size -= 1
+            self._high_size += 1
+            self._prune()
+        while self._low_size < self._high_size:
+            heapq.heappush(self._low, -heapq.heappop(self._high))
+            self._low_size += 1
+            self._high_size -= 1
+            self._prune()
+        if len(self._low) + len(self._high) > 2 * self.window + 8:
+            self._compact()
+        if self._low_size > self._high_size:
+            return -self._low[0]
+        return (-self._low[0] + self._high[0]) / 2
+
+    def _compact(self):
+        """Rebuild both heaps from the window when buried stale samples pile up."""
+        live = sorted(self._buf[:min(self._n, self.window)])
+        half = (len(live) + 1) // 2
+        self._low = [-v for v in reversed(live[:half])]
+        self._high = live[half:]
+        self._low_size, self._high_size = half, len(live) - half
+        self._stale.clear()
+
+    def _prune(self):
+        """Drop samples that left the window from both heap tops."""
+        stale = self._stale
+        for heap, sign in ((self._low, -1), (self._high, 1)):
+            while heap and stale.get(sign * heap[0], 0):
+                v = sign * heapq.heappop(heap)
+                stale[v] -= 1
+                if not stale[v]:
+                    del stale[v]
+
+
+class RunningMedian(StreamFilter):
+    """Median of the last `window` samples (fewer while filling); removes spikes."""
+    def __init__(self, window: int = 5):
+        if window < 1:
+            raise ValueError(f"window must be at least 1, got {window}")
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._median = _WindowMedian(self.window)
+
+    def update(self, x):
+        return self._median.push(x)
+
+    def process(self, values):
+        import numpy as np
+        x = np.asarray(values, dtype=np.float64)
+        w = self.window
+        if len(x) < w or not hasattr(np.lib.stride_tricks, 'sliding_window_view'):
+            return super().process(x)
+        out = np.empty(len(x))
+        self.reset()
+        out[:w - 1] = [self.update(v) for v in x[:w - 1].tolist()]
+        out[w - 1:] = np.median(np.lib.stride_tricks.sliding_window_view(x, w), axis=1)
+        self.reset()
+        for v in x[-w:].tolist():   # leave the filter as update() would
+            self.update(v)
+        return out
+
+
+class Hampel(StreamFilter):
+    """
+    Hampel outlier rejection over the last `window` samples: a sample
+    more than `k` robust standard deviations from the window median is
+    replaced by the median, anything else passes through unchanged.
+
+    The spread is a running median of each sample's absolute deviation
+    from the median at the time it arrived, which keeps every update
+    O(log window) instead of recomputing the MAD over the window.
+    """
+    def __init__(self, window: int = 7, k: float = 3.0):
+        if window < 3:
+            raise ValueError(f"window must be at least 3, got {window}")
+        self.window = window
+        self.k = k
+        self.reset()
+
+    def reset(self):
+        self._median = _WindowMedian(self.window)
+        self._mad = _WindowMedian(self.window)
+        self._n = 0
+
+    def update(self, x):
+        med = self._median.push(x)
+        mad = self._mad.push(abs(x - med))
+        self._n += 1
+        if self._n < 3:
+            return x   # not enough history to judge
+        return med if abs(x - med) > self.k * _MAD_SCALE * mad else x
+
+
+class RateLimiter(StreamFilter):
+    """Output moves at most `max_step` per sample toward the input (slew limit)."""
+    def __init__(self, max_step: float):
+        if max_step <= 0:
+            raise ValueError(f"max_step must be positive, got {max_step}")
+        self.max_step = max_step
+        self.reset()
+
+    def reset(self):
+        self._y: Optional[float] = None
+
+    def update(self, x):
+        y = self._y
+        if y is None:
+            self._y = x
+        else:
+            self._y = y + max(-self.max_step, min(self.max_step, x - y))
+        return self._y
+
+
+class FilteredSensor:
+    """
+    A sensor read method followed by streaming filters.
+
+    Works wherever the plain wrapper does: read() takes an optional
+    snapshot, and indexes() lets it join snapshots, polling and rules.
+    A snapshot or polled sample is fed to the filters only once, however
+    often read() is called during the same poll period.
+
+    Usage:
+        smooth = dist.filtered(Hampel(7), EMA(0.3))
+        cm = smooth.read()
+        smooth.raw                          # last unfiltered value
+    """
+    def __init__(self, read: Callable[..., Any], *filters: StreamFilter):
+        owner = getattr(read, '__self__', None)
+        if owner is None or not hasattr(owner, 'indexes'):
+            raise TypeError("FilteredSensor needs a sensor wrapper read method")
+        self._read = read
+        self._gw = owner._gw
+        self._indexes = owner.indexes()
+        self.filter = Chain(*filters)
+        self.raw = None
+        self.value = None
+        self._stamp = None
+
+    def indexes(self) -> list:
+        return list(self._indexes)
+
+    def read(self, snapshot=None):
+        if snapshot is not None:
+            stamp = snapshot.timestamp
+        else:
+            cached = [self._gw.cached(idx) for idx in self._indexes]
+            stamp = max(c.timestamp for c in cached) if all(cached) else None
+        if stamp is not None and stamp == self._stamp:
+            return self.value
+        self.raw = self._read(snapshot)
+        self.value = self.filter.update(self.raw)
+        self._stamp = stamp
+        return self.value
+
+    def reset(self):
+        self.filter.reset()
+        self.raw = self.value = self._stamp = None
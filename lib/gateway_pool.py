@@ -0,0 +1,220 @@
+### lib/gateway_pool.py
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+from smd.red import Master, Index
+from lib.io_worker import BusLock, IOWorker, Priority, write_priority
+from lib.smd_gateway import SMDGateway, Snapshot, WriteBatch, collect_writes, _UNSET
+from lib.sim import SimulatedMaster, is_sim_port
+
+Pairs = Iterable[Tuple[Index, Any]]
+
+
+class GatewayPool:
+    """
+    Several SMD Red boards daisy-chained on one USB gateway.
+
+    The pool opens the serial port once and hands out one SMDGateway
+    view per device ID. Views share the Master and its bus lock, so
+    they can be passed to any wrapper (Button(pool[1], 5), Motor(pool[2]))
+    and used from several threads.
+
+    Writes for several devices can be sent together: write() sends one
+    frame per device, or a single SYNC_WRITE broadcast when every device
+    sets the same register, and write_sync() always broadcasts.
+
+    Usage:
+        pool = GatewayPool(port, [0, 1, 2])
+        led = Led(pool[1], module_id=5)
+        pool.write_sync(Index.TorqueEnable, {0: 0, 1: 0, 2: 0})
+    """
+    def __init__(
+        self,
+        port: str,
+        device_ids: Iterable[int],
+        baudrate: int = 115200,
+        modules_override: Union[None, List[str], Mapping[int, List[str]]] = None,
+        **gateway_kwargs
+    ):
+        """
+        modules_override: one module list for every device, or a
+                          {device_id: modules} dict (devices missing
+                          from it are scanned).
+        gateway_kwargs: passed on to each SMDGateway (scan_timeout,
+                          module_cache).
+        """
+        device_ids = list(dict.fromkeys(device_ids))
+        if not device_ids:
+            raise ValueError("GatewayPool needs at least one device ID")
+        self.port = port
+        if is_sim_port(port):
+            self._master = SimulatedMaster(port, baudrate)
+        else:
+            self._master = Master(port, baudrate)
+        self._lock = BusLock()
+        self._worker: Optional[IOWorker] = None
+        self.sync_frames = 0
+        self._views: Dict[int, SMDGateway] = {}
+        for dev_id in device_ids:
+            if isinstance(modules_override, Mapping):
+                modules = modules_override.get(dev_id)
+            else:
+                modules = modules_override
+            self._views[dev_id] = SMDGateway(
+                port, baudrate=baudrate, device_id=dev_id,
+                modules_override=modules, master=self._master, lock=self._lock,
+                **gateway_kwargs)
+            self._views[dev_id]._pool = self
+
+    def __getitem__(self, device_id: int) -> SMDGateway:
+        try:
+            return self._views[device_id]
+        except KeyError:
+            raise KeyError(f"Device {device_id} is not in this pool") from None
+
+    def __contains__(self, device_id: int) -> bool:
+        return device_id in self._views
+
+    def __iter__(self):
+        return iter(self._views.values())
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    @property
+    def device_ids(self) -> List[int]:
+        return list(self._views)
+
+    # Reads
+    def read_many(self, indexes: Mapping[int, Iterable[Index]]) -> Dict[int, Snapshot]:
+        """One get_variables transaction per device, back to back."""
+        return self._on_bus(Priority.SENSOR, self._read_many, indexes)
+
+    def _read_many(self, indexes: Mapping[int, Iterable[Index]]) -> Dict[int, Snapshot]:
+        return {dev_id: self[dev_id].read_many(idx) for dev_id, idx in indexes.items()}
+
+    # Writes
+    def write(self, writes: Mapping[int, Pairs], force: bool = False) -> int:
+        """
+        Write registers on several devices; returns the frames sent.
+
+        Values unchanged since the last write are skipped per device, as
+        in SMDGateway.write. If what remains is the same single register
+        on two or more devices it goes out as one SYNC_WRITE broadcast.
+        With the I/O worker running, the writes queue at the priority of
+        the most urgent one (a stop on any board is SAFETY).
+        """
+        writes = {dev_id: list(dict(pairs).items()) for dev_id, pairs in writes.items()}
+        priority = write_priority(pair for pairs in writes.values() for pair in pairs)
+        return self._on_bus(priority, self._write, writes, force)
+
+    def _write(self, writes: Dict[int, List[Tuple[Index, Any]]], force: bool) -> int:
+        pending: Dict[int, List[Tuple[Index, Any]]] = {}
+        for dev_id, pairs in writes.items():
+            view = self[dev_id]
+            if not force:
+                pairs = [(idx, val) for idx, val in pairs
+                         if view._shadow.get(idx, _UNSET) != val]
+            if pairs:
+                pending[dev_id] = pairs
+            else:
+                view.writes_skipped += 1
+
+        registers = {idx for pairs in pending.values() for idx, _ in pairs}
+        if (len(pending) > 1 and len(registers) == 1
+                and all(len(pairs) == 1 for pairs in pending.values())):
+            index = registers.pop()
+            self._sync(index, {dev_id: pairs[0][1] for dev_id, pairs in pending.items()})
+            return 1
+
+        for dev_id, pairs in pending.items():
+            self[dev_id].write(pairs, force=True)
+        return len(pending)
+
+    def write_sync(self, index: Index, values: Mapping[int, Any], force: bool = False) -> bool:
+        """
+        Set one register on several devices in a single broadcast frame.
+        Returns False if every value was already current.
+        """
+        values = dict(values)
+        priority = write_priority([(index, val) for val in values.values()])
+        return self._on_bus(priority, self._write_sync, index, values, force)
+
+    def _write_sync(self, index: Index, values: Dict[int, Any], force: bool) -> bool:
+        if not force:
+            values = {dev_id: val for dev_id, val in values.items()
+                      if self[dev_id]._shadow.get(index, _UNSET) != val}
+        if not values:
+            return False
+        self._sync(index, values)
+        return True
+
+    def _on_bus(self, priority: Priority, fn, *args):
+        """
+        Run fn under the bus lock, or queue it on the shared I/O worker
+        at `priority` when one is running (as SMDGateway does).
+        """
+        worker = self._worker
+        if worker is None or worker.in_worker() or self._lock.held():
+            with self._lock:
+                return fn(*args)
+        return worker.call(fn, *args, priority=priority)
+
+    def _sync(self, index: Index, values: Mapping[int, Any]):
+        for dev_id in values:
+            self[dev_id]   # reject devices outside the pool before sending
+        self._master.set_variables_sync(index, list(values.items()))
+        self.sync_frames += 1
+        for dev_id, val in values.items():
+            self._views[dev_id]._shadow[index] = val
+
+    def batch(self):
+        """
+        Like SMDGateway.batch(), for writes to any device in the pool: on
+        exit they go out through write(), so one frame per device, or a
+        single SYNC_WRITE when every device sets the same register.
+        """
+        return collect_writes(list(self), self._flush_batch)
+
+    def _flush_batch(self, batch: WriteBatch, views: List[SMDGateway]):
+        priority = write_priority(pair for view in views
+                                  for pair in batch.pending.get(view.device_id, {}).items())
+        batch.frames += self._on_bus(priority, self._write_changed, batch, views)
+
+    def _write_changed(self, batch: WriteBatch, views: List[SMDGateway]) -> int:
+        # compared with the shadows on the bus thread, right before sending
+        return self._write({view.device_id: batch.changed(view) for view in views}, True)
+
+    # I/O worker
+    def start_worker(self, maxsize: int = 64) -> IOWorker:
+        """
+        One I/O worker for the whole bus, shared by every view (also
+        what pool[n].start_worker() returns), so priorities hold across
+        devices: a stop for one board goes ahead of LED frames for another.
+        """
+        if self._worker is None:
+            self._worker = IOWorker(self._lock, maxsize)
+            self._worker.start()
+            for view in self:
+                view._worker = self._worker
+        return self._worker
+
+    def stop_worker(self):
+        worker, self._worker = self._worker, None
+        for view in self:
+            view._worker = None
+        if worker is not None:
+            worker.stop()
+
+    def invalidate(self):
+        for view in self:
+            view.invalidate()
+
+    def close(self):
+        self.stop_worker()
+        for view in self:
+            view.close()
+        try:
+            self._master.close()
+        except AttributeError:
+            pass
+
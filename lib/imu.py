@@ -1,5 +1,16 @@
 ### lib/imu.py
-from typing import Tuple
+from typing import NamedTuple, Optional, Tuple
+
+class ImuSample(NamedTuple):
+    """
+    One IMU reading: accelerometer, gyroscope and the device's own
+    (roll, pitch) estimate, whichever the SDK provides (None otherwise),
+    all from the same transaction, with the host time it was read at.
+    """
+    accel: Optional[Tuple[float, float, float]]
+    gyro: Optional[Tuple[float, float, float]]
+    angles: Optional[Tuple[float, float]]
+    timestamp: float
 
 class Imu:
     """
@@ -7,15 +18,38 @@ class Imu:
 
     Usage:
         imu = Imu(gateway, module_id)
-        ax,ay,az = imu.read_accel()
-        gx,gy,gz = imu.read_gyro()
+        s = imu.read()               # accel, gyro and angles in one frame
+        roll, pitch = imu.read_angles()
+        ax,ay,az = imu.read_accel()  # raises if the SDK has no accel register
     """
+    _KEYS = ('accel', 'gyro', 'angles')
+
     def __init__(self, gateway, module_id: int):
         self._gw = gateway
         self._id = module_id
 
-    def read_accel(self) -> Tuple[float, float, float]:
-        return self._gw._master.get_accel(self._gw.device_id, self._id)
+    def indexes(self) -> list:
+        return [self._gw.index_for(key, self._id)
+                for key in self._KEYS if self._gw.supports(key)]
+
+    def read(self, snapshot=None) -> ImuSample:
+        """Every IMU value the SDK exposes, from one get_variables call."""
+        if snapshot is None:
+            indexes = self.indexes()
+            if not indexes:
+                # nothing readable: raise the capability error
+                self.read_accel()
+            snapshot = self._gw.read_many(indexes)
+        values = [self._gw.read_capability(key, self._id, snapshot)
+                  if self._gw.supports(key) else None for key in self._KEYS]
+        return ImuSample(*values, snapshot.timestamp)
+
+    def read_accel(self, snapshot=None) -> Tuple[float, float, float]:
+        return self._gw.read_capability('accel', self._id, snapshot)
+
+    def read_gyro(self, snapshot=None) -> Tuple[float, float, float]:
+        return self._gw.read_capability('gyro', self._id, snapshot)
 
-    def read_gyro(self) -> Tuple[float, float, float]:
-        return self._gw._master.get_gyro(self._gw.device_id, self._id)
+    def read_angles(self, snapshot=None) -> Tuple[float, float]:
+        """Roll and pitch as estimated by the IMU module itself."""
+        return self._gw.read_capability('angles', self._id, snapshot)
@@ -0,0 +1,209 @@
+### lib/io_worker.py
+
+import heapq
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Any, Callable, Dict, Optional
+from smd.red import Index
+
+
+class Priority(IntEnum):
+    """Bus request priority; lower values are served first."""
+    SAFETY = 0   # stop / torque off: never refused, never waits behind others
+    MOTOR = 1
+    SENSOR = 2
+    EFFECT = 3   # LED, buzzer
+
+
+def _effect_index(index) -> bool:
+    name = Index(int(index)).name
+    return name.startswith(('RGB_', 'Buzzer_'))
+
+
+def write_priority(pairs) -> Priority:
+    """Priority of a gateway write, from the registers it touches."""
+    pairs = list(pairs)
+    if any(int(idx) == Index.TorqueEnable and not val for idx, val in pairs):
+        return Priority.SAFETY
+    if pairs and all(_effect_index(idx) for idx, _ in pairs):
+        return Priority.EFFECT
+    return Priority.MOTOR
+
+
+class BusLock:
+    """
+    Re-entrant bus lock that can tell whether the calling thread holds
+    it (a thread-local depth count; RLock only offers the private
+    _is_owned()). Wraps `lock` if given, else a new RLock.
+    """
+    def __init__(self, lock: Optional[threading.RLock] = None):
+        self._lock = lock if lock is not None else threading.RLock()
+        self._local = threading.local()
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if not self._lock.acquire(blocking, timeout):
+            return False
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        return True
+
+    def release(self):
+        self._local.depth -= 1
+        self._lock.release()
+
+    def held(self) -> bool:
+        """True if the calling thread holds the lock."""
+        return getattr(self._local, 'depth', 0) > 0
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class LatencyStats:
+    """Queue wait and total (wait + bus) latency of one priority level."""
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.max_latency = 0.0
+        self._total = 0.0
+        self._latency = deque(maxlen=window)
+        self._wait = deque(maxlen=window)
+
+    def record(self, wait: float, latency: float):
+        self.count += 1
+        self._total += latency
+        self.max_latency = max(self.max_latency, latency)
+        self._latency.append(latency)
+        self._wait.append(wait)
+
+    def summary(self) -> Dict[str, float]:
+        """Milliseconds; percentiles over the most recent requests."""
+        def pct(values, p):
+            if not values:
+                return 0.0
+            ordered = sorted(values)
+            return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1e3
+        return {
+            'count': self.count,
+            'mean_ms': self._total / self.count * 1e3 if self.count else 0.0,
+            'p50_ms': pct(self._latency, 50),
+            'p99_ms': pct(self._latency, 99),
+            'max_ms': self.max_latency * 1e3,
+            'wait_p99_ms': pct(self._wait, 99),
+        }
+
+
+class IOWorker:
+    """
+    Single thread that owns the bus and serves requests from a bounded
+    priority queue, so a motor stop never waits behind a queue of LED
+    and buzzer frames.
+
+    A frame already on the wire is not interrupted; priority decides
+    which queued request goes next (FIFO within a level). When `maxsize`
+    requests are waiting, submitters block (back-pressure) and raise
+    queue.Full after `timeout`; SAFETY requests are always accepted.
+
+    Usage:
+        worker = IOWorker(gateway._lock, maxsize=64)
+        worker.start()
+        fut = worker.submit(master.set_rgb, 0, 5, 255, 0, 0, priority=Priority.EFFECT)
+        worker.stats()
+    """
+    def __init__(self, lock: Optional[BusLock] = None, maxsize: int = 64):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+        self._lock = lock if lock is not None else BusLock()
+        self.maxsize = maxsize
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {p: LatencyStats() for p in Priority}
+        self.rejected = 0
+        self.max_depth = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def depth(self) -> int:
+        return len(self._heap)
+
+    def in_worker(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def start(self):
+        if self.running:
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="SMDIOWorker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """Finish queued requests, then stop the thread."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, fn: Callable, *args, priority: Priority = Priority.SENSOR,
+               timeout: Optional[float] = None, **kwargs) -> Future:
+        future = Future()
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("IOWorker is stopped")
+            if priority != Priority.SAFETY:
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while len(self._heap) >= self.maxsize and not self._stopped:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self.rejected += 1
+                        raise queue.Full(f"I/O queue full ({self.maxsize} requests waiting)")
+                    self._cond.wait(remaining)
+            heapq.heappush(self._heap, (int(priority), next(self._seq), time.monotonic(),
+                                        fn, args, kwargs, future))
+            self.max_depth = max(self.max_depth, len(self._heap))
+            self._cond.notify_all()
+        return future
+
+    def call(self, fn: Callable, *args, priority: Priority = Priority.SENSOR,
+             timeout: Optional[float] = None, **kwargs) -> Any:
+        """submit() and wait for the result (re-raises the call's exception)."""
+        return self.submit(fn, *args, priority=priority, timeout=timeout, **kwargs).result()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Latency summary per priority level that has seen requests."""
+        return {p.name: s.summary() for p, s in self._stats.items() if s.count}
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap and not self._stopped:
+                    self._cond.wait()
+                if not self._heap:
+                    return
+                prio, _, queued, fn, args, kwargs, future = heapq.heappop(self._heap)
+                self._cond.notify_all()   # wake submitters blocked on a full queue
+            if not future.set_running_or_notify_cancel():
+                continue
+            started = time.monotonic()
+            try:
+                with self._lock:
+                    result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            self._stats[Priority(prio)].record(started - queued, time.monotonic() - queued)
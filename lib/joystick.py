@@ -1,23 +1,160 @@
 ### lib/joystick.py
 
-from typing import Tuple
+import threading
+import time
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+# raw axis range reported by the joystick module
+RAW_RANGE = (-100, 100)
+
+MOVED, PRESSED, RELEASED = 'moved', 'pressed', 'released'
+
+
+class JoystickState(NamedTuple):
+    """Calibrated axes (-1 … 1), button, raw axes and the host read time."""
+    x: float
+    y: float
+    pressed: bool
+    raw: Tuple[int, int]
+    timestamp: float
+
+
+class JoystickEvent(NamedTuple):
+    kind: str              # 'moved', 'pressed' or 'released'
+    state: JoystickState
+
+
+def axis_lut(lo: int, hi: int, center: int, deadzone: float) -> List[float]:
+    """
+    Calibrated value for every raw reading lo..hi: -1 … 1 around `center`,
+    0 inside the deadzone (a fraction of full travel) and rescaled outside
+    it, so the output still starts at 0 at the deadzone edge.
+    """
+    if not lo < center < hi:
+        raise ValueError(f"center {center} must lie inside the raw range {lo}..{hi}")
+    if not 0.0 <= deadzone < 1.0:
+        raise ValueError(f"deadzone must be in [0, 1), got {deadzone}")
+    lut = []
+    for raw in range(lo, hi + 1):
+        v = (raw - center) / (hi - center if raw >= center else center - lo)
+        mag = (abs(v) - deadzone) / (1.0 - deadzone)
+        lut.append(0.0 if mag <= 0 else (mag if v > 0 else -mag))
+    return lut
+
 
 class Joystick:
     """
     Joystick module: X/Y axes and a push-button.
 
+    Axes go through per-axis lookup tables (built once per calibration)
+    that apply the centre, range and deadzone, so a read costs two list
+    lookups. read_state() takes axes and button from one transaction;
+    events() turns the stream of states into moved / pressed / released
+    events, emitted only on change.
+
     Usage:
         joy = Joystick(gateway, module_id)
         x, y = joy.read_axes()
         pressed = joy.is_pressed()
+
+        joy.calibrate(deadzone=0.08)
+        s = joy.read_state()                # s.x, s.y, s.pressed
+        for ev in joy.events(rate_hz=100):
+            if ev.kind == 'moved': drive(ev.state.x, ev.state.y)
     """
-    def __init__(self, gateway, module_id: int):
+    def __init__(self, gateway, module_id: int, deadzone: float = 0.05,
+                 move_threshold: float = 0.02):
+        """
+        deadzone: fraction of travel around the centre that reads as 0.
+        move_threshold: smallest axis change reported as a 'moved' event.
+        """
         self._gw = gateway
         self._id = module_id
+        self.move_threshold = move_threshold
+        self._last: Optional[JoystickState] = None
+        self.calibrate(deadzone=deadzone)
 
-    def read_axes(self) -> Tuple[int, int]:
+    def indexes(self) -> list:
+        # the button may live inside the joystick register (one index)
+        return list(dict.fromkeys([self._gw.index_for('joy', self._id),
+                                   self._gw.index_for('joy_button', self._id)]))
+
+    def read_axes(self, snapshot=None) -> Tuple[int, int]:
         # Returns raw X and Y values
-        return self._gw._master.get_joy(self._gw.device_id, self._id)
+        return self._gw.read_capability('joy', self._id, snapshot)
+
+    def is_pressed(self, snapshot=None) -> bool:
+        return bool(self._gw.read_capability('joy_button', self._id, snapshot))
+
+    # Calibration
+    def calibrate(self, center: Tuple[int, int] = (0, 0), deadzone: Optional[float] = None,
+                  raw_range: Tuple[int, int] = RAW_RANGE):
+        """Rebuild the axis lookup tables (deadzone defaults to the current one)."""
+        if deadzone is None:
+            deadzone = self.deadzone
+        lo, hi = raw_range
+        self._luts = [axis_lut(lo, hi, c, deadzone) for c in center]
+        self._lo, self._hi = lo, hi
+        self.center = tuple(center)
+        self.deadzone = deadzone
+
+    def calibrate_center(self, samples: int = 20, interval: float = 0.01) -> Tuple[int, int]:
+        """Average the raw axes at rest (hands off) and use that as the centre."""
+        sx = sy = 0
+        for _ in range(samples):
+            x, y = self.read_axes()
+            sx, sy = sx + x, sy + y
+            time.sleep(interval)
+        center = (round(sx / samples), round(sy / samples))
+        self.calibrate(center=center)
+        return center
+
+    def _axis(self, lut: List[float], raw: int) -> float:
+        return lut[min(max(raw, self._lo), self._hi) - self._lo]
+
+    # State and events
+    def read_state(self, snapshot=None) -> JoystickState:
+        """Calibrated axes and button from one transaction (or from `snapshot`)."""
+        if snapshot is None:
+            snapshot = self._gw.snapshot(self)
+        rx, ry = self.read_axes(snapshot)
+        return JoystickState(self._axis(self._luts[0], rx), self._axis(self._luts[1], ry),
+                             self.is_pressed(snapshot), (rx, ry), snapshot.timestamp)
+
+    def changes(self, state: JoystickState) -> List[JoystickEvent]:
+        """Events for `state` compared with the last reported one (first call: none)."""
+        last = self._last
+        if last is None:
+            self._last = state
+            return []
+        events = []
+        if state.pressed != last.pressed:
+            events.append(JoystickEvent(PRESSED if state.pressed else RELEASED, state))
+        moved = max(abs(state.x - last.x), abs(state.y - last.y))
+        if moved >= self.move_threshold or (moved and state.x == 0.0 and state.y == 0.0):
+            events.append(JoystickEvent(MOVED, state))
+            self._last = state
+        elif events:
+            # keep the last reported position so slow drift still adds up
+            self._last = state._replace(x=last.x, y=last.y)
+        return events
 
-    def is_pressed(self) -> bool:
-        return bool(self._gw._master.get_joy_button(self._gw.device_id, self._id))
+    def events(self, rate_hz: float = 100.0,
+               stop_event: Optional[threading.Event] = None) -> Iterator[JoystickEvent]:
+        """
+        Read the joystick at `rate_hz` (absolute schedule) and yield an
+        event whenever it moves, is pressed or is released.
+        """
+        if rate_hz <= 0:
+            raise ValueError(f"rate_hz must be positive, got {rate_hz}")
+        period = 1.0 / rate_hz
+        self._last = None
+        next_t = time.monotonic()
+        while stop_event is None or not stop_event.is_set():
+            yield from self.changes(self.read_state())
+            next_t += period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_t = time.monotonic()   # late: skip missed slots
@@ -7,15 +7,16 @@ class Led:
         self._gw = gateway
         self._id = module_id
 
-    def _write(self, rgb: Tuple[int, int, int]):
+    def _write(self, rgb: Tuple[int, int, int], force: bool = False):
         r, g, b = rgb
-        self._gw.set_rgb(self._id, (r, g, b))
+        # unchanged colours are skipped by the gateway's shadow registers
+        self._gw.set_rgb(self._id, (r, g, b), force=force)
 
-    def on(self, rgb: Tuple[int, int, int] = (255, 255, 255)):
-        self._write(rgb)
+    def on(self, rgb: Tuple[int, int, int] = (255, 255, 255), force: bool = False):
+        self._write(rgb, force)
 
-    def off(self):
-        self._write((0, 0, 0))
+    def off(self, force: bool = False):
+        self._write((0, 0, 0), force)
 
     def blink(self, on_rgb: Tuple[int, int, int] = (255, 0, 0), off_rgb: Tuple[int, int, int] = (0, 0, 0), period: float = 0.5, cycles: Optional[int] = None):
         print(f"[Led] Starting blink: on={on_rgb}, off={off_rgb}, period={period}, cycles={cycles}")
@@ -32,3 +33,21 @@ class Led:
         finally:
             self.off()
             print("[Led] blink finished, LED off")
+
+    def blink_async(self, on_rgb: Tuple[int, int, int] = (255, 0, 0), off_rgb: Tuple[int, int, int] = (0, 0, 0), period: float = 0.5, cycles: Optional[int] = None):
+        """
+        Non-blocking blink on the gateway's effect scheduler. Returns an
+        EffectHandle; handle.cancel() stops it and turns the LED off.
+        """
+        on = self._gw.encode_rgb(self._id, on_rgb)
+        off = self._gw.encode_rgb(self._id, off_rgb)
+
+        def steps():
+            n = 0
+            while cycles is None or n < cycles:
+                yield 2 * n * period, [on]
+                yield (2 * n + 1) * period, [off]
+                n += 1
+            yield 2 * n * period, []
+
+        return self._gw.scheduler.schedule(steps(), final=[self._gw.encode_rgb(self._id, (0, 0, 0))])
@@ -1,5 +1,7 @@
 ### lib/light.py
 
+from lib.filters import FilteredSensor
+
 class LightSensor:
     """
     Ambient light sensor module.
@@ -12,5 +14,18 @@ class LightSensor:
         self._gw = gateway
         self._id = module_id
 
-    def read_lux(self) -> float:
-        return self._gw._master.get_light(self._gw.device_id, self._id)
\ No newline at end of file
+    def indexes(self) -> list:
+        return [self._gw.index_for('light', self._id)]
+
+    def read_lux(self, snapshot=None) -> float:
+        if snapshot is not None:
+            return snapshot[self._gw.index_for('light', self._id)]
+        return self._gw.get_light(self._id)
+
+    def sample(self):
+        """Lux reading with its read timestamp and age (cached if polled)."""
+        return self._gw.sample(self._gw.index_for('light', self._id))
+
+    def filtered(self, *filters):
+        """read_lux() through streaming filters, e.g. filtered(Hampel(7), EMA(0.3))."""
+        return FilteredSensor(self.read_lux, *filters)
@@ -0,0 +1,337 @@
+### lib/melody.py
+
+import colorsys
+import hashlib
+import re
+import struct
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+# one row per note: start and length in beats (quarter notes), MIDI note number
+NOTE_DTYPE = np.dtype([('start', 'f8'), ('length', 'f8'), ('note', 'i1')])
+# one row per output change: seconds from start, buzzer Hz, MIDI note (-1: silent)
+EVENT_DTYPE = np.dtype([('t', 'f8'), ('freq', 'u2'), ('note', 'i1')])
+
+_PITCH = {'c': 0, 'd': 2, 'e': 4, 'f': 5, 'g': 7, 'a': 9, 'b': 11, 'h': 11}
+_RTTTL_NOTE = re.compile(r'^(\d*)([a-hp])(#?)(\.?)(\d?)(\.?)$')
+
+
+def note_freq(note) -> np.ndarray:
+    """Equal-tempered frequency in Hz of MIDI note number(s), A4 (69) = 440 Hz."""
+    return 440.0 * 2.0 ** ((np.asarray(note, dtype=np.float64) - 69) / 12)
+
+
+def note_color(note: int) -> Tuple[int, int, int]:
+    """Default LED colour for a note: hue by pitch class, brighter higher up."""
+    r, g, b = colorsys.hsv_to_rgb((note % 12) / 12, 1.0, min(1.0, 0.4 + note / 128))
+    return int(r * 255), int(g * 255), int(b * 255)
+
+
+class Melody:
+    """
+    A monophonic tune as a read-only NOTE_DTYPE array, in beats rather
+    than seconds, so tempo and transposition are applied when compiling
+    events() and never need a reparse.
+
+    Usage:
+        song = load("tune.rtttl")           # or a .mid file
+        song.duration(tempo=140)
+        ev = song.events(transpose=-12, legato=True)
+    """
+    def __init__(self, notes: np.ndarray, tempo: float = 120.0, name: str = ""):
+        self.notes = np.array(notes, dtype=NOTE_DTYPE)
+        self.notes.flags.writeable = False
+        self.tempo = float(tempo)
+        self.name = name
+        self._events: Dict[tuple, np.ndarray] = {}
+
+    @classmethod
+    def from_notes(cls, notes: Iterable[Tuple[int, float]], tempo: float = 120.0,
+                   name: str = "") -> "Melody":
+        """Melody from (MIDI note or None for a rest, beats) pairs played back to back."""
+        rows, beat = [], 0.0
+        for note, beats in notes:
+            if note is not None:
+                rows.append((beat, beats, note))
+            beat += beats
+        return cls(rows, tempo, name)
+
+    def __len__(self) -> int:
+        return len(self.notes)
+
+    @property
+    def beats(self) -> float:
+        if not len(self.notes):
+            return 0.0
+        return float((self.notes['start'] + self.notes['length']).max())
+
+    def duration(self, tempo: Optional[float] = None) -> float:
+        return self.beats * 60.0 / (tempo or self.tempo)
+
+    def events(self, tempo: Optional[float] = None, transpose: int = 0,
+               legato: bool = False, gap: float = 0.02) -> np.ndarray:
+        """
+        Read-only EVENT_DTYPE timeline at `tempo` bpm, shifted by
+        `transpose` semitones. Each note is followed by `gap` seconds of
+        silence; with legato=True a note runs straight into the next one
+        unless the next is a rest or the same pitch (which still needs a
+        break to be heard twice). The last row silences the buzzer at
+        the end of the tune. Compiled once per setting.
+        """
+        key = (float(tempo or self.tempo), int(transpose), bool(legato), float(gap))
+        cached = self._events.get(key)
+        if cached is None:
+            if len(self._events) >= 16:
+                self._events.clear()
+            cached = self._events[key] = self._compile(*key)
+        return cached
+
+    def _compile(self, tempo: float, transpose: int, legato: bool, gap: float) -> np.ndarray:
+        notes = self.notes
+        spb = 60.0 / tempo
+        n = len(notes)
+        if n == 0:
+            # nothing but rests (valid RTTTL): an empty timeline
+            events = np.empty(0, dtype=EVENT_DTYPE)
+            events.flags.writeable = False
+            return events
+        on = notes['start'] * spb
+        end = (notes['start'] + notes['length']) * spb
+        pitch = np.clip(notes['note'].astype(np.int16) + transpose, 0, 127)
+        # a gap never eats more than half of a note
+        off = end - np.minimum(gap, (end - on) / 2)
+        keep_off = np.ones(n, dtype=bool)
+        if legato and n > 1:
+            joined = np.isclose(on[1:], end[:-1]) & (pitch[1:] != pitch[:-1])
+            keep_off[:-1] = ~joined
+            off[:-1] = np.where(joined, end[:-1], off[:-1])
+        off[-1:] = end[-1:]   # the tune ends with its last note, not before it
+        t = np.concatenate((on, off[keep_off]))
+        notes_out = np.concatenate((pitch, np.full(int(keep_off.sum()), -1, dtype=np.int16)))
+        # a silence due with the next note is dropped, so a change is one frame
+        order = np.lexsort((notes_out >= 0, t))
+        t, notes_out = t[order], notes_out[order]
+        last = np.append(~np.isclose(t[1:], t[:-1]), True)
+        events = np.empty(int(last.sum()), dtype=EVENT_DTYPE)
+        events['t'] = t[last]
+        events['note'] = notes_out[last]
+        sounding = events['note'] >= 0
+        events['freq'] = np.where(sounding, np.rint(note_freq(events['note'])), 0)
+        events.flags.writeable = False
+        return events
+
+
+# RTTTL
+def parse_rtttl(text: str) -> Melody:
+    """
+    Parse a ringtone in RTTTL ("name:d=4,o=5,b=120:8c6,p,a#.") into a
+    Melody; the tempo is the b= value (quarter notes per minute).
+    """
+    try:
+        name, defaults, body = text.strip().split(':', 2)
+    except ValueError:
+        raise ValueError("RTTTL needs three ':'-separated sections") from None
+    opts = {'d': 4, 'o': 6, 'b': 63}
+    for item in filter(None, (s.strip() for s in defaults.split(','))):
+        key, _, val = item.partition('=')
+        opts[key.strip().lower()] = int(val)
+    rows, beat = [], 0.0
+    for token in filter(None, (s.strip().lower() for s in body.split(','))):
+        m = _RTTTL_NOTE.match(token)
+        if m is None:
+            raise ValueError(f"bad RTTTL note {token!r}")
+        dur, letter, sharp, dot1, octave, dot2 = m.groups()
+        beats = 4.0 / int(dur or opts['d'])
+        if dot1 or dot2:
+            beats *= 1.5
+        if letter != 'p':
+            note = 12 * (int(octave or opts['o']) + 1) + _PITCH[letter] + (1 if sharp else 0)
+            rows.append((beat, beats, note))
+        beat += beats
+    return Melody(rows, opts['b'], name.strip())
+
+
+# Standard MIDI files
+def _varlen(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, pos
+
+
+def _read_track(data: bytes, notes: list, tempos: list):
+    pos, tick, status = 0, 0, 0
+    while pos < len(data):
+        delta, pos = _varlen(data, pos)
+        tick += delta
+        if data[pos] & 0x80:
+            status = data[pos]
+            pos += 1
+        elif not status:
+            raise ValueError("MIDI data byte without a running status")
+        if status == 0xFF:
+            kind = data[pos]
+            length, pos = _varlen(data, pos + 1)
+            if kind == 0x51 and length == 3:
+                tempos.append((tick, int.from_bytes(data[pos:pos + 3], 'big')))
+            elif kind == 0x2F:
+                return
+            pos += length
+            status = 0
+        elif status in (0xF0, 0xF7):
+            length, pos = _varlen(data, pos)
+            pos += length
+            status = 0
+        else:
+            kind, channel = status & 0xF0, status & 0x0F
+            size = 1 if kind in (0xC0, 0xD0) else 2
+            args = data[pos:pos + size]
+            pos += size
+            if channel == 9 or kind not in (0x80, 0x90):
+                continue                    # percussion and controllers
+            note, velocity = args[0], args[1]
+            notes.append((tick, kind == 0x90 and velocity > 0, note))
+
+
+def parse_midi(data: bytes, name: str = "") -> Melody:
+    """
+    Parse a Standard MIDI File (format 0 or 1) into a monophonic Melody:
+    all tracks are merged (drums on channel 10 ignored) and the highest
+    sounding note plays at any moment. Tempo changes are folded into the
+    beat times, measured at the first tempo.
+    """
+    if data[:4] != b'MThd':
+        raise ValueError("not a Standard MIDI File")
+    hlen, fmt, ntracks, division = struct.unpack('>IHHH', data[4:14])
+    if fmt > 1:
+        raise ValueError(f"MIDI format {fmt} is not supported")
+    if division & 0x8000:
+        raise ValueError("SMPTE time division is not supported")
+    pos = 8 + hlen
+    events: List[Tuple[int, bool, int]] = []
+    tempos: List[Tuple[int, int]] = []
+    for _ in range(ntracks):
+        kind, length = struct.unpack('>4sI', data[pos:pos + 8])
+        if kind == b'MTrk':
+            _read_track(data[pos + 8:pos + 8 + length], events, tempos)
+        pos += 8 + length
+
+    # tick → seconds through the tempo map, then to beats at the first tempo
+    tempos.sort()
+    if not tempos or tempos[0][0] > 0:
+        tempos.insert(0, (0, 500000))       # MIDI default: 120 bpm
+    marks, seconds = [], 0.0
+    for i, (tick, usec) in enumerate(tempos):
+        if i:
+            prev_tick, prev_usec = tempos[i - 1]
+            seconds += (tick - prev_tick) * prev_usec / 1e6 / division
+        marks.append((tick, seconds, usec))
+    base = tempos[0][1]
+
+    def beats(tick):
+        mark = marks[0]
+        for m in marks:
+            if m[0] > tick:
+                break
+            mark = m
+        return (mark[1] + (tick - mark[0]) * mark[2] / 1e6 / division) * 1e6 / base
+
+    # offs before ons at the same tick, then take the top note
+    events.sort(key=lambda e: (e[0], e[1]))
+    active: Dict[int, int] = {}
+    rows, current, since = [], None, 0
+    i = 0
+    while i < len(events):
+        tick = events[i][0]
+        struck = set()
+        while i < len(events) and events[i][0] == tick:
+            _, is_on, note = events[i]
+            if is_on:
+                active[note] = active.get(note, 0) + 1
+                struck.add(note)
+            elif active.get(note):
+                active[note] -= 1
+                if not active[note]:
+                    del active[note]
+            i += 1
+        top = max(active) if active else None
+        if top != current or top in struck:
+            if current is not None and tick > since:
+                rows.append((beats(since), beats(tick) - beats(since), current))
+            current, since = top, tick
+    return Melody(rows, 60e6 / base, name)
+
+
+_cache: Dict[str, Melody] = {}
+_cache_lock = threading.Lock()
+
+
+def load(path: str) -> Melody:
+    """
+    Melody from an RTTTL text file or a Standard MIDI File, parsed once
+    per file content (cached by SHA-1, so edited files are re-read).
+    """
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    digest = hashlib.sha1(data).hexdigest()
+    with _cache_lock:
+        melody = _cache.get(digest)
+    if melody is None:
+        if data[:4] == b'MThd':
+            melody = parse_midi(data, name=path)
+        else:
+            melody = parse_rtttl(data.decode('utf-8'))
+        with _cache_lock:
+            melody = _cache.setdefault(digest, melody)
+    return melody
+
+
+class MelodyPlayer:
+    """
+    Plays Melody timelines on a buzzer, optionally lighting an LED in
+    the note's colour. Each note change (tone and colour together) goes
+    out as one frame on the gateway's effect scheduler at its absolute
+    deadline, so play() returns at once and timing does not drift.
+
+    Usage:
+        player = MelodyPlayer(buzzer, led)
+        handle = player.play(load("tune.rtttl"), tempo=140, transpose=12)
+        handle.wait()                       # or handle.cancel()
+    """
+    def __init__(self, buzzer, led=None,
+                 color: Callable[[int], Tuple[int, int, int]] = note_color):
+        if led is not None and led._gw is not buzzer._gw:
+            raise ValueError("LED and buzzer must be on the same gateway")
+        self._gw = buzzer._gw
+        self._buzzer = buzzer
+        self._led = led
+        self._color = color
+        self._frames: Dict[Tuple[int, int], list] = {}
+
+    def _frame(self, freq: int, note: int) -> list:
+        frame = self._frames.get((freq, note))
+        if frame is None:
+            frame = [self._gw.encode_buzzer(self._buzzer._id, freq)]
+            if self._led is not None:
+                rgb = self._color(note) if note >= 0 else (0, 0, 0)
+                frame.append(self._gw.encode_rgb(self._led._id, rgb))
+            self._frames[(freq, note)] = frame
+        return frame
+
+    def play(self, melody: Union[Melody, str], tempo: Optional[float] = None,
+             transpose: int = 0, legato: bool = False, gap: float = 0.02):
+        """
+        Start playing; returns the scheduler's EffectHandle (cancel()
+        silences it). A melody without notes only silences the buzzer.
+        """
+        if isinstance(melody, str):
+            melody = load(melody)
+        events = melody.events(tempo, transpose, legato, gap)
+        steps = [(t, self._frame(f, n)) for t, f, n in
+                 zip(events['t'].tolist(), events['freq'].tolist(), events['note'].tolist())]
+        return self._gw.scheduler.schedule(steps, final=self._frame(0, -1))
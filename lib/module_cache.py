@@ -0,0 +1,115 @@
+### lib/module_cache.py
+
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+# connected_bitfield bit of each module family's slot 1 (see Master.scan_modules)
+MODULE_BIT_OFFSETS = {
+    'Button': 1, 'Light': 6, 'Buzzer': 11, 'Joystick': 16, 'Distance': 21,
+    'QTR': 26, 'Servo': 31, 'Pot': 36, 'RGB': 41, 'IMU': 46,
+}
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+    'acrome-smd', 'modules.json')
+
+
+def encode_modules(modules: Sequence[str]) -> int:
+    """connected_bitfield value (as one 64-bit int) for a module list."""
+    bits = 0
+    for module in modules:
+        family, _, slot = module.rpartition('_')
+        bits |= 1 << (MODULE_BIT_OFFSETS[family] + int(slot) - 1)
+    return bits
+
+
+def decode_modules(bits) -> List[str]:
+    """Module names ('Button_5', ...) from a connected_bitfield reading."""
+    if isinstance(bits, (list, tuple)):
+        bits = (bits[1] << 32) | bits[0]
+    modules = []
+    for family, offset in sorted(MODULE_BIT_OFFSETS.items(), key=lambda kv: kv[1]):
+        for slot in range(1, 6):
+            if bits & (1 << (offset + slot - 1)):
+                modules.append(f"{family}_{slot}")
+    return modules
+
+
+def port_identity(port: str) -> str:
+    """
+    Stable identity of a serial port: the USB serial number or VID:PID
+    and location when known, else the port name itself.
+    """
+    try:
+        from lib.usb_port_finder import USBPortFinder
+        p = USBPortFinder.describe(port)
+    except Exception:
+        p = None
+    if p is not None and p.vid is not None:
+        if p.serial_number:
+            return f"usb:{p.vid:04x}:{p.pid:04x}:{p.serial_number}"
+        return f"usb:{p.vid:04x}:{p.pid:04x}@{p.location}"
+    return port
+
+
+class ModuleCache:
+    """
+    On-disk record of the modules found by a scan, keyed by port
+    identity and device ID, so the next start can skip the scan.
+
+    Entries also keep the last cold (scan) and warm (cached) startup
+    times, so a gateway can report both.
+
+    Usage:
+        cache = ModuleCache()
+        entry = cache.get(port_identity(port), device_id)
+        cache.put(key, device_id, modules, bitfield, cold_s=5.6)
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get('ACROME_SMD_CACHE', DEFAULT_CACHE_PATH)
+
+    @staticmethod
+    def _key(identity: str, device_id: int) -> str:
+        return f"{identity}#{device_id}"
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as fh:
+                data = json.load(fh)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, identity: str, device_id: int) -> Optional[Dict[str, Any]]:
+        entry = self._load().get(self._key(identity, device_id))
+        if not isinstance(entry, dict) or not isinstance(entry.get('modules'), list):
+            return None
+        return entry
+
+    def put(self, identity: str, device_id: int, **fields):
+        """Merge `fields` into the entry and write the file atomically."""
+        data = self._load()
+        entry = data.get(self._key(identity, device_id))
+        entry = dict(entry) if isinstance(entry, dict) else {}
+        entry.update(fields, saved=time.time())
+        data[self._key(identity, device_id)] = entry
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+                json.dump(data, fh, indent=2)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"⚠ could not write module cache {self.path}: {e}")
+
+    def forget(self, identity: str, device_id: int):
+        data = self._load()
+        if data.pop(self._key(identity, device_id), None) is not None:
+            try:
+                with open(self.path, 'w', encoding='utf-8') as fh:
+                    json.dump(data, fh, indent=2)
+            except OSError:
+                pass
@@ -0,0 +1,174 @@
+### lib/morse.py
+
+import functools
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+MORSE_CODE: Dict[str, str] = {
+    'A': '.-',    'B': '-...',  'C': '-.-.', 'D': '-..',  'E': '.',
+    'F': '..-.',  'G': '--.',   'H': '....', 'I': '..',   'J': '.---',
+    'K': '-.-',   'L': '.-..',  'M': '--',   'N': '-.',   'O': '---',
+    'P': '.--.',  'Q': '--.-',  'R': '.-.',  'S': '...',  'T': '-',
+    'U': '..-',   'V': '...-',  'W': '.--',  'X': '-..-', 'Y': '-.--',
+    'Z': '--..',
+    '0': '-----', '1': '.----', '2': '..---', '3': '...--', '4': '....-',
+    '5': '.....', '6': '-....', '7': '--...', '8': '---..', '9': '----.'
+}
+
+# one row per output change: when (seconds from start), LED lit, buzzer Hz
+TIMELINE_DTYPE = np.dtype([('t', 'f8'), ('led', '?'), ('freq', 'u2')])
+
+DEFAULT_WPM = 12.0
+DEFAULT_FREQ = 600
+
+
+def dot_seconds(wpm: float) -> float:
+    """Dot length at `wpm` words per minute (PARIS standard: 50 dots per word)."""
+    if wpm <= 0:
+        raise ValueError(f"wpm must be positive, got {wpm}")
+    return 1.2 / wpm
+
+
+def to_morse_string(msg: str) -> str:
+    """Dot/dash string for display: spaces between letters, / between words."""
+    words = []
+    for word in msg.strip().upper().split():
+        letters = [MORSE_CODE.get(ch, '') for ch in word]
+        words.append(' '.join(filter(None, letters)))
+    return ' / '.join(w for w in words if w)
+
+
+def compile_morse(msg: str, wpm: float = DEFAULT_WPM, freq: int = DEFAULT_FREQ) -> np.ndarray:
+    """
+    Timeline of `msg` as a read-only TIMELINE_DTYPE array: a row each
+    time the LED and buzzer switch on or off, timed from the start of
+    the message. Element gap 1 dot, letter gap 3, word gap 7; characters
+    without a Morse code are skipped. The last row switches everything
+    off at the end of the last element.
+
+    Compiled once per (message, wpm, freq); case and surrounding spaces
+    do not matter.
+    """
+    return _compile(' '.join(msg.upper().split()), float(wpm), int(freq))
+
+
+@functools.lru_cache(maxsize=64)
+def _compile(msg: str, wpm: float, freq: int) -> np.ndarray:
+    dot = dot_seconds(wpm)
+    rows: List[Tuple[float, bool, int]] = []
+    units = 0                              # time in dots, so no rounding builds up
+    for word in msg.split(' '):
+        codes = [MORSE_CODE[ch] for ch in word if ch in MORSE_CODE]
+        if not codes:
+            continue
+        if rows:
+            units += 7 - 3                 # word gap: the letter gap is already counted
+        for code in codes:
+            for sym in code:
+                rows.append((units * dot, True, freq))
+                units += 1 if sym == '.' else 3
+                rows.append((units * dot, False, 0))
+                units += 1
+            units += 3 - 1                 # letter gap: the element gap is already counted
+    timeline = np.array(rows, dtype=TIMELINE_DTYPE)
+    timeline.flags.writeable = False       # shared by every caller of the cache
+    return timeline
+
+
+class MorsePlayer:
+    """
+    Plays compiled Morse timelines on an LED and a buzzer.
+
+    Every row is written as one frame (LED and tone together) at its
+    absolute deadline, start + t, so late writes never push the rest of
+    the message back. The thread sleeps until `spin` seconds before a
+    deadline and busy-waits the rest, which keeps writes within a
+    fraction of a millisecond of their deadlines on real hardware.
+    Progress callbacks get a whole percent and are throttled to one per
+    `progress_interval` seconds (plus the final 100).
+
+    Usage:
+        player = MorsePlayer(led, buzzer, wpm=15)
+        player.play("SOS", on_progress=lambda pct: print(pct))
+        player.lateness                     # seconds late per row
+    """
+    def __init__(self, led, buzzer, wpm: float = DEFAULT_WPM, freq: int = DEFAULT_FREQ,
+                 color: Tuple[int, int, int] = (255, 255, 255),
+                 progress_interval: float = 0.05, spin: float = 0.002):
+        if led._gw is not buzzer._gw:
+            raise ValueError("LED and buzzer must be on the same gateway")
+        self._gw = led._gw
+        self.wpm = wpm
+        self.freq = freq
+        self.progress_interval = progress_interval
+        self.spin = spin
+        gw = self._gw
+        self._frames = {
+            (led_on, tone): [gw.encode_rgb(led._id, color if led_on else (0, 0, 0)),
+                             gw.encode_buzzer(buzzer._id, tone)]
+            for led_on, tone in ((True, freq), (False, 0))}
+        self._off = self._frames[(False, 0)]
+        self.lateness: List[float] = []
+
+    def compile(self, msg: str) -> np.ndarray:
+        return compile_morse(msg, self.wpm, self.freq)
+
+    def duration(self, msg: str) -> float:
+        timeline = self.compile(msg)
+        return float(timeline['t'][-1]) if len(timeline) else 0.0
+
+    def play(self, msg: str, on_progress: Optional[Callable[[int], None]] = None,
+             stop_event: Optional[threading.Event] = None) -> bool:
+        """
+        Transmit `msg`, blocking until done; returns False if stop_event
+        ended it early. The LED and buzzer are always left off.
+        """
+        timeline = self.compile(msg)
+        gw = self._gw
+        clock, sleep = gw._clock, gw._sleep
+        # busy-waiting only makes sense on a clock that moves by itself
+        spin = self.spin if getattr(gw._master, 'realtime', True) else 0.0
+        times = timeline['t'].tolist()
+        frames = [self._frames.get((on, int(f)), self._off)
+                  for on, f in zip(timeline['led'].tolist(), timeline['freq'].tolist())]
+        total = times[-1] if times else 0.0
+        self.lateness = lateness = []
+        last_pct, next_report = -1, 0.0
+        completed = False
+        start = clock()
+        try:
+            for t, frame in zip(times, frames):
+                deadline = start + t
+                while True:
+                    if stop_event is not None and stop_event.is_set():
+                        return False
+                    delay = deadline - clock()
+                    if delay <= spin:
+                        break
+                    sleep(min(delay - spin, 0.05))   # wake often enough to notice a stop
+                now = clock()
+                while now < deadline:
+                    now = clock()
+                lateness.append(now - deadline)
+                gw.write(frame)
+                if on_progress is not None and total and now >= next_report:
+                    pct = int(t / total * 100)
+                    if pct != last_pct and pct < 100:
+                        on_progress(pct)
+                        last_pct, next_report = pct, now + self.progress_interval
+            completed = True
+            return True
+        finally:
+            gw.write(self._off)
+            if completed and on_progress is not None:
+                on_progress(100)
+
+    def stats(self) -> Dict[str, float]:
+        """Lateness of the last play(), in milliseconds."""
+        late = np.asarray(self.lateness) * 1e3
+        if not len(late):
+            return {'rows': 0, 'max_ms': 0.0, 'mean_ms': 0.0, 'p99_ms': 0.0}
+        return {'rows': len(late), 'max_ms': float(late.max()), 'mean_ms': float(late.mean()),
+                'p99_ms': float(np.percentile(late, 99))}
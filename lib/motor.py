@@ -1,11 +1,80 @@
 ### lib/motor.py
+import threading
 import time
-from smd.red import OperationMode
+from typing import Callable, Iterable, NamedTuple, Optional
+from smd.red import Index, OperationMode
+
+# registers the SDK's goTo writes itself (S-curve planner)
+_GOTO_INDEXES = (Index.PositionControlMode, Index.SCurveTime, Index.SCurveMaxVelocity,
+                 Index.ScurveAccel, Index.SCurveSetpoint)
+
+class StreamReport(NamedTuple):
+    """Outcome of Motor.stream_velocity / stream_position."""
+    sent: int          # setpoints handed to the gateway
+    dropped: int       # stale setpoints skipped to stay on schedule
+    overruns: int      # slots that started a full period or more late
+    max_late: float    # worst lateness of a slot, seconds
+    elapsed: float     # first to last setpoint, seconds
+    target_hz: float
+
+    @property
+    def achieved_hz(self) -> float:
+        return (self.sent - 1) / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def stream_setpoints(send: Callable[[object], None], setpoints: Iterable, rate_hz: float,
+                     stop_event: Optional[threading.Event] = None) -> StreamReport:
+    """
+    Call send(setpoint) for each setpoint, setpoint k at start + k / rate_hz.
+    A setpoint whose slot is a full period late is dropped (the final one
+    is always sent), so a stall never turns into a burst of frames.
+    """
+    if rate_hz <= 0:
+        raise ValueError(f"rate_hz must be positive, got {rate_hz}")
+    period = 1.0 / rate_hz
+    stop_event = stop_event or threading.Event()
+
+    it = iter(setpoints)
+    pending = next(it, None)
+    sent = dropped = overruns = 0
+    max_late = 0.0
+    start = time.monotonic()
+    first = last = start
+    slot = 0
+    while pending is not None and not stop_event.is_set():
+        sp, pending = pending, next(it, None)
+        # setpoint `slot` is due at start + slot * period (no drift)
+        deadline = start + slot * period
+        slot += 1
+        now = time.monotonic()
+        if now < deadline:
+            stop_event.wait(deadline - now)
+            if stop_event.is_set():
+                break
+            now = time.monotonic()
+        late = now - deadline
+        max_late = max(max_late, late)
+        if late >= period:
+            overruns += 1
+            # the next slot is already due: skip this stale setpoint,
+            # but always deliver the final one
+            if pending is not None:
+                dropped += 1
+                continue
+        send(sp)
+        if sent == 0:
+            first = now
+        last = now
+        sent += 1
+    return StreamReport(sent, dropped, overruns, max_late, last - first, rate_hz)
+
 
 class Motor:
     def __init__(self, gateway, cpr: int):
         self._gw = gateway
         self.cpr = cpr
+        # setpoint senders, resolved once per mode (see _setpoint_sender)
+        self._senders = {}
 
         # Configure encoder CPR immediately
         self._gw.set_shaft_cpr(cpr)
@@ -33,43 +102,111 @@ class Motor:
 
     # --- Higher-level actions ---
 
+    def _engage(self, mode: OperationMode, *setpoint):
+        # Mode, torque and setpoint go out as one frame; the gateway drops
+        # the mode/torque pairs when they are already set on the device.
+        self._gw.write([(Index.OperationMode, mode), (Index.TorqueEnable, 1), *setpoint])
+
     def run_pwm(self, duty: int, duration_s: float = None):
         # Ensure mode is PWM
-        self.set_operation_mode(OperationMode.PWM)
-        self.enable_torque(True)
-        self.set_pwm(duty)
+        self._engage(OperationMode.PWM, (Index.SetDutyCycle, duty))
         if duration_s is not None:
             time.sleep(duration_s)
             self.stop()
 
     def stop(self):
-        # In PWM mode, zero duty
-        try:
-            # If in PWM mode:
-            self.set_pwm(0)
-        except Exception:
-            pass
-        # Also disable torque
+        # Zero duty and disable torque in one frame. Always sent: a stop
+        # must reach the device even if the shadow copy says it is idle.
         try:
-            self.enable_torque(False)
+            self._gw.write([(Index.SetDutyCycle, 0), (Index.TorqueEnable, 0)], force=True)
         except Exception:
             pass
 
+    def _setpoint_sender(self, mode: OperationMode) -> Callable[[float], None]:
+        """
+        Function sending one setpoint in `mode`. The SDK's goVelocity is
+        used if it has one; otherwise the setpoint register is written
+        directly, in one frame.
+        """
+        sender = self._senders.get(mode)
+        if sender is not None:
+            return sender
+        gw = self._gw
+        if mode == OperationMode.Velocity:
+            go_velocity = getattr(gw._master, 'goVelocity', None)
+            if go_velocity is not None:
+                sender = lambda rpm: gw.call(go_velocity, gw.device_id, rpm)
+            else:
+                sender = lambda rpm: gw.write([(Index.SetVelocity, rpm)])
+        elif mode == OperationMode.Position:
+            sender = lambda pos: gw.write([(Index.SetPosition, pos)])
+        else:
+            raise ValueError(f"No streaming setpoint for {mode!r}")
+        self._senders[mode] = sender
+        return sender
+
+    def _engage_streaming(self, mode: OperationMode):
+        if mode == OperationMode.Position:
+            # direct position setpoints, not the S-curve planner used by goTo
+            self._engage(mode, (Index.PositionControlMode, 0))
+        else:
+            self._engage(mode)
+
     def run_velocity(self, rpm: float):
-        self.set_operation_mode(OperationMode.Velocity)
-        self.enable_torque(True)
-        try:
-            self._gw._master.goVelocity(self._gw.device_id, rpm)
-        except Exception:
-            self.set_shaft_rpm(rpm)
+        self._engage_streaming(OperationMode.Velocity)
+        self._setpoint_sender(OperationMode.Velocity)(rpm)
+
+    def stream_velocity(self, setpoints: Iterable[float], rate_hz: float,
+                        stop_event: Optional[threading.Event] = None) -> StreamReport:
+        """
+        Send velocity setpoints (RPM) at `rate_hz`. The mode is switched
+        once; the motor keeps the last setpoint when the stream ends.
+        """
+        return self._stream(OperationMode.Velocity, setpoints, rate_hz, stop_event)
+
+    def stream_position(self, setpoints: Iterable[float], rate_hz: float,
+                        stop_event: Optional[threading.Event] = None) -> StreamReport:
+        """Send position setpoints at `rate_hz`; see stream_velocity."""
+        return self._stream(OperationMode.Position, setpoints, rate_hz, stop_event)
+
+    def _stream(self, mode: OperationMode, setpoints: Iterable[float], rate_hz: float,
+                stop_event: Optional[threading.Event]) -> StreamReport:
+        send = self._setpoint_sender(mode)
+        self._engage_streaming(mode)
+        return stream_setpoints(send, setpoints, rate_hz, stop_event)
 
+    def follow(self, trajectory, stop_event: Optional[threading.Event] = None) -> StreamReport:
+        """Stream a lib.trajectory.Trajectory's positions at its rate."""
+        return self.stream_position(trajectory.position.tolist(), trajectory.rate_hz, stop_event)
 
-    def run_position(self, position: float):
-        self.set_operation_mode(OperationMode.Position)
-        self.enable_torque(True)
+    def run_position(self, position: float, v_max: Optional[float] = None,
+                     a_max: Optional[float] = None, j_max: Optional[float] = None,
+                     rate_hz: float = 100.0) -> Optional[StreamReport]:
+        """
+        Move to `position`. Without limits the device plans the move
+        (goTo). With v_max and a_max (and j_max for an S-curve) the
+        profile is computed on the host and streamed at rate_hz.
+        """
+        if v_max is not None or a_max is not None:
+            if v_max is None or a_max is None:
+                raise ValueError("host-side profiles need both v_max and a_max")
+            # numpy is only needed for host-side profiles
+            from lib.trajectory import scurve, trapezoidal
+            start = self._gw.read_many([Index.PresentPosition])[Index.PresentPosition]
+            if j_max is None:
+                trajectory = trapezoidal(start, position, v_max, a_max, rate_hz)
+            else:
+                trajectory = scurve(start, position, v_max, a_max, j_max, rate_hz)
+            return self.follow(trajectory)
+        self._engage(OperationMode.Position)
         try:
             # Adjust as per actual SDK method name:
-            self._gw._master.goTo(self._gw.device_id, position)
+            self._gw.call(self._gw._master.goTo, self._gw.device_id, position)
         except AttributeError:
             # If no goTo, comment or handle appropriately
             raise NotImplementedError("Position control method not implemented in gateway.")
+        finally:
+            # goTo writes these through the SDK, behind the shadow's back
+            for idx in _GOTO_INDEXES:
+                self._gw.invalidate(idx)
+        return None
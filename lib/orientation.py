@@ -0,0 +1,272 @@
+### lib/orientation.py
+
+import math
+from typing import NamedTuple, Optional, Sequence
+import numpy as np
+
+# chunk length for the vectorized linear recurrences below; short enough
+# that the running product of coefficients cannot underflow
+_CHUNK = 32
+
+
+class Attitude(NamedTuple):
+    """Orientation in degrees; yaw is gyro-only and drifts without a magnetometer."""
+    roll: float
+    pitch: float
+    yaw: float
+
+
+def _linear_recurrence(coef: np.ndarray, drive: np.ndarray, x0: np.ndarray) -> np.ndarray:
+    """
+    x[k] = coef[k] * x[k-1] + drive[k] for every k, with x[-1] = x0,
+    solved with cumulative products and sums (coef in (0, 1]).
+    """
+    out = np.empty_like(drive)
+    x = np.asarray(x0, dtype=np.float64)
+    for lo in range(0, len(drive), _CHUNK):
+        c = coef[lo:lo + _CHUNK, None]
+        prod = np.cumprod(c, axis=0)
+        out[lo:lo + _CHUNK] = prod * (x + np.cumsum(drive[lo:lo + _CHUNK] / prod, axis=0))
+        x = out[min(lo + _CHUNK, len(drive)) - 1]
+    return out
+
+
+def _time_steps(t, last: Optional[float]) -> np.ndarray:
+    t = np.asarray(t, dtype=np.float64)
+    prev = np.concatenate(([t[0] if last is None else last], t[:-1]))
+    return np.maximum(t - prev, 0.0)
+
+
+def accel_angles(accel) -> np.ndarray:
+    """Roll and pitch (degrees) of the gravity vector; accel shaped (3,) or (N, 3)."""
+    a = np.asarray(accel, dtype=np.float64)
+    roll = np.arctan2(a[..., 1], a[..., 2])
+    pitch = np.arctan2(-a[..., 0], np.hypot(a[..., 1], a[..., 2]))
+    return np.degrees(np.stack((roll, pitch), axis=-1))
+
+
+class GyroBias:
+    """
+    Gyroscope offset estimate (°/s), removed from every sample by the
+    orientation filters.
+
+    calibrate() averages samples taken while the IMU is held still. With
+    rate > 0 the estimate also follows slow drift during operation: each
+    sample that looks stationary (gravity-sized accel, small rotation)
+    pulls it by `rate` toward that sample.
+    """
+    def __init__(self, rate: float = 0.0, gyro_tol: float = 5.0,
+                 accel_tol: float = 0.05, gravity: float = 1.0,
+                 value: Sequence[float] = (0.0, 0.0, 0.0)):
+        """
+        gyro_tol: largest rotation (°/s, per axis) still called stationary.
+        accel_tol: allowed deviation of |accel| from `gravity` (fraction).
+        gravity: 1 g in the accelerometer's units.
+        """
+        if not 0.0 <= rate < 1.0:
+            raise ValueError(f"rate must be in [0, 1), got {rate}")
+        self.rate = rate
+        self.gyro_tol = gyro_tol
+        self.accel_tol = accel_tol
+        self.gravity = gravity
+        self.value = np.array(value, dtype=np.float64)
+
+    def stationary(self, accel, gyro) -> np.ndarray:
+        """True where the IMU looks at rest; works on one sample or (N, 3) arrays."""
+        a = np.asarray(accel, dtype=np.float64)
+        g = np.asarray(gyro, dtype=np.float64)
+        still_a = np.abs(np.linalg.norm(a, axis=-1) / self.gravity - 1.0) < self.accel_tol
+        still_g = np.all(np.abs(g) < self.gyro_tol, axis=-1)
+        return still_a & still_g
+
+    def calibrate(self, gyro) -> np.ndarray:
+        """Set the bias to the mean of gyro samples (N, 3) taken at rest."""
+        gyro = np.asarray(gyro, dtype=np.float64)
+        if gyro.ndim != 2 or not len(gyro):
+            raise ValueError("calibrate() needs gyro samples shaped (N, 3)")
+        self.value = gyro.mean(axis=0)
+        return self.value
+
+    def update(self, accel, gyro) -> np.ndarray:
+        """Bias after seeing one sample."""
+        if self.rate and self.stationary(accel, gyro):
+            self.value = self.value + self.rate * (np.asarray(gyro, dtype=np.float64) - self.value)
+        return self.value
+
+    def track(self, accel, gyro) -> np.ndarray:
+        """Bias after each of N samples, shaped (N, 3); same result as update() per row."""
+        gyro = np.asarray(gyro, dtype=np.float64)
+        if not self.rate:
+            return np.broadcast_to(self.value, gyro.shape)
+        step = self.rate * self.stationary(accel, gyro)
+        out = _linear_recurrence(1.0 - step, step[:, None] * gyro, self.value)
+        self.value = out[-1].copy()
+        return out
+
+
+class _AttitudeFilter:
+    """Shared sample handling: timestamps, bias removal, batch bookkeeping."""
+    def __init__(self, bias: Optional[GyroBias]):
+        self.bias = bias if bias is not None else GyroBias()
+        self._t: Optional[float] = None
+
+    def update(self, sample) -> Attitude:
+        """Feed one ImuSample (needs accel and gyro); dt comes from its timestamp."""
+        if sample.accel is None or sample.gyro is None:
+            raise ValueError("orientation filters need accelerometer and gyroscope readings")
+        dt = 0.0 if self._t is None else max(0.0, sample.timestamp - self._t)
+        self._t = sample.timestamp
+        return self.step(sample.accel, sample.gyro, dt)
+
+    def step(self, accel, gyro, dt: float) -> Attitude:
+        """Feed one accel (any unit) / gyro (°/s) pair taken `dt` seconds after the last."""
+        gyro = np.asarray(gyro, dtype=np.float64) - self.bias.update(accel, gyro)
+        return self._step(np.asarray(accel, dtype=np.float64), gyro, dt)
+
+    def process(self, accel, gyro, t) -> np.ndarray:
+        """
+        Batch of N samples (accel and gyro shaped (N, 3), t in seconds);
+        returns (N, 3) roll/pitch/yaw in degrees and leaves the filter in
+        the same state as N update() calls.
+        """
+        accel = np.asarray(accel, dtype=np.float64)
+        gyro = np.asarray(gyro, dtype=np.float64)
+        if accel.shape != gyro.shape or accel.ndim != 2 or accel.shape[1] != 3:
+            raise ValueError("accel and gyro must both be shaped (N, 3)")
+        if not len(accel):
+            return np.zeros((0, 3))
+        dt = _time_steps(t, self._t)
+        self._t = float(np.asarray(t)[-1])
+        return self._process(accel, gyro - self.bias.track(accel, gyro), dt)
+
+
+class ComplementaryFilter(_AttitudeFilter):
+    """
+    Roll and pitch from integrated gyro rates, pulled toward the
+    accelerometer's gravity angles: angle = alpha * (angle + rate * dt)
+    + (1 - alpha) * accel_angle. Cheap and robust; batches are solved
+    in closed form instead of a Python loop.
+
+    Usage:
+        f = ComplementaryFilter(alpha=0.98)
+        att = f.update(imu.read())
+        rpy = f.process(accel, gyro, t)     # recorded arrays
+    """
+    def __init__(self, alpha: float = 0.98, bias: Optional[GyroBias] = None):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        super().__init__(bias)
+        self.alpha = alpha
+        self._state: Optional[np.ndarray] = None   # roll, pitch, yaw
+
+    @property
+    def attitude(self) -> Attitude:
+        return Attitude(*(self._state.tolist() if self._state is not None else (0.0, 0.0, 0.0)))
+
+    def _step(self, accel, gyro, dt) -> Attitude:
+        measured = accel_angles(accel)
+        if self._state is None:
+            self._state = np.array([measured[0], measured[1], 0.0])
+        else:
+            a = self.alpha
+            self._state[:2] = a * (self._state[:2] + gyro[:2] * dt) + (1 - a) * measured
+            self._state[2] += gyro[2] * dt
+        return self.attitude
+
+    def _process(self, accel, gyro, dt) -> np.ndarray:
+        measured = accel_angles(accel)
+        state = self._state if self._state is not None else np.array([*measured[0], 0.0])
+        a = self.alpha
+        drive = a * gyro[:, :2] * dt[:, None] + (1 - a) * measured
+        out = np.empty((len(accel), 3))
+        out[:, :2] = _linear_recurrence(np.full(len(accel), a), drive, state[:2])
+        out[:, 2] = state[2] + np.cumsum(gyro[:, 2] * dt)
+        self._state = out[-1].copy()
+        return out
+
+
+class MadgwickFilter(_AttitudeFilter):
+    """
+    Madgwick's gradient-descent orientation filter (IMU form): a
+    quaternion integrated from the gyro and corrected toward gravity by
+    `beta` (rad/s). Better than the complementary filter at large or
+    combined rotations; every sample depends on the last, so batches
+    run one sample at a time on plain floats.
+
+    Usage:
+        f = MadgwickFilter(beta=0.1)
+        att = f.update(imu.read())
+        f.quaternion                          # (w, x, y, z)
+    """
+    def __init__(self, beta: float = 0.1, bias: Optional[GyroBias] = None):
+        super().__init__(bias)
+        self.beta = beta
+        self.quaternion = (1.0, 0.0, 0.0, 0.0)
+        self._started = False
+
+    @property
+    def attitude(self) -> Attitude:
+        return _euler(*self.quaternion)
+
+    def _step(self, accel, gyro, dt) -> Attitude:
+        if not self._started:
+            self._start(accel)
+        self.quaternion = _madgwick(self.quaternion, *accel.tolist(),
+                                    *np.radians(gyro).tolist(), dt, self.beta)
+        return self.attitude
+
+    def _process(self, accel, gyro, dt) -> np.ndarray:
+        if not self._started:
+            self._start(accel[0])
+        q = self.quaternion
+        beta = self.beta
+        out = np.empty((len(accel), 3))
+        for k, (a, g, h) in enumerate(zip(accel.tolist(), np.radians(gyro).tolist(), dt.tolist())):
+            q = _madgwick(q, *a, *g, h, beta)
+            out[k] = _euler(*q)
+        self.quaternion = q
+        return out
+
+    def _start(self, accel):
+        """Start level with gravity instead of converging from identity."""
+        roll, pitch = np.radians(accel_angles(accel)).tolist()
+        cr, sr = math.cos(roll / 2), math.sin(roll / 2)
+        cp, sp = math.cos(pitch / 2), math.sin(pitch / 2)
+        self.quaternion = (cr * cp, sr * cp, cr * sp, -sr * sp)
+        self._started = True
+
+
+def _madgwick(q, ax, ay, az, gx, gy, gz, dt, beta):
+    """One Madgwick IMU update (gyro in rad/s) on a (w, x, y, z) tuple."""
+    q0, q1, q2, q3 = q
+    # rate of change of quaternion from the gyroscope
+    d0 = 0.5 * (-q1 * gx - q2 * gy - q3 * gz)
+    d1 = 0.5 * (q0 * gx + q2 * gz - q3 * gy)
+    d2 = 0.5 * (q0 * gy - q1 * gz + q3 * gx)
+    d3 = 0.5 * (q0 * gz + q1 * gy - q2 * gx)
+    norm = math.sqrt(ax * ax + ay * ay + az * az)
+    if norm > 0.0:
+        ax, ay, az = ax / norm, ay / norm, az / norm
+        # gradient of the gravity-direction error
+        s0 = 4 * q0 * q2 * q2 + 2 * q2 * ax + 4 * q0 * q1 * q1 - 2 * q1 * ay
+        s1 = (4 * q1 * q3 * q3 - 2 * q3 * ax + 4 * q0 * q0 * q1 - 2 * q0 * ay - 4 * q1
+              + 8 * q1 * q1 * q1 + 8 * q1 * q2 * q2 + 4 * q1 * az)
+        s2 = (4 * q0 * q0 * q2 + 2 * q0 * ax + 4 * q2 * q3 * q3 - 2 * q3 * ay - 4 * q2
+              + 8 * q2 * q1 * q1 + 8 * q2 * q2 * q2 + 4 * q2 * az)
+        s3 = 4 * q1 * q1 * q3 - 2 * q1 * ax + 4 * q2 * q2 * q3 - 2 * q2 * ay
+        norm = math.sqrt(s0 * s0 + s1 * s1 + s2 * s2 + s3 * s3)
+        if norm > 0.0:
+            d0 -= beta * s0 / norm
+            d1 -= beta * s1 / norm
+            d2 -= beta * s2 / norm
+            d3 -= beta * s3 / norm
+    q0, q1, q2, q3 = q0 + d0 * dt, q1 + d1 * dt, q2 + d2 * dt, q3 + d3 * dt
+    norm = math.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+    return (q0 / norm, q1 / norm, q2 / norm, q3 / norm)
+
+
+def _euler(q0, q1, q2, q3) -> Attitude:
+    roll = math.atan2(2 * (q0 * q1 + q2 * q3), 1 - 2 * (q1 * q1 + q2 * q2))
+    pitch = math.asin(max(-1.0, min(1.0, 2 * (q0 * q2 - q3 * q1))))
+    yaw = math.atan2(2 * (q0 * q3 + q1 * q2), 1 - 2 * (q2 * q2 + q3 * q3))
+    return Attitude(math.degrees(roll), math.degrees(pitch), math.degrees(yaw))
@@ -0,0 +1,117 @@
+### lib/poller.py
+
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+from smd.red import Index
+
+# a polled value is stale once it is this many poll periods old (and at
+# least STALE_MIN seconds, so a busy bus does not count as a failure)
+STALE_PERIODS = 3
+STALE_MIN = 0.1
+
+
+class Sample(NamedTuple):
+    """A cached sensor value and the monotonic time it was read at."""
+    value: Any
+    timestamp: float
+
+    @property
+    def age(self) -> float:
+        """Seconds since the value was read."""
+        return time.monotonic() - self.timestamp
+
+
+class SensorPoller:
+    """
+    Background I/O thread that keeps the latest value of registered
+    sensors in a cache.
+
+    Every cycle it reads all indexes that are due in one batched
+    transaction (gateway.read_many) and publishes a new cache dict.
+    Readers never take a lock: the cache is replaced, never mutated,
+    so a lookup always sees a complete, consistent dict. fresh() only
+    returns values younger than max_age(), so when reads keep failing
+    (cable pulled, board reset) callers stop getting the last good one.
+
+    Usage:
+        poller = SensorPoller(gateway, {dist: 20, btn: 50})
+        poller.start()
+        sample = poller.latest(Index.Distance_1)
+    """
+    def __init__(self, gateway, rates: Dict[Any, float]):
+        self._gw = gateway
+        self._periods: Dict[Index, float] = {}
+        for sensor, rate_hz in rates.items():
+            if rate_hz <= 0:
+                raise ValueError(f"Polling rate must be positive, got {rate_hz}")
+            indexes = sensor.indexes() if hasattr(sensor, 'indexes') else [sensor]
+            for idx in indexes:
+                # an index shared by two sensors is polled at the faster rate
+                period = 1.0 / rate_hz
+                self._periods[idx] = min(period, self._periods.get(idx, period))
+        if not self._periods:
+            raise ValueError("SensorPoller needs at least one sensor")
+
+        self._cache: Dict[Index, Sample] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.cycles = 0
+        self.errors = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def indexes(self) -> list:
+        return list(self._periods)
+
+    def latest(self, index: Index) -> Optional[Sample]:
+        return self._cache.get(index)
+
+    def max_age(self, index: Index) -> float:
+        """Age after which the cached value of `index` is stale."""
+        return max(STALE_PERIODS * self._periods[index], STALE_MIN)
+
+    def fresh(self, index: Index) -> Optional[Sample]:
+        """latest(index), or None if it is missing or stale."""
+        sample = self._cache.get(index)
+        if sample is None or sample.age > self.max_age(index):
+            return None
+        return sample
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="SensorPoller", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        now = time.monotonic()
+        next_due = {idx: now for idx in self._periods}
+        while not self._stop.is_set():
+            now = time.monotonic()
+            due = [idx for idx, t in next_due.items() if t <= now]
+            if due:
+                try:
+                    snap = self._gw.read_many(due)
+                except Exception:
+                    self.errors += 1
+                else:
+                    cache = dict(self._cache)
+                    for idx in due:
+                        cache[idx] = Sample(snap[idx], snap.timestamp)
+                    self._cache = cache
+                    self.cycles += 1
+                for idx in due:
+                    # absolute schedule; skip missed slots instead of bursting
+                    t = next_due[idx] + self._periods[idx]
+                    next_due[idx] = t if t > now else now + self._periods[idx]
+            self._stop.wait(max(0.0, min(next_due.values()) - time.monotonic()))
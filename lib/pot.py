@@ -1,4 +1,7 @@
 ### lib/pot.py
+
+from lib.filters import FilteredSensor
+
 class Potentiometer:
     """
     Potentiometer (analog input).
@@ -11,5 +14,12 @@ class Potentiometer:
         self._gw = gateway
         self._id = module_id
 
-    def read(self) -> int:
-        return self._gw._master.get_pot(self._gw.device_id, self._id)
+    def indexes(self) -> list:
+        return [self._gw.index_for('pot', self._id)]
+
+    def read(self, snapshot=None) -> int:
+        return self._gw.read_capability('pot', self._id, snapshot)
+
+    def filtered(self, *filters):
+        """read() through streaming filters, e.g. filtered(Hampel(7), EMA(0.3))."""
+        return FilteredSensor(self.read, *filters)
@@ -6,14 +6,26 @@ class QTRArray:
     Usage:
         qtr = QTRArray(gateway, module_id)
         values = qtr.read_all()
-        pos    = qtr.read_position()
+        pos    = qtr.read_position()   # raises if the SDK has no position register
+
+        line = qtr.line()          # host-side pipeline (NumPy), one read per tick
+        r    = line.read()         # r.position, r.lost
     """
     def __init__(self, gateway, module_id: int):
         self._gw = gateway
         self._id = module_id
 
-    def read_all(self) -> list:
-        return list(self._gw._master.read_qtr(self._gw.device_id, self._id))
+    def indexes(self) -> list:
+        return [self._gw.index_for(key, self._id)
+                for key in ('qtr', 'position') if self._gw.supports(key)]
+
+    def read_all(self, snapshot=None) -> list:
+        return self._gw.read_capability('qtr', self._id, snapshot)
+
+    def read_position(self, snapshot=None) -> float:
+        return self._gw.read_capability('position', self._id, snapshot)
 
-    def read_position(self) -> float:
-        return self._gw._master.read_qtr_position(self._gw.device_id, self._id)
+    def line(self, calibration=None, **options):
+        """QTRPipeline over this array: calibrated values and line position from one read."""
+        from lib.qtr_pipeline import QTRPipeline
+        return QTRPipeline(self, calibration, **options)
@@ -0,0 +1,179 @@
+### lib/qtr_pipeline.py
+
+import json
+import time
+from typing import NamedTuple, Optional, Tuple
+import numpy as np
+
+# QTR_n registers are unsigned bytes
+RAW_MIN, RAW_MAX = 0, 255
+
+
+class QTRCalibration(NamedTuple):
+    """Per-sensor raw readings over the background (minimum) and the line (maximum)."""
+    minimum: np.ndarray
+    maximum: np.ndarray
+
+    @staticmethod
+    def default(sensors: int) -> "QTRCalibration":
+        return QTRCalibration(np.full(sensors, float(RAW_MIN)), np.full(sensors, float(RAW_MAX)))
+
+    @staticmethod
+    def from_samples(samples) -> "QTRCalibration":
+        """Min/max per sensor of raw samples shaped (ticks, sensors)."""
+        samples = np.asarray(samples, dtype=np.float64)
+        if samples.ndim != 2 or not len(samples):
+            raise ValueError("calibration needs raw samples shaped (ticks, sensors)")
+        return QTRCalibration(samples.min(axis=0), samples.max(axis=0))
+
+    def merge(self, other: "QTRCalibration") -> "QTRCalibration":
+        """Widen this calibration with another one (e.g. a second sweep)."""
+        return QTRCalibration(np.minimum(self.minimum, other.minimum),
+                              np.maximum(self.maximum, other.maximum))
+
+    @property
+    def span(self) -> np.ndarray:
+        return np.maximum(self.maximum - self.minimum, 1.0)
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump({'minimum': self.minimum.tolist(), 'maximum': self.maximum.tolist()}, fh)
+
+    @staticmethod
+    def load(path: str) -> "QTRCalibration":
+        with open(path, 'r', encoding='utf-8') as fh:
+            data = json.load(fh)
+        return QTRCalibration(np.asarray(data['minimum'], dtype=np.float64),
+                              np.asarray(data['maximum'], dtype=np.float64))
+
+
+class LineReading(NamedTuple):
+    """One tick: raw and normalized sensors, line position in [-1, 1], line lost."""
+    raw: np.ndarray
+    values: np.ndarray
+    position: float
+    lost: bool
+
+
+class LineBatch(NamedTuple):
+    """Results for a batch of ticks; one row (or element) per tick."""
+    values: np.ndarray
+    position: np.ndarray
+    lost: np.ndarray
+
+
+def normalize(raw, calibration: QTRCalibration, white_line: bool = False) -> np.ndarray:
+    """Raw readings (one tick or (ticks, sensors)) scaled to 0..1, 1 = on the line."""
+    values = (np.asarray(raw, dtype=np.float64) - calibration.minimum) / calibration.span
+    np.clip(values, 0.0, 1.0, out=values)
+    return 1.0 - values if white_line else values
+
+
+def line_position(values, threshold: float = 0.2, window: int = 1,
+                  last: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Line position of normalized readings shaped (ticks, sensors): -1 is
+    under the first sensor, +1 under the last, 0 centred.
+
+    Only the strongest sensor and `window` neighbours on each side are
+    weighted, so a distant sensor's noise cannot pull the estimate. A
+    tick whose strongest reading is below `threshold` has lost the line;
+    it reports -1 or +1 on the side the line was last seen (`last` for
+    ticks before the first sighting).
+    """
+    values = np.atleast_2d(values)
+    ticks, sensors = values.shape
+    if sensors < 2:
+        raise ValueError("line position needs at least two sensors")
+    offsets = np.arange(sensors, dtype=np.float64)
+    peak = values.argmax(axis=1)
+    weights = np.where(np.abs(offsets - peak[:, None]) <= window, values, 0.0)
+    total = weights.sum(axis=1)
+    position = (weights @ offsets) / np.where(total > 0, total, 1.0)
+    position = position * (2.0 / (sensors - 1)) - 1.0
+
+    lost = values.max(axis=1) < threshold
+    if lost.any():
+        # side of the most recent tick that saw the line (forward fill)
+        seen = np.where(~lost, np.arange(ticks), -1)
+        np.maximum.accumulate(seen, out=seen)
+        previous = np.where(seen >= 0, position[np.maximum(seen, 0)], last)
+        position = np.where(lost, np.sign(previous), position)
+    return position, lost
+
+
+class QTRPipeline:
+    """
+    Line-following pipeline for a QTR array, computed on the host.
+
+    Each tick reads the raw array once, normalizes it with the stored
+    min/max calibration and derives the line position and line-lost flag
+    locally, so raw values and position always come from the same read.
+    Recorded raw arrays (e.g. a telemetry column) go through process().
+
+    Usage:
+        line = qtr.line()                       # or QTRPipeline(qtr)
+        line.calibrate(duration=3.0)            # sweep the robot over the line
+        line.calibration.save("qtr.json")
+        r = line.read()                         # r.position, r.lost, r.values
+        batch = line.process(data['QTR_1'])     # recorded (ticks, sensors) array
+    """
+    def __init__(self, qtr, calibration: Optional[QTRCalibration] = None,
+                 threshold: float = 0.2, window: int = 1, white_line: bool = False):
+        """
+        threshold: normalized reading below which no sensor sees the line.
+        window: neighbours on each side of the peak used for the position.
+        white_line: the line reads lower than the background.
+        """
+        self._qtr = qtr
+        self.calibration = calibration
+        self.threshold = threshold
+        self.window = window
+        self.white_line = white_line
+        self._last = 0.0
+
+    def indexes(self) -> list:
+        # only the raw array: the position is computed here
+        return [self._qtr._gw.index_for('qtr', self._qtr._id)]
+
+    def read_raw(self, snapshot=None) -> np.ndarray:
+        raw = self._qtr.read_all(snapshot)
+        if raw is None:
+            raise IOError("QTR array returned no data")
+        return np.asarray(raw, dtype=np.float64)
+
+    def _calibration(self, sensors: int) -> QTRCalibration:
+        if self.calibration is None:
+            self.calibration = QTRCalibration.default(sensors)
+        return self.calibration
+
+    def calibrate(self, samples=None, duration: float = 3.0, rate_hz: float = 100.0,
+                  sleep=time.sleep) -> QTRCalibration:
+        """
+        Set the calibration from raw `samples` shaped (ticks, sensors),
+        or by reading the array for `duration` seconds while it is moved
+        across the line and the background.
+        """
+        if samples is None:
+            ticks = max(1, int(duration * rate_hz))
+            samples = np.empty((ticks, len(self.read_raw())))
+            for i in range(ticks):
+                samples[i] = self.read_raw()
+                sleep(1.0 / rate_hz)
+        self.calibration = QTRCalibration.from_samples(samples)
+        return self.calibration
+
+    def read(self, snapshot=None) -> LineReading:
+        """One tick: a single read of the raw array (or from `snapshot`)."""
+        raw = self.read_raw(snapshot)
+        values = normalize(raw, self._calibration(len(raw)), self.white_line)
+        position, lost = line_position(values, self.threshold, self.window, self._last)
+        self._last = float(position[0])
+        return LineReading(raw, values, self._last, bool(lost[0]))
+
+    def process(self, raw) -> LineBatch:
+        """Normalize and locate the line for recorded raw arrays (ticks, sensors)."""
+        raw = np.atleast_2d(np.asarray(raw, dtype=np.float64))
+        values = normalize(raw, self._calibration(raw.shape[1]), self.white_line)
+        position, lost = line_position(values, self.threshold, self.window)
+        return LineBatch(values, position, lost)
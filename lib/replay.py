@@ -0,0 +1,297 @@
+### lib/replay.py
+
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Union
+import numpy as np
+from smd.red import Red, Index
+from lib.module_cache import MODULE_BIT_OFFSETS, encode_modules
+from lib.poller import Sample
+from lib.scheduler import EffectScheduler
+from lib.smd_gateway import SMDGateway
+from lib.telemetry import TelemetryRecorder
+
+REPLAY_PORT = "replay://"
+
+
+class ReplayFinished(EOFError):
+    """Raised by a read after the end of a (non-looping) recording."""
+
+
+class ReplayWrite(NamedTuple):
+    """A write made during replay, stamped with the replay time."""
+    t: float
+    device_id: int
+    index: Index
+    value: Any
+
+
+class ReplayMaster:
+    """
+    Stand-in for smd.red.Master that answers get_variables() from a
+    telemetry recording (see TelemetryRecorder) instead of the bus.
+
+    Reads return the row recorded at or just before the replay clock.
+    With realtime=False the clock only moves when the caller sleeps or
+    steps through ticks(), so a replay is deterministic and runs as fast
+    as the script allows; with realtime=True it follows the host clock
+    scaled by `speed`. Writes are not sent anywhere: they are appended
+    to `writes` with the replay time, for comparison between runs.
+    """
+    def __init__(self, recording: np.ndarray, realtime: bool = False,
+                 speed: float = 1.0, loop: bool = False):
+        if len(recording) == 0:
+            raise ValueError("cannot replay an empty recording")
+        if speed <= 0:
+            raise ValueError(f"speed must be positive, got {speed}")
+        self.realtime = realtime
+        self.speed = speed
+        self.loop = loop
+        self._t = np.ascontiguousarray(recording['t'], dtype=np.float64)
+        self._columns: Dict[Index, np.ndarray] = {
+            Index[name]: recording[name] for name in recording.dtype.names
+            if name in Index.__members__}
+        self.start = float(self._t[0])
+        self.end = float(self._t[-1])
+        self._now = self.start
+        self._elapsed = 0.0
+        self._host_start = time.monotonic()
+        self._drivers: Dict[int, Red] = {}
+        self._modules: Dict[int, List[str]] = {}
+        self.writes: List[ReplayWrite] = []
+        self.reads = 0
+
+    # Replay clock
+    def clock(self) -> float:
+        """Current replay time, in the recording's time base."""
+        if not self.realtime:
+            return self._now
+        now = self.start + (time.monotonic() - self._host_start) * self.speed
+        span = self.end - self.start
+        if self.loop and span > 0 and now > self.end:
+            now = self.start + (now - self.start) % span
+        return now
+
+    def elapsed(self) -> float:
+        """Replay time since the start, counting on through loops."""
+        if self.realtime:
+            return (time.monotonic() - self._host_start) * self.speed
+        return self._elapsed
+
+    def sleep(self, seconds: float):
+        """Wait in replay time (only advances the clock when not realtime)."""
+        if self.realtime:
+            time.sleep(max(0.0, seconds) / self.speed)
+        else:
+            self._now += max(0.0, seconds)
+            self._elapsed += max(0.0, seconds)
+            span = self.end - self.start
+            if self.loop and span > 0 and self._now > self.end:
+                self._now = self.start + (self._now - self.start) % span
+
+    def ticks(self) -> Iterator[float]:
+        """Step the clock to each recorded row in turn (not realtime)."""
+        if self.realtime:
+            raise RuntimeError("ticks() steps the clock; use realtime=False")
+        for t in self._t.tolist():
+            self._elapsed += max(0.0, t - self._now)
+            self._now = t
+            yield t
+
+    @property
+    def finished(self) -> bool:
+        return not self.loop and self.clock() > self.end
+
+    def _row(self) -> int:
+        if self.finished:
+            raise ReplayFinished(f"replay reached the end of the recording ({self.end:.3f} s)")
+        return max(0, int(np.searchsorted(self._t, self.clock(), side='right')) - 1)
+
+    # Master API
+    def attach(self, driver: Red):
+        self._drivers[driver.vars[Index.DeviceID].value()] = driver
+
+    def detach(self, id: int):
+        self._drivers.pop(id, None)
+
+    def attached(self):
+        return list(self._drivers)
+
+    def set_connected_modules(self, id: int, modules: list):
+        self._modules[id] = list(modules)
+
+    def get_variables(self, id: int, index_list: list):
+        if len(index_list) == 0:
+            raise IndexError("Given index list is empty!")
+        row = self._row()
+        self.reads += 1
+        return [self._value(id, Index(int(index)), row) for index in index_list]
+
+    def _value(self, id: int, index: Index, row: int):
+        column = self._columns.get(index)
+        if column is not None:
+            return column[row].tolist()
+        if index == Index.connected_bitfield:
+            bits = encode_modules(self._modules.get(id, ()))
+            return [bits & 0xFFFFFFFF, bits >> 32]
+        if index == Index.DeviceID:
+            return id
+        raise KeyError(f"{index.name} is not in the recording")
+
+    def set_variables(self, id: int, idx_val_pairs=[], ack=False):
+        if len(idx_val_pairs) == 0:
+            raise IndexError("Given id, value pair list is empty!")
+        now = self.clock()
+        for index, value in idx_val_pairs:
+            self.writes.append(ReplayWrite(now, id, Index(int(index)), value))
+        return [value for _, value in idx_val_pairs] if ack else None
+
+    def set_variables_sync(self, index: Index, id_val_pairs=[]):
+        now = self.clock()
+        for dev_id, value in id_val_pairs:
+            self.writes.append(ReplayWrite(now, dev_id, Index(int(index)), value))
+
+    def goTo(self, id: int, target_position, time_=0, maxSpeed=0, accel=0, **kwargs):
+        self.set_variables(id, [[Index.PositionControlMode, 1]])
+        self.set_variables(id, [[Index.SCurveTime, time_], [Index.SCurveMaxVelocity, maxSpeed], [Index.ScurveAccel, accel]])
+        self.set_variables(id, [[Index.SCurveSetpoint, target_position]])
+
+    def close(self):
+        pass
+
+    # SDK convenience getters/setters used by the wrappers
+    def _read_module(self, id: int, family: str, module_id: int):
+        return self.get_variables(id, [Index[f"{family}_{module_id}"]])[0]
+
+    def get_button(self, id: int, module_id: int):
+        return self._read_module(id, 'Button', module_id)
+
+    def get_light(self, id: int, module_id: int):
+        return self._read_module(id, 'Light', module_id)
+
+    def get_distance(self, id: int, module_id: int):
+        return self._read_module(id, 'Distance', module_id)
+
+    def set_rgb(self, id: int, module_id: int, red: int, green: int, blue: int):
+        self.set_variables(id, [[Index[f"RGB_{module_id}"], red + green * (2**8) + blue * (2**16)]])
+
+    def set_buzzer(self, id: int, module_id: int, note_frequency: int):
+        self.set_variables(id, [[Index[f"Buzzer_{module_id}"], note_frequency]])
+
+
+def recorded_modules(recording: np.ndarray) -> List[str]:
+    """Module names ('Distance_1', ...) that have a column in a recording."""
+    return [name for name in recording.dtype.names
+            if name.rpartition('_')[0] in MODULE_BIT_OFFSETS]
+
+
+class ReplayGateway(SMDGateway):
+    """
+    SMDGateway that plays back a telemetry recording, for benchmarking
+    and regression-testing scripts without hardware.
+
+    It is a full SMDGateway, so every wrapper and script works unchanged;
+    only the bus is replaced by a ReplayMaster. Polling does not start a
+    thread: polled reads are answered from the recording at the current
+    replay time, which keeps fast replays deterministic. Timed effects
+    (blink_async, beep_async, rule effects) run on the replay clock as
+    well: their steps are sent while the script sleeps through them,
+    stamped with their own deadlines (with ticks(), at the next row).
+    Waiting on an effect handle would block, since nothing else
+    advances the clock.
+
+    Usage:
+        gw = ReplayGateway("run.tlm")              # as fast as possible
+        gw = ReplayGateway("run.tlm", realtime=True, speed=2.0)
+        try:
+            run(gw, sleep=gw.sleep)                # the script's main loop
+        except ReplayFinished:
+            pass
+        gw.writes                                  # [ReplayWrite(t, dev, index, value), ...]
+    """
+    def __init__(
+        self,
+        recording: Union[str, np.ndarray],
+        realtime: bool = False,
+        speed: float = 1.0,
+        loop: bool = False,
+        device_id: int = 0,
+        modules: Optional[List[str]] = None
+    ):
+        """
+        recording: path of a TelemetryRecorder file, or a loaded array.
+        realtime, speed: follow the host clock (scaled by speed) instead
+                          of advancing only on sleep() / ticks().
+        loop: start over at the end instead of raising ReplayFinished.
+        modules: registered module list (default: the recorded ones).
+        """
+        if isinstance(recording, str):
+            recording = TelemetryRecorder.load(recording)
+        self.recording = recording
+        self._polled: frozenset = frozenset()
+        super().__init__(
+            REPLAY_PORT, device_id=device_id,
+            modules_override=recorded_modules(recording) if modules is None else modules,
+            module_cache=False,
+            master=ReplayMaster(recording, realtime=realtime, speed=speed, loop=loop))
+        # loops such as RuleEngine.run() wait through gw._sleep; route it
+        # here so effects keep stepping on the replay clock. They schedule
+        # on gw._clock, which must not jump back when a loop wraps: give
+        # them elapsed time and keep clock() for picking the row
+        self._sleep = self.sleep
+        self._clock = self._master.elapsed
+
+    @property
+    def time(self) -> float:
+        """Current replay time, in the recording's time base."""
+        return self._master.clock()
+
+    @property
+    def finished(self) -> bool:
+        return self._master.finished
+
+    @property
+    def writes(self) -> List[ReplayWrite]:
+        return self._master.writes
+
+    def sleep(self, seconds: float):
+        """Drop-in for time.sleep() in scripts under replay; runs effects falling due."""
+        master = self._master
+        target = master.elapsed() + max(0.0, seconds)
+        scheduler = self._scheduler
+        while scheduler is not None:
+            deadline = scheduler.next_deadline()
+            if deadline is None or deadline > target:
+                break
+            master.sleep(deadline - master.elapsed())
+            scheduler.run_due()
+        master.sleep(target - master.elapsed())
+
+    def ticks(self) -> Iterator[float]:
+        """Step through every recorded row; yields its time."""
+        for t in self._master.ticks():
+            scheduler = self._scheduler
+            while scheduler is not None:
+                deadline = scheduler.next_deadline()
+                if deadline is None or deadline > self._master.elapsed():
+                    break
+                scheduler.run_due()
+            yield t
+
+    def _make_scheduler(self) -> EffectScheduler:
+        return EffectScheduler(self, clock=self._master.elapsed, threaded=False)
+
+    # Polling is served straight from the recording
+    def start_polling(self, rates: Dict[Any, float]):
+        indexes = set()
+        for sensor in rates:
+            indexes.update(sensor.indexes() if hasattr(sensor, 'indexes') else [sensor])
+        self._polled = frozenset(indexes)
+        return None
+
+    def stop_polling(self):
+        self._polled = frozenset()
+
+    def cached(self, index: Index) -> Optional[Sample]:
+        if index not in self._polled:
+            return None
+        return Sample(self._master.get_variables(self.device_id, [index])[0], time.monotonic())
@@ -0,0 +1,344 @@
+### lib/rules.py
+
+import operator
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from smd.red import Index
+
+
+class _Tick:
+    """Per-tick memo so each signal is decoded and each condition evaluated once."""
+    __slots__ = ("snapshot", "values", "results")
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.values: Dict[int, Any] = {}
+        self.results: Dict[int, bool] = {}
+
+    def value(self, signal: "Signal"):
+        key = id(signal)
+        if key not in self.values:
+            self.values[key] = signal.read(self)
+        return self.values[key]
+
+    def result(self, condition: "Condition") -> bool:
+        key = id(condition)
+        if key not in self.results:
+            self.results[key] = condition._evaluate(self)
+        return self.results[key]
+
+
+class Condition:
+    """Boolean expression over signals; combine with &, | and ~."""
+    def _evaluate(self, tick: _Tick) -> bool:
+        raise NotImplementedError
+
+    def signals(self) -> List["Signal"]:
+        raise NotImplementedError
+
+    def __and__(self, other: "Condition") -> "Condition":
+        return _Combined(all, [self, _condition(other)])
+
+    def __or__(self, other: "Condition") -> "Condition":
+        return _Combined(any, [self, _condition(other)])
+
+    def __invert__(self) -> "Condition":
+        return _Not(self)
+
+
+class _Combined(Condition):
+    def __init__(self, combine, parts: List[Condition]):
+        self._combine = combine
+        self._parts = parts
+
+    def _evaluate(self, tick):
+        # evaluate every part, so stateful comparisons always see the tick
+        return self._combine([tick.result(p) for p in self._parts])
+
+    def signals(self):
+        return [s for p in self._parts for s in p.signals()]
+
+
+class _Not(Condition):
+    def __init__(self, part: Condition):
+        self._part = part
+
+    def _evaluate(self, tick):
+        return not tick.result(self._part)
+
+    def signals(self):
+        return self._part.signals()
+
+
+class _Compare(Condition):
+    """signal <op> threshold, optionally with hysteresis on the way back."""
+    _OPS = {'<': operator.lt, '<=': operator.le, '>': operator.gt,
+            '>=': operator.ge, '==': operator.eq, '!=': operator.ne}
+
+    def __init__(self, signal: "Signal", op: str, threshold):
+        self._signal = signal
+        self._op = op
+        self._test = self._OPS[op]
+        self._threshold = threshold
+        self._band = 0.0
+        self._state = False
+
+    def hysteresis(self, band: float) -> "_Compare":
+        """
+        Stay true until the value is `band` past the threshold, e.g.
+        (distance < 30).hysteresis(5) turns on below 30, off at 35 or more.
+        """
+        if self._op in ('==', '!='):
+            raise ValueError("hysteresis needs an ordering comparison (<, <=, >, >=)")
+        if band < 0:
+            raise ValueError(f"hysteresis band must not be negative, got {band}")
+        self._band = band
+        return self
+
+    def _evaluate(self, tick):
+        v = tick.value(self._signal)
+        threshold = self._threshold
+        if self._state and self._band:
+            # release only once past the band
+            threshold = threshold + self._band if self._op in ('<', '<=') else threshold - self._band
+        self._state = bool(self._test(v, threshold))
+        return self._state
+
+    def signals(self):
+        return [self._signal]
+
+
+class _Truthy(Condition):
+    def __init__(self, signal: "Signal"):
+        self._signal = signal
+
+    def _evaluate(self, tick):
+        return bool(tick.value(self._signal))
+
+    def signals(self):
+        return [self._signal]
+
+
+def _condition(cond) -> Condition:
+    if isinstance(cond, Signal):
+        return _Truthy(cond)
+    if isinstance(cond, Condition):
+        return cond
+    raise TypeError(f"expected a Condition or Signal, got {type(cond).__name__}")
+
+
+class Signal:
+    """
+    A value decoded from the tick's snapshot; comparing it to a constant
+    gives a Condition. Build one from a wrapper's read method:
+    value(dist.read_cm), value(btn.is_pressed), value(pot.read).
+    """
+    __hash__ = object.__hash__
+
+    def __init__(self, read: Callable[[Any], Any], indexes: Iterable[Index]):
+        self._read = read
+        self.indexes = list(indexes)
+
+    def read(self, tick: _Tick):
+        return self._read(tick.snapshot)
+
+    def map(self, fn: Callable[[Any], Any]) -> "Signal":
+        """Signal of fn(value), e.g. value(joy.read_axes).map(lambda xy: xy[0])."""
+        return _Mapped(self, fn)
+
+    def __lt__(self, other): return _Compare(self, '<', other)
+    def __le__(self, other): return _Compare(self, '<=', other)
+    def __gt__(self, other): return _Compare(self, '>', other)
+    def __ge__(self, other): return _Compare(self, '>=', other)
+    def __eq__(self, other): return _Compare(self, '==', other)
+    def __ne__(self, other): return _Compare(self, '!=', other)
+
+    # a bare signal used in a boolean expression means "is truthy"
+    def __and__(self, other): return _Truthy(self) & other
+    def __or__(self, other): return _Truthy(self) | other
+    def __invert__(self): return ~_Truthy(self)
+
+
+class _Mapped(Signal):
+    def __init__(self, source: Signal, fn: Callable[[Any], Any]):
+        super().__init__(None, source.indexes)
+        self._source = source
+        self._fn = fn
+
+    def read(self, tick):
+        return self._fn(tick.value(self._source))
+
+
+def value(read: Callable[..., Any], indexes: Optional[Iterable[Index]] = None) -> Signal:
+    """
+    Signal from a wrapper read method that accepts a snapshot; the
+    indexes come from the wrapper's indexes() unless given.
+    """
+    if indexes is None:
+        owner = getattr(read, '__self__', None)
+        if owner is None or not hasattr(owner, 'indexes'):
+            raise TypeError("pass indexes= for reads that are not wrapper methods")
+        indexes = owner.indexes()
+    return Signal(read, indexes)
+
+
+# Actions
+class Write(tuple):
+    """(Index, value) register write; merged with the tick's other writes into one frame."""
+    def __new__(cls, index: Index, val):
+        return super().__new__(cls, (index, val))
+
+
+def set_rgb(led, rgb: Tuple[int, int, int]) -> Write:
+    return Write(*led._gw.encode_rgb(led._id, rgb))
+
+
+def set_tone(buzzer, freq_hz: int) -> Write:
+    return Write(*buzzer._gw.encode_buzzer(buzzer._id, freq_hz))
+
+
+class effect:
+    """
+    Action that starts a timed effect (anything returning a handle with
+    cancel(), e.g. a blink_async or beep_async call) and cancels it when
+    the rule's condition turns false again.
+
+        rules.when(near).then(effect(lambda: buzz.beep_async(cycles=None)))
+    """
+    def __init__(self, start: Callable[[], Any]):
+        self._start = start
+        self._handle = None
+
+    def __call__(self):
+        if self._handle is None or getattr(self._handle, 'done', False):
+            self._handle = self._start()
+
+    def cancel(self):
+        handle, self._handle = self._handle, None
+        if handle is not None:
+            handle.cancel()
+
+
+class Rule:
+    """when(condition).then(actions).otherwise(actions); see RuleEngine."""
+    def __init__(self, condition: Condition):
+        self.condition = condition
+        self._then: List[Any] = []
+        self._otherwise: List[Any] = []
+        self.state: Optional[bool] = None
+        self.fired = 0
+
+    def then(self, *actions) -> "Rule":
+        """Run when the condition becomes true."""
+        self._then.extend(actions)
+        return self
+
+    def otherwise(self, *actions) -> "Rule":
+        """Run when the condition becomes false (and at start if it is false)."""
+        self._otherwise.extend(actions)
+        return self
+
+
+class RuleEngine:
+    """
+    Reactive rules over one gateway, evaluated in a single pass per tick.
+
+    Every tick reads all signals used by any rule in one read_many()
+    transaction, evaluates each signal and condition once, and runs a
+    rule's actions only when its condition changes state (the first
+    tick runs the matching branch to set the outputs). Register writes
+    from all rules that fired are merged into one gateway.write() frame
+    (later rules win on the same register), so the bus sees one read
+    and at most one write per tick. Leaving a rule's true state cancels
+    the effects it started.
+
+    Usage:
+        rules = RuleEngine(gw)
+        d = value(dist.read_cm)
+        rules.when((d < 30).hysteresis(5)) \\
+             .then(set_rgb(led, RED), effect(lambda: buzz.beep_async(cycles=None))) \\
+             .otherwise(set_rgb(led, OFF))
+        rules.run(rate_hz=20)
+    """
+    def __init__(self, gateway):
+        self._gw = gateway
+        self._rules: List[Rule] = []
+        self._indexes: Optional[List[Index]] = None
+        self.ticks = 0
+        self.fired = 0
+        self.frames_written = 0
+
+    def when(self, condition) -> Rule:
+        rule = Rule(_condition(condition))
+        self._rules.append(rule)
+        self._indexes = None
+        return rule
+
+    def indexes(self) -> List[Index]:
+        """Every index the rules read, deduplicated (compiled once)."""
+        if self._indexes is None:
+            self._indexes = list(dict.fromkeys(
+                idx for rule in self._rules for s in rule.condition.signals() for idx in s.indexes))
+        return self._indexes
+
+    def tick(self, snapshot=None) -> int:
+        """Evaluate every rule once (reading a snapshot unless given); returns rules fired."""
+        if snapshot is None:
+            snapshot = self._gw.read_many(self.indexes())
+        tick = _Tick(snapshot)
+        writes: Dict[Index, Any] = {}
+        calls: List[Callable[[], Any]] = []
+        fired = 0
+        for rule in self._rules:
+            state = tick.result(rule.condition)
+            if state == rule.state:
+                continue
+            rule.state = state
+            rule.fired += 1
+            fired += 1
+            if not state:
+                for action in rule._then:
+                    if isinstance(action, effect):
+                        action.cancel()
+            for action in rule._then if state else rule._otherwise:
+                if isinstance(action, Write):
+                    writes[action[0]] = action[1]
+                else:
+                    calls.append(action)
+        if writes and self._gw.write(list(writes.items())):
+            self.frames_written += 1
+        for call in calls:
+            call()
+        self.ticks += 1
+        self.fired += fired
+        return fired
+
+    def run(self, rate_hz: float = 20.0, stop_event: Optional[threading.Event] = None):
+        """
+        tick() at `rate_hz` on an absolute schedule until stop_event is
+        set, using the gateway's clock (so simulated or replayed
+        gateways run on their own time).
+        """
+        if rate_hz <= 0:
+            raise ValueError(f"rate_hz must be positive, got {rate_hz}")
+        clock, sleep = self._gw._clock, self._gw._sleep
+        period = 1.0 / rate_hz
+        next_t = clock()
+        try:
+            while stop_event is None or not stop_event.is_set():
+                self.tick()
+                next_t += period
+                delay = next_t - clock()
+                if delay > 0:
+                    sleep(delay)
+                else:
+                    next_t = clock()   # late: skip missed ticks
+        finally:
+            for rule in self._rules:
+                for action in rule._then:
+                    if isinstance(action, effect):
+                        action.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        return {'rules': len(self._rules), 'ticks': self.ticks,
+                'fired': self.fired, 'frames_written': self.frames_written}
@@ -0,0 +1,153 @@
+### lib/scheduler.py
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+from smd.red import Index
+
+# (offset in seconds from the effect start, [(Index, value), ...])
+Step = Tuple[float, List[Tuple[Index, Any]]]
+
+
+class EffectHandle:
+    """
+    Handle to a running effect.
+
+    Usage:
+        handle = led.blink_async(period=0.2)
+        ...
+        handle.cancel()
+    """
+    def __init__(self, scheduler: "EffectScheduler", steps: Iterator[Step],
+                 final: List[Tuple[Index, Any]], start: float):
+        self._scheduler = scheduler
+        self._steps = steps
+        self._next: Optional[Step] = next(steps, None)
+        self._final = final
+        self._start = start
+        self._cancelled = False
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancel(self):
+        """Stop the effect; its final writes (e.g. LED off) are still sent."""
+        if not self.done and not self._cancelled:
+            self._cancelled = True
+            self._scheduler._push(self._scheduler._clock(), self)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+
+class EffectScheduler:
+    """
+    Drives timed output effects (blink, beep, melodies) from one thread.
+
+    Effects are iterators of (offset, writes) steps; each step is queued
+    in a heap at its absolute deadline (effect start + offset), so long
+    effects do not accumulate sleep drift. An effect ends right after
+    its last step (add an empty step to hold a trailing pause). All
+    writes that fall due within the same `tick` are merged and sent as
+    one gateway frame.
+
+    With threaded=False no thread is started: the owner calls run_due()
+    whenever its `clock` passes next_deadline(). ReplayGateway does this
+    on the replay clock, so effects replay deterministically.
+    """
+    def __init__(self, gateway, tick: float = 0.001,
+                 clock: Callable[[], float] = time.monotonic, threaded: bool = True):
+        self._gw = gateway
+        self._tick = tick
+        self._clock = clock
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self.frames = 0
+        self.errors = 0
+        self._thread: Optional[threading.Thread] = None
+        if threaded:
+            self._thread = threading.Thread(target=self._run, name="EffectScheduler", daemon=True)
+            self._thread.start()
+
+    def schedule(self, steps: Iterable[Step], final: Iterable[Tuple[Index, Any]] = ()) -> EffectHandle:
+        """
+        Start an effect now. `final` writes are sent when the effect
+        finishes or is cancelled.
+        """
+        start = self._clock()
+        handle = EffectHandle(self, iter(steps), list(final), start)
+        self._push(start + handle._next[0] if handle._next else start, handle)
+        return handle
+
+    def next_deadline(self) -> Optional[float]:
+        """Clock time of the next queued step, or None if idle."""
+        with self._cond:
+            return self._heap[0][0] if self._heap else None
+
+    def stop(self, timeout: float = 1.0):
+        if self._thread is None:
+            self.run_due()   # send the final writes of cancelled effects
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _push(self, deadline: float, handle: EffectHandle):
+        with self._cond:
+            heapq.heappush(self._heap, (deadline, next(self._seq), handle))
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._heap:
+                        delay = self._heap[0][0] - self._clock()
+                        if delay <= 0:
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+                if self._stopped:
+                    return
+            self.run_due()
+
+    def run_due(self):
+        """Advance every effect due by now (plus `tick`) and send their writes as one frame."""
+        with self._cond:
+            now = self._clock()
+            due = []
+            while self._heap and self._heap[0][0] <= now + self._tick:
+                due.append(heapq.heappop(self._heap))
+
+        writes = {}
+        for _, _, handle in due:
+            if handle.done:
+                continue
+            if not handle.cancelled and handle._next is not None:
+                writes.update(handle._next[1])
+                handle._next = next(handle._steps, None)
+                if handle._next is not None:
+                    self._push(handle._start + handle._next[0], handle)
+                    continue
+            # finished or cancelled: final writes share this frame
+            writes.update(handle._final)
+            handle._done.set()
+
+        if writes:
+            try:
+                self._gw.write(writes.items())
+                self.frames += 1
+            except Exception:
+                self.errors += 1
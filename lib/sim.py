@@ -0,0 +1,268 @@
+### lib/sim.py
+
+import math
+import random
+import struct
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+from smd.red import Red, Index
+from lib.module_cache import MODULE_BIT_OFFSETS as _BIT_OFFSETS, encode_modules
+
+SIM_SCHEME = "sim://"
+
+
+def is_sim_port(port: str) -> bool:
+    return isinstance(port, str) and port.startswith(SIM_SCHEME)
+
+
+class SimulatedMaster:
+    """
+    In-process drop-in for smd.red.Master, for running the library and
+    benchmarks without an SMD Red board.
+
+    Frames are built with the SDK's own Red protocol class, so byte
+    counts match the real wire format. Each transaction is charged
+    (request + reply bytes) * 10 bits / baudrate plus a fixed device
+    turnaround, and the SDK's post-write sleep. With realtime=True that
+    time is actually slept; otherwise it only advances a virtual clock,
+    which also drives the sensor signals so runs are reproducible.
+
+    Sensor models: sine distance and light, periodic button presses,
+    triangle potentiometer, circling joystick, a line sweeping across
+    the QTR array and a noisy IMU. Modules that are not connected read
+    as zero.
+
+    Usage:
+        gw = SMDGateway("sim://", modules_override=DEFAULT_MODULES)
+        gw = SMDGateway("sim://?realtime=0&seed=3&scan_time=0")
+    """
+    def __init__(
+        self,
+        portname: str = SIM_SCHEME,
+        baudrate: int = 115200,
+        realtime: bool = True,
+        modules: Optional[List[str]] = None,
+        seed: int = 0,
+        turnaround: float = 0.0005,
+        scan_time: float = 5.5
+    ):
+        if baudrate > 12500000 or baudrate < 3053:
+            raise ValueError('Baudrate must be between 3.053 KBits/s and 12.5 MBits/s.')
+        opts = parse_qs(urlparse(portname).query) if is_sim_port(portname) else {}
+        self.baudrate = baudrate
+        self.realtime = _opt(opts, 'realtime', realtime, lambda v: v.lower() not in ('0', 'false', 'no'))
+        self.turnaround = _opt(opts, 'turnaround', turnaround, float)
+        self.scan_time = _opt(opts, 'scan_time', scan_time, float)
+        self._rng = random.Random(_opt(opts, 'seed', seed, int))
+        self._post_sleep = (10 / baudrate) * 12
+
+        self._drivers: Dict[int, Red] = {}
+        self._registers: Dict[int, Dict[Index, Any]] = {}
+        self._modules: Dict[int, set] = {}
+        self._default_modules = list(modules) if modules is not None else [
+            'Button_5', 'Light_5', 'Buzzer_5', 'Joystick_5', 'Distance_1',
+            'QTR_1', 'Pot_5', 'RGB_5', 'IMU_5']
+        self._t0 = time.monotonic()
+        self.virtual_time = 0.0
+        self.reset_stats()
+
+    # Statistics
+    def reset_stats(self):
+        self.frames = 0
+        self.bytes_tx = 0
+        self.bytes_rx = 0
+        self.bus_time = 0.0
+
+    def frame_time(self, tx_bytes: int, rx_bytes: int) -> float:
+        """Modelled bus time of one request/reply exchange."""
+        return (tx_bytes + rx_bytes) * 10 / self.baudrate + (self.turnaround if rx_bytes else 0.0)
+
+    def _transact(self, tx_bytes: int, rx_bytes: int, extra: float = 0.0):
+        dt = self.frame_time(tx_bytes, rx_bytes) + extra
+        self.frames += 1
+        self.bytes_tx += tx_bytes
+        self.bytes_rx += rx_bytes
+        self.bus_time += dt
+        self.virtual_time += dt
+        if self.realtime:
+            time.sleep(dt)
+
+    def clock(self) -> float:
+        """Simulation time driving the sensor signals."""
+        return time.monotonic() - self._t0 if self.realtime else self.virtual_time
+
+    def sleep(self, seconds: float):
+        """Wait on the simulation clock (only advances it when not realtime)."""
+        if self.realtime:
+            time.sleep(seconds)
+        else:
+            self.virtual_time += max(0.0, seconds)
+
+    # Master API
+    def attach(self, driver: Red):
+        dev_id = driver.vars[Index.DeviceID].value()
+        self._drivers[dev_id] = driver
+        self._registers.setdefault(dev_id, {})
+        self._modules.setdefault(dev_id, set(self._default_modules))
+
+    def detach(self, id: int):
+        self._drivers.pop(id, None)
+
+    def attached(self):
+        return list(self._drivers)
+
+    def _driver(self, id: int) -> Red:
+        if id not in self._drivers:
+            raise ValueError("{} is not an attached ID!".format(id))
+        return self._drivers[id]
+
+    def set_variables(self, id: int, idx_val_pairs=[], ack=False):
+        if len(idx_val_pairs) == 0:
+            raise IndexError("Given id, value pair list is empty!")
+        driver = self._driver(id)
+        index_list = [pair[0] for pair in idx_val_pairs]
+        value_list = [pair[1] for pair in idx_val_pairs]
+        frame = driver.set_variables(index_list, value_list, ack)
+        self._transact(len(frame), driver.get_ack_size() if ack else 0, self._post_sleep)
+        regs = self._registers[id]
+        for index, value in zip(index_list, value_list):
+            regs[Index(int(index))] = driver.vars[int(index)].value()
+        if ack:
+            return [driver.vars[index].value() for index in index_list]
+        return None
+
+    def get_variables(self, id: int, index_list: list):
+        if len(index_list) == 0:
+            raise IndexError("Given index list is empty!")
+        driver = self._driver(id)
+        frame = driver.get_variables(index_list)
+        self._transact(len(frame), driver.get_ack_size())
+        return [self._value(id, Index(int(index))) for index in index_list]
+
+    def set_variables_sync(self, index: Index, id_val_pairs=[]):
+        fmt = Red(255).vars[index].type()
+        size = 6 + 1 + len(id_val_pairs) * (1 + struct.calcsize('<' + fmt)) + 4
+        self._transact(size, 0, self._post_sleep)
+        for dev_id, value in id_val_pairs:
+            if dev_id in self._registers:
+                self._registers[dev_id][Index(int(index))] = value
+
+    def ping(self, id: int) -> bool:
+        self._transact(10, 10)
+        return id in self._drivers
+
+    def scan_modules(self, id: int) -> list:
+        self._transact(10, 0, self.scan_time)
+        self._transact(*self._read_sizes(id, [Index.connected_bitfield]))
+        return sorted(self._modules.get(id, ()), key=_module_order)
+
+    def set_connected_modules(self, id: int, modules: list):
+        self._modules[id] = set(modules)
+        for _ in range(11):
+            self._transact(12, 0, self._post_sleep)
+        self._transact(10, 0, self._post_sleep)
+
+    def close(self):
+        pass
+
+    # SDK convenience getters/setters used by the wrappers
+    def _read_module(self, id: int, family: str, module_id: int):
+        return self.get_variables(id, [Index[f"{family}_{module_id}"]])[0]
+
+    def get_button(self, id: int, module_id: int):
+        return self._read_module(id, 'Button', module_id)
+
+    def get_light(self, id: int, module_id: int):
+        return self._read_module(id, 'Light', module_id)
+
+    def get_distance(self, id: int, module_id: int):
+        return self._read_module(id, 'Distance', module_id)
+
+    def get_joystick(self, id: int, module_id: int):
+        return self._read_module(id, 'Joystick', module_id)
+
+    def get_qtr(self, id: int, module_id: int):
+        return self._read_module(id, 'QTR', module_id)
+
+    def get_potentiometer(self, id: int, module_id: int):
+        return self._read_module(id, 'Pot', module_id)
+
+    def get_imu(self, id: int, module_id: int):
+        return self._read_module(id, 'IMU', module_id)
+
+    def set_rgb(self, id: int, module_id: int, red: int, green: int, blue: int):
+        self.set_variables(id, [[Index[f"RGB_{module_id}"], red + green * (2**8) + blue * (2**16)]])
+
+    def set_buzzer(self, id: int, module_id: int, note_frequency: int):
+        self.set_variables(id, [[Index[f"Buzzer_{module_id}"], note_frequency]])
+
+    def goTo(self, id: int, target_position, time_=0, maxSpeed=0, accel=0, **kwargs):
+        self.set_variables(id, [[Index.PositionControlMode, 1]])
+        self.set_variables(id, [[Index.SCurveTime, time_], [Index.SCurveMaxVelocity, maxSpeed], [Index.ScurveAccel, accel]])
+        self.set_variables(id, [[Index.SCurveSetpoint, target_position]])
+
+    # Simulation state
+    def register(self, id: int, index: Index):
+        """Last value written to `index` on device `id` (None if never)."""
+        return self._registers.get(id, {}).get(index)
+
+    def _read_sizes(self, id: int, index_list: list):
+        driver = self._driver(id)
+        return len(driver.get_variables(index_list)), driver.get_ack_size()
+
+    def _value(self, id: int, index: Index):
+        name = index.name
+        family, _, slot = name.rpartition('_')
+        if family in _BIT_OFFSETS and slot.isdigit():
+            if name not in self._modules.get(id, ()):
+                return self._zero(id, index)
+            return self._signal(family, int(slot))
+        if index == Index.connected_bitfield:
+            bits = encode_modules(self._modules.get(id, ()))
+            return [bits & 0xFFFFFFFF, bits >> 32]
+        if index == Index.PresentPosition:
+            return self._registers[id].get(Index.SetPosition, 0.0)
+        if index == Index.PresentVelocity:
+            return self._registers[id].get(Index.SetVelocity, 0.0)
+        if index == Index.DeviceID:
+            return id
+        return self._registers[id].get(index, self._zero(id, index))
+
+    def _zero(self, id: int, index: Index):
+        fmt = self._drivers[id].vars[index].type()
+        return [0] * len(fmt) if len(fmt) > 1 else 0
+
+    def _signal(self, family: str, slot: int):
+        t = self.clock() + slot
+        noise = self._rng.gauss
+        if family == 'Distance':
+            return max(0, int(round(50 + 40 * math.sin(2 * math.pi * t / 5) + noise(0, 0.5))))
+        if family == 'Light':
+            return max(0, int(round(300 + 200 * math.sin(2 * math.pi * t / 20) + noise(0, 2))))
+        if family == 'Button':
+            return 1 if (t % 3.0) < 0.5 else 0
+        if family == 'Pot':
+            phase = (t / 4.0) % 2.0
+            return int(255 * (phase if phase < 1 else 2 - phase))
+        if family == 'Joystick':
+            angle = 2 * math.pi * t / 6
+            return [int(100 * math.cos(angle)), int(100 * math.sin(angle)), 1 if (t % 4.0) < 0.3 else 0]
+        if family == 'QTR':
+            # a 1-sensor-wide dark line sweeping back and forth over 3 sensors
+            line = 1 + math.sin(2 * math.pi * t / 3)
+            return [max(0, min(255, int(255 * math.exp(-((i - line) ** 2) / 0.5) + noise(0, 3))))
+                    for i in range(3)]
+        if family == 'IMU':
+            return [10 * math.sin(2 * math.pi * t / 7) + noise(0, 0.3),
+                    5 * math.cos(2 * math.pi * t / 9) + noise(0, 0.3)]
+        return 0
+
+
+def _module_order(name: str):
+    family, _, slot = name.rpartition('_')
+    return (_BIT_OFFSETS.get(family, 99), int(slot) if slot.isdigit() else 0)
+
+
+def _opt(opts: dict, key: str, default, cast):
+    return cast(opts[key][-1]) if key in opts else default
@@ -1,8 +1,18 @@
 ### lib/smd_gateway.py
 
+import contextlib
+import functools
+import re
+import threading
 import time
-from typing import Optional, Tuple, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Tuple, List, Dict, Iterable, Any, Union, Callable, Set
 from smd.red import Master, Red, Index, OperationMode
+from lib.io_worker import BusLock, IOWorker, Priority, write_priority
+from lib.module_cache import ModuleCache, port_identity
+from lib.poller import Sample, SensorPoller
+from lib.scheduler import EffectScheduler
+from lib.sim import SimulatedMaster, is_sim_port
 
 # If scan_modules() ever returns [] or None, we'll fall back
 # to this hard-coded list of your nine add-on modules:
@@ -12,155 +22,786 @@ DEFAULT_MODULES = [
     'Pot_5',    'RGB_5',   'IMU_5'
 ]
 
+# Capability → substrings looked up (case-insensitively) in smd.red.Index
+# names, in order of preference. A match must be a per-module family
+# ('<Family>_<n>', e.g. Pot_1..Pot_5) or a member named exactly like the
+# substring; anything else (SetManualPot, ScurveAccel, ...) is ignored.
+CAPABILITIES = {
+    'button':     ('button',),
+    'light':      ('light',),
+    'distance':   ('distance',),
+    'buzzer':     ('buzzer',),
+    'rgb':        ('rgb',),
+    'qtr':        ('qtr',),
+    'position':   ('qtrposition', 'position'),
+    'pot':        ('pot',),
+    'joy':        ('joy',),
+    'joy_button': ('joybutton', 'joystickbutton'),
+    'accel':      ('accel',),
+    'gyro':       ('gyro',),
+    'angles':     ('imu',),
+}
+# Capabilities carried inside another capability's value when the SDK
+# has no Index of their own (the joystick button is Joystick_n[2]).
+CAPABILITY_FALLBACKS = {
+    'joy_button': 'joy',
+}
+
+_FAMILY_MEMBER = re.compile(r'^([A-Za-z]+)_(\d+)$')
+_capability_table: Optional[Dict[str, Union[str, Index, AttributeError]]] = None
+# capabilities already reported missing (warned once, on first use)
+_capability_warned: set = set()
+
+
+def _resolve_capability(key: str) -> Union[str, Index]:
+    for pattern in CAPABILITIES.get(key, (key.lower(),)):
+        families, members = set(), set()
+        for m in Index:
+            name = m.name.lower()
+            if pattern not in name:
+                continue
+            fam = _FAMILY_MEMBER.match(m.name)
+            if fam:
+                families.add(fam.group(1))
+            elif name == pattern:
+                members.add(m)
+        found = sorted(families) + sorted(m.name for m in members)
+        if len(found) > 1:
+            raise AttributeError(f"Ambiguous Index match for '{key}': {', '.join(found)}")
+        if found:
+            return families.pop() if families else members.pop()
+    if key in CAPABILITY_FALLBACKS:
+        return _resolve_capability(CAPABILITY_FALLBACKS[key])
+    raise AttributeError(f"No Index member matching '{key}'")
+
+
+def capability_table() -> Dict[str, Union[str, Index, AttributeError]]:
+    """
+    Capability → Index family name (per-module) or Index member, built
+    once per process on first use. Unresolvable capabilities map to the
+    AttributeError explaining why.
+    """
+    global _capability_table
+    if _capability_table is None:
+        table = {}
+        for key in CAPABILITIES:
+            try:
+                table[key] = _resolve_capability(key)
+            except AttributeError as e:
+                table[key] = e
+        _capability_table = table
+    return _capability_table
+
+
+@functools.lru_cache(maxsize=None)
+def capability_index(key: str, module_id: int) -> Index:
+    """Index holding capability `key` for module `module_id`."""
+    target = capability_table().get(key)
+    if target is None:
+        target = _resolve_capability(key)
+    if isinstance(target, AttributeError):
+        if key not in _capability_warned:
+            _capability_warned.add(key)
+            print(f"⚠ {target}; '{key}' readings unavailable.")
+        raise target
+    if isinstance(target, str):
+        try:
+            return Index[f"{target}_{module_id}"]
+        except KeyError:
+            raise ValueError(f"Invalid module_id {module_id} for {target}") from None
+    return target
+
+
+def unpack_axes(vals) -> Tuple[int, int]:
+    """Decode a joystick reading; some SDKs pack both axes in one int."""
+    if isinstance(vals, (list, tuple)):
+        return tuple(vals[:2])
+    return (vals >> 8, vals & 0xFF)
+
+
+def unpack_button(vals) -> int:
+    """Joystick button state, standalone or as the third joystick field."""
+    if isinstance(vals, (list, tuple)):
+        return vals[2]
+    return vals
+
+
+def as_vector(vals) -> tuple:
+    """Decode an IMU reading into a tuple of axis values."""
+    return tuple(vals) if isinstance(vals, (list, tuple)) else (vals,)
+
+
+class Snapshot:
+    """
+    Values of several indexes read from one device in a single
+    get_variables transaction.
+
+    Usage:
+        snap = gw.snapshot(btn, pot, imu)
+        pressed = btn.is_pressed(snap)
+        roll, pitch = imu.read_angles(snap)
+    """
+    def __init__(self, device_id: int, values: Dict[Index, Any], timestamp: float):
+        self.device_id = device_id
+        self.timestamp = timestamp
+        self._values = values
+
+    def __getitem__(self, index: Index):
+        try:
+            return self._values[index]
+        except KeyError:
+            raise KeyError(f"{index!r} was not read in this snapshot") from None
+
+    def __contains__(self, index: Index) -> bool:
+        return index in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, index: Index, default=None):
+        return self._values.get(index, default)
+
+    def indexes(self) -> List[Index]:
+        return list(self._values)
+
+    def __repr__(self):
+        items = ", ".join(f"{Index(i).name}={v!r}" for i, v in self._values.items())
+        return f"Snapshot(device_id={self.device_id}, t={self.timestamp:.6f}, {items})"
+
+
+_UNSET = object()
+
+
+class WriteBatch:
+    """
+    Register writes collected inside a batch() block, per device, the
+    last write to each index winning. Sent when the block exits.
+
+    Usage:
+        with gw.batch() as batch:
+            led.on((255, 0, 0))
+            buzz.on(880)
+            motor.set_pwm(40)
+        batch.frames_saved                  # 2: three writes, one frame
+    """
+    def __init__(self):
+        self.pending: Dict[int, Dict[Index, Any]] = {}
+        self.forced: Dict[int, Set[Index]] = {}
+        self.writes = 0     # write() calls collected
+        self.frames = 0     # frames sent on exit
+
+    @property
+    def frames_saved(self) -> int:
+        """Collected write() calls minus the frames actually sent for them."""
+        return max(0, self.writes - self.frames)
+
+    def add(self, device_id: int, pairs: Iterable[Tuple[Index, Any]], force: bool = False):
+        registers = self.pending.setdefault(device_id, {})
+        for idx, val in pairs:
+            # re-insert so the frame keeps the order of the last writes
+            registers.pop(idx, None)
+            registers[idx] = val
+            if force:
+                self.forced.setdefault(device_id, set()).add(idx)
+        self.writes += 1
+
+    def changed(self, gateway: "SMDGateway") -> List[Tuple[Index, Any]]:
+        """Pairs for `gateway`'s device that differ from its shadow (or were forced)."""
+        forced = self.forced.get(gateway.device_id, ())
+        return [(idx, val) for idx, val in self.pending.get(gateway.device_id, {}).items()
+                if idx in forced or gateway._shadow.get(idx, _UNSET) != val]
+
+    def discard(self, device_id: int, indexes: Iterable[Index]):
+        """Forget held-back values of `indexes`, e.g. once newer ones were sent."""
+        registers = self.pending.get(device_id, {})
+        forced = self.forced.get(device_id, set())
+        for idx in indexes:
+            registers.pop(idx, None)
+            forced.discard(idx)
+
+    def _hand_over(self, outer: "WriteBatch", device_id: int):
+        registers = outer.pending.setdefault(device_id, {})
+        for idx, val in self.pending.pop(device_id, {}).items():
+            registers.pop(idx, None)
+            registers[idx] = val
+        forced = self.forced.pop(device_id, None)
+        if forced:
+            outer.forced.setdefault(device_id, set()).update(forced)
+
+
+@contextlib.contextmanager
+def collect_writes(gateways: List["SMDGateway"],
+                   flush: Callable[[WriteBatch, List["SMDGateway"]], None]):
+    """
+    Divert the calling thread's writes to `gateways` into one WriteBatch
+    and call flush(batch, gateways) when the block exits normally. If the
+    block raises, the collected writes are dropped. Inside an enclosing
+    batch on the same gateway the writes join the outer batch instead.
+    """
+    batch = WriteBatch()
+    stacks = [gw._batch_stack() for gw in gateways]
+    for stack in stacks:
+        stack.append(batch)
+    try:
+        yield batch
+    finally:
+        for stack in stacks:
+            stack.pop()
+    top, outers = [], []
+    for gw, stack in zip(gateways, stacks):
+        if stack:
+            batch._hand_over(stack[-1], gw.device_id)
+            if stack[-1] not in outers:
+                outers.append(stack[-1])
+        elif gw.device_id in batch.pending:
+            top.append(gw)
+    for outer in outers:
+        outer.writes += batch.writes
+    if top:
+        flush(batch, top)
+
+
+def _serialized(priority):
+    """
+    Run a gateway method while holding its bus lock, or on the I/O
+    worker when one is running. `priority` is a Priority or a function
+    of the method's first argument returning one.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, first, *args, **kwargs):
+            worker = self._worker
+            # a thread already holding the bus lock must not wait on the worker
+            if worker is None or worker.in_worker() or self._lock.held():
+                with self._lock:
+                    return method(self, first, *args, **kwargs)
+            if callable(priority):
+                first = list(first)
+                prio = priority(first)
+            else:
+                prio = priority
+            return worker.call(method, self, first, *args, priority=prio, **kwargs)
+        return wrapper
+    return decorate
+
+
 class SMDGateway:
-    def __init__(self, port: str, baudrate: int = 115200, device_id: int = 0, scan_timeout: float = 0.1, modules_override: Optional[List[str]] = None):
+    def __init__(
+        self,
+        port: str,
+        baudrate: int = 115200,
+        device_id: int = 0,
+        scan_timeout: float = 0.1,
+        modules_override: Optional[List[str]] = None,
+        module_cache: Union[bool, str, ModuleCache] = False,
+        master: Optional[Master] = None,
+        lock: Optional[BusLock] = None
+    ):
         """
-        port, baudrate, device_id: as before.
+        port, baudrate, device_id: as before. A port starting with
+                          "sim://" uses the in-process SimulatedMaster.
         scan_timeout: how long to wait after enabling scan engine.
         modules_override: optional list of module names to register
                           (skips the auto-scan entirely).
+        module_cache: reuse the modules found by the last scan of this
+                          port/device (True for ~/.cache, a cache file
+                          path or a ModuleCache); off by default.
+        master, lock: share an open Master (and its bus lock) with
+                          other gateways on the same port; see GatewayPool.
         """
-        self._master = Master(port, baudrate)
+        self._owns_master = master is None
+        if master is not None:
+            self._master = master
+        elif is_sim_port(port):
+            self._master = SimulatedMaster(port, baudrate)
+        else:
+            self._master = Master(port, baudrate)
         self.device_id = device_id
-
+        # serializes frames between callers and the background poller
+        self._lock = lock if isinstance(lock, BusLock) else BusLock(lock)
+        self._poller: Optional[SensorPoller] = None
+        self._scheduler: Optional[EffectScheduler] = None
+        self._callbacks: Optional[ThreadPoolExecutor] = None
+        self._worker: Optional[IOWorker] = None
+        # set by GatewayPool: views of one bus share the pool's I/O worker
+        self._pool = None
+        # called with every Snapshot read; replaced, never mutated
+        self._listeners: List[Callable[[Snapshot], None]] = []
+        self.listener_errors = 0
+        # last value written per Index (the module is part of the Index)
+        self._shadow: Dict[Index, Any] = {}
+        # per-thread stack of open batch() blocks
+        self._batches = threading.local()
+        self.frames_written = 0
+        self.writes_skipped = 0
+        # the simulator has its own clock; use it for waits and timings
+        self._clock = getattr(self._master, 'clock', time.monotonic)
+        self._sleep = getattr(self._master, 'sleep', time.sleep)
         # Attach the Red protocol
-        self._master.attach(Red(device_id))
+        self._driver = Red(device_id)
+        self._master.attach(self._driver)
 
-        # Monkey-patch missing Master methods for sensors:
-        def _idx(key: str):
-            for m in Index:
-                if key.lower() in m.name.lower():
-                    return m
-            raise AttributeError(f"No Index member matching '{key}'")
+        if module_cache is True:
+            module_cache = ModuleCache()
+        elif isinstance(module_cache, str):
+            module_cache = ModuleCache(module_cache)
+        self._module_cache: Optional[ModuleCache] = module_cache or None
 
-        # QTR (raw reflectance)
-        try:
-            qtr_idx = _idx('qtr')
-            def read_qtr(dev_id, module_id):
-                # module_id is already tracked by connection
-                return list(self._master.get_variables(dev_id, [qtr_idx])[0])
-            self._master.read_qtr = read_qtr
-        except AttributeError:
-            print("⚠ Index for QTR not found; QTR sensor methods unavailable.")
+        # Decide module list to register
+        t0 = self._clock()
+        if modules_override is not None:
+            modules = modules_override
+            kind = 'override'
+            print(f"✔ Using override modules list: {modules}")
+        else:
+            modules, kind = self._discover_modules(port, scan_timeout)
 
-        # QTR position
-        try:
-            qtr_pos_idx = _idx('position')
-            def read_qtr_position(dev_id, module_id):
-                return self._master.get_variables(dev_id, [qtr_pos_idx])[0]
-            self._master.read_qtr_position = read_qtr_position
-        except AttributeError:
-            print("⚠ Index for QTRPosition not found; QTR position method unavailable.")
+        self._master.set_connected_modules(device_id, modules)
+        print(f"Registered modules: {modules}")
 
-        # Potentiometer
-        try:
-            pot_idx = _idx('pot')
-            def get_pot(dev_id, module_id):
-                return self._master.get_variables(dev_id, [pot_idx])[0]
-            self._master.get_pot = get_pot
-        except AttributeError:
-            print("⚠ Index for Pot not found; potentiometer method unavailable.")
+        self.modules = list(modules)
+        self.startup_kind = kind
+        self.startup_time = self._clock() - t0
+        # last known cold (scan) and warm (cached) startup times
+        self.startup_times: Dict[str, float] = {kind: self.startup_time}
+        if kind != 'override':
+            self._record_startup(kind, modules)
+            print(f"✔ Startup ({kind}): {self.startup_time * 1e3:.1f} ms"
+                  + "".join(f", last {k}: {v * 1e3:.1f} ms"
+                            for k, v in self.startup_times.items() if k != kind))
 
-        # Joystick axes
+    # Module discovery
+    def _read_bitfield(self) -> Optional[int]:
         try:
-            joy_idx = _idx('joy')
-            def get_joy(dev_id, module_id):
-                vals = self._master.get_variables(dev_id, [joy_idx])[0]
-                # some SDKs pack axes
-                if isinstance(vals, (list, tuple)):
-                    return tuple(vals)
-                return (vals >> 8, vals & 0xFF)
-            self._master.get_joy = get_joy
-        except AttributeError:
-            print("⚠ Index for Joy not found; joystick axes unavailable.")
+            vals = self._master.get_variables(self.device_id, [Index.connected_bitfield])
+        except Exception:
+            return None
+        if not vals or vals[0] is None:
+            return None
+        bits = vals[0]
+        return (bits[1] << 32) | bits[0] if isinstance(bits, (list, tuple)) else bits
 
-        # Joystick button
-        try:
-            joybtn_idx = _idx('button')
-            def get_joy_button(dev_id, module_id):
-                return self._master.get_variables(dev_id, [joybtn_idx])[0]
-            self._master.get_joy_button = get_joy_button
-        except AttributeError:
-            print("⚠ Index for JoyButton not found; joystick button unavailable.")
+    def _discover_modules(self, port: str, scan_timeout: float):
+        """Module list for this device and whether it came from the cache."""
+        self._identity = None
+        self._bitfield = None
+        if self._module_cache is not None:
+            self._identity = port_identity(port)
+            entry = self._module_cache.get(self._identity, self.device_id)
+            if entry is not None:
+                # one read confirms the same modules are still connected
+                bits = self._read_bitfield()
+                if bits and bits == entry.get('bitfield'):
+                    self._bitfield = bits
+                    print(f"✔ cached modules for {self._identity} → {entry['modules']}")
+                    return list(entry['modules']), 'warm'
+                print(f"⚠ module cache for {self._identity} is stale, rescanning")
 
-        # IMU accelerometer
-        try:
-            accel_idx = _idx('accel')
-            def get_accel(dev_id, module_id):
-                vals = self._master.get_variables(dev_id, [accel_idx])[0]
-                return tuple(vals) if isinstance(vals, (list, tuple)) else (vals,)
-            self._master.get_accel = get_accel
-        except AttributeError:
-            print("⚠ Index for Accel not found; IMU accel unavailable.")
+        modules = self._scan(scan_timeout)
+        print(f"✔ scan_modules({self.device_id}) → {modules}")
 
-        # IMU gyroscope
-        try:
-            gyro_idx = _idx('gyro')
-            def get_gyro(dev_id, module_id):
-                vals = self._master.get_variables(dev_id, [gyro_idx])[0]
-                return tuple(vals) if isinstance(vals, (list, tuple)) else (vals,)
-            self._master.get_gyro = get_gyro
-        except AttributeError:
-            print("⚠ Index for Gyro not found; IMU gyro unavailable.")
+        if not modules:
+            modules = DEFAULT_MODULES.copy()
+            print(f"⚠ scan failed, falling back to DEFAULT_MODULES: {modules}")
+        return modules, 'cold'
 
-        # Decide module list to register
-        if modules_override is not None:
-            modules = modules_override
-            print(f"✔ Using override modules list: {modules}")
-        else:
-            self._master.set_variables(
-                device_id,
-                [[Index.SetScanModuleMode, 1]]
-            )
-            time.sleep(scan_timeout)
+    def _scan(self, scan_timeout: float) -> List[str]:
+        """Enable the scan engine and run the SDK's module scan."""
+        self._master.set_variables(self.device_id, [[Index.SetScanModuleMode, 1]])
+        self._sleep(scan_timeout)
+        modules = self._master.scan_modules(self.device_id) or []
+        self._bitfield = self._read_bitfield() if modules else None
+        return modules
 
-            modules = self._master.scan_modules(device_id) or []
-            print(f"✔ scan_modules({device_id}) → {modules}")
+    def _record_startup(self, kind: str, modules: List[str]):
+        if self._module_cache is None:
+            return
+        entry = self._module_cache.get(self._identity, self.device_id) or {}
+        for k in ('cold', 'warm'):
+            if k != kind and f"{k}_s" in entry:
+                self.startup_times[k] = entry[f"{k}_s"]
+        fields = {f"{kind}_s": self.startup_time}
+        if kind == 'cold':
+            if self._bitfield is None:
+                return   # fell back to DEFAULT_MODULES; nothing to trust
+            fields.update(modules=list(modules), bitfield=self._bitfield)
+        self._module_cache.put(self._identity, self.device_id, **fields)
 
-            if not modules:
-                modules = DEFAULT_MODULES.copy()
-                print(f"⚠ scan failed, falling back to DEFAULT_MODULES: {modules}")
+    def list_modules(self) -> List[str]:
+        """Modules registered with the device at startup."""
+        return list(self.modules)
 
-        self._master.set_connected_modules(device_id, modules)
-        print(f"Registered modules: {modules}")
+    def forget_modules(self):
+        """Drop this port/device from the module cache (next start scans)."""
+        if self._module_cache is not None and getattr(self, '_identity', None):
+            self._module_cache.forget(self._identity, self.device_id)
+
+    # Capability dispatch: decoder applied to each capability's raw value
+    DECODERS = {
+        'qtr':        list,
+        'joy':        unpack_axes,
+        'joy_button': unpack_button,
+        'accel':      as_vector,
+        'gyro':       as_vector,
+        'angles':     as_vector,
+    }
+
+    def index_for(self, key: str, module_id: int) -> Index:
+        """
+        Index holding `key` ('button', 'pot', 'accel', ...) for a module.
+        """
+        return capability_index(key, module_id)
+
+    def supports(self, key: str) -> bool:
+        """True if the installed SDK has an Index for capability `key`."""
+        target = capability_table().get(key)
+        return target is not None and not isinstance(target, AttributeError)
+
+    def read_capability(self, key: str, module_id: int, snapshot: Optional["Snapshot"] = None):
+        """
+        Decoded value of capability `key` for a module, taken from
+        `snapshot` if given, else from the poll cache or a fresh read.
+        """
+        idx = capability_index(key, module_id)
+        raw = snapshot[idx] if snapshot is not None else self._read_cached(idx)
+        decode = self.DECODERS.get(key)
+        return decode(raw) if decode is not None else raw
+
+    # I/O worker
+    def start_worker(self, maxsize: int = 64) -> IOWorker:
+        """
+        Route all bus traffic through one I/O thread with a bounded
+        priority queue: safety and motor commands go ahead of queued
+        sensor reads, and those ahead of LED/buzzer frames. Views of a
+        GatewayPool share the pool's one worker for the bus.
+        """
+        if self._pool is not None:
+            return self._pool.start_worker(maxsize)
+        if self._worker is None:
+            self._worker = IOWorker(self._lock, maxsize)
+            self._worker.start()
+        return self._worker
+
+    def stop_worker(self):
+        if self._pool is not None:
+            self._pool.stop_worker()
+            return
+        worker, self._worker = self._worker, None
+        if worker is not None:
+            worker.stop()
+
+    @property
+    def worker(self) -> Optional[IOWorker]:
+        return self._worker
+
+    def call(self, fn, *args, priority: Priority = Priority.MOTOR, **kwargs):
+        """
+        Run a raw Master call (goTo, set_variables_sync, ...) serialized
+        with all other bus traffic. Writes this thread holds back in a
+        batch() for the device are sent first, so they keep their order.
+        """
+        self._flush_pending()
+        worker = self._worker
+        if worker is None or worker.in_worker() or self._lock.held():
+            with self._lock:
+                return fn(*args, **kwargs)
+        return worker.call(fn, *args, priority=priority, **kwargs)
+
+    def io_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-priority latency of requests served by the I/O worker."""
+        return self._worker.stats() if self._worker is not None else {}
+
+    # Batched reads
+
+    @_serialized(Priority.SENSOR)
+    def read_many(self, indexes: Iterable[Index]) -> Snapshot:
+        """
+        Read every index in `indexes` with a single get_variables call.
+        """
+        indexes = list(dict.fromkeys(indexes))
+        if not indexes:
+            raise IndexError("read_many() needs at least one index")
+        vals = self._master.get_variables(self.device_id, indexes)
+        if vals is None:
+            raise IOError(f"get_variables({self.device_id}) returned no data")
+        snap = Snapshot(self.device_id, dict(zip(indexes, vals)), time.monotonic())
+        for listener in self._listeners:
+            try:
+                listener(snap)
+            except Exception:
+                self.listener_errors += 1
+        return snap
+
+    def add_listener(self, fn: Callable[[Snapshot], None]):
+        """
+        Call fn(snapshot) after every read_many(), on the reading thread
+        (e.g. a TelemetryRecorder); keep it short, the bus waits for it.
+        """
+        self._listeners = self._listeners + [fn]
+
+    def remove_listener(self, fn: Callable[[Snapshot], None]):
+        self._listeners = [f for f in self._listeners if f != fn]
+
+    def snapshot(self, *sensors, indexes: Iterable[Index] = ()) -> Snapshot:
+        """
+        Read everything the given sensor wrappers need (plus any extra
+        `indexes`) in one transaction; pass the result back to the
+        wrappers' read methods.
+        """
+        wanted = [idx for sensor in sensors for idx in sensor.indexes()]
+        wanted.extend(indexes)
+        return self.read_many(wanted)
+
+    # Background polling
+    def start_polling(self, rates: Dict[Any, float]) -> SensorPoller:
+        """
+        Refresh sensors in a background thread; `rates` maps sensor
+        wrappers (or Index members) to a polling rate in Hz. While
+        polling, reads of those sensors return the cached value.
+        """
+        self.stop_polling()
+        self._poller = SensorPoller(self, rates)
+        self._poller.start()
+        return self._poller
+
+    def stop_polling(self):
+        poller, self._poller = self._poller, None
+        if poller is not None:
+            poller.stop()
+
+    def cached(self, index: Index) -> Optional[Sample]:
+        """
+        Latest polled value of `index`, or None if it is not polled or
+        the poller has not refreshed it for a few periods (then reads
+        go to the bus, and a failing bus raises instead of going stale).
+        """
+        poller = self._poller
+        return poller.fresh(index) if poller is not None else None
+
+    def sample(self, index: Index) -> Sample:
+        """Cached value of `index` if polled, otherwise a fresh read."""
+        cached = self.cached(index)
+        if cached is not None:
+            return cached
+        snap = self.read_many([index])
+        return Sample(snap[index], snap.timestamp)
+
+    def _read_cached(self, index: Index):
+        cached = self.cached(index)
+        if cached is not None:
+            return cached.value
+        return self.read_many([index])[index]
+
+    # Writes
+    def write(self, pairs: Iterable[Tuple[Index, Any]], force: bool = False) -> bool:
+        """
+        Write (Index, value) pairs in one set_variables frame.
+
+        Pairs whose value matches the shadow copy of the last write are
+        dropped, and nothing is sent if none are left; force=True sends
+        everything. Returns True if a frame was sent. Inside a batch()
+        block the pairs are only collected, and True is returned, except
+        for forced writes and stops (torque off), which are sent at once.
+        """
+        stack = getattr(self._batches, 'stack', None)
+        if stack:
+            pairs = list(pairs)
+            if not force and write_priority(pairs) != Priority.SAFETY:
+                stack[-1].add(self.device_id, pairs, force)
+                return True
+            # sent now, so held-back values of the same registers are stale
+            for batch in stack:
+                batch.discard(self.device_id, [idx for idx, _ in pairs])
+        return self._write(pairs, force)
+
+    @_serialized(write_priority)
+    def _write(self, pairs: Iterable[Tuple[Index, Any]], force: bool = False) -> bool:
+        pairs = list(dict(pairs).items())
+        if not force:
+            pairs = [(idx, val) for idx, val in pairs if self._shadow.get(idx, _UNSET) != val]
+        if not pairs:
+            self.writes_skipped += 1
+            return False
+        self._master.set_variables(self.device_id, [[idx, val] for idx, val in pairs])
+        self._shadow.update(pairs)
+        self.frames_written += 1
+        return True
+
+    def submit_write(self, pairs: Iterable[Tuple[Index, Any]], force: bool = False,
+                     priority: Optional[Priority] = None) -> Future:
+        """
+        Queue a write without waiting for it; needs start_worker().
+        Blocks only while the worker's queue is full.
+        """
+        if self._worker is None:
+            raise RuntimeError("submit_write needs a running I/O worker; call start_worker()")
+        pairs = list(pairs)
+        prio = write_priority(pairs) if priority is None else priority
+        return self._worker.submit(self._write.__wrapped__, self, pairs, force, priority=prio)
+
+    def batch(self):
+        """
+        Context manager that holds back every write this thread makes
+        through the gateway (wrappers, motor helpers, rule actions) and
+        sends them as one set_variables frame when the block exits, the
+        last value per index winning and unchanged values skipped as
+        usual. Yields the WriteBatch, whose frames_saved tells how many
+        frames were avoided. Reads inside the block are not delayed.
+        Stops and forced writes are never held back, a raw call() first
+        sends what the block holds for the device, and the remaining
+        writes are dropped if the block raises.
+
+            with gw.batch() as batch:
+                led.on((0, 255, 0))
+                buzz.on(660)
+            print(batch.frames_saved)
+        """
+        return collect_writes([self], self._flush_batch)
+
+    def _batch_stack(self) -> List[WriteBatch]:
+        stack = getattr(self._batches, 'stack', None)
+        if stack is None:
+            stack = self._batches.stack = []
+        return stack
+
+    def _flush_pending(self):
+        """Send what this thread's open batches hold for this device, as one frame."""
+        stack = getattr(self._batches, 'stack', None)
+        if not stack:
+            return
+        merged, holders = WriteBatch(), []
+        for batch in stack:   # outermost first: older writes
+            if batch.pending.get(self.device_id):
+                batch._hand_over(merged, self.device_id)
+                holders.append(batch)
+        if not holders:
+            return
+        with self._lock:
+            pairs = merged.changed(self)
+            if pairs and self._write(pairs, force=True):
+                for batch in holders:
+                    batch.frames += 1
+
+    def _flush_batch(self, batch: WriteBatch, gateways: List["SMDGateway"]):
+        with self._lock:
+            pairs = batch.changed(self)
+            if not pairs:
+                self.writes_skipped += 1
+            elif self._write(pairs, force=True):
+                batch.frames += 1
+
+    def invalidate(self, index: Optional[Index] = None):
+        """
+        Forget the shadow copy of `index` (or of everything) so the next
+        write is sent even if unchanged, e.g. after a device reboot.
+        """
+        with self._lock:
+            if index is None:
+                self._shadow.clear()
+            else:
+                self._shadow.pop(index, None)
+
+    # Timed effects
+    @property
+    def scheduler(self) -> EffectScheduler:
+        """Shared effect scheduler, started on first use."""
+        with self._lock:
+            if self._scheduler is None:
+                self._scheduler = self._make_scheduler()
+            return self._scheduler
+
+    def _make_scheduler(self) -> EffectScheduler:
+        return EffectScheduler(self)
+
+    @property
+    def callback_pool(self) -> ThreadPoolExecutor:
+        """
+        Shared threads for user callbacks (button events, ...), so a slow
+        handler never holds up the polling thread. Started on first use.
+        """
+        with self._lock:
+            if self._callbacks is None:
+                self._callbacks = ThreadPoolExecutor(max_workers=4, thread_name_prefix="smd-callback")
+            return self._callbacks
 
     # Convenience wrappers
-    def set_rgb(self, module_id: int, rgb: Tuple[int, int, int]):
+    def encode_rgb(self, module_id: int, rgb: Tuple[int, int, int]) -> Tuple[Index, int]:
+        """(Index, value) pair that sets an RGB module to `rgb`."""
         r, g, b = rgb
-        self._master.set_rgb(self.device_id, module_id, r, g, b)
+        if not all(0 <= c <= 255 for c in (r, g, b)):
+            raise ValueError("RGB color values must be in range 0 - 255")
+        return self.index_for('rgb', module_id), r + (g << 8) + (b << 16)
+
+    def encode_buzzer(self, module_id: int, freq_hz: int) -> Tuple[Index, int]:
+        """(Index, value) pair that sets a buzzer module to `freq_hz`."""
+        if freq_hz < 0:
+            raise ValueError("Buzzer frequency cannot be negative")
+        return self.index_for('buzzer', module_id), freq_hz
+
+    def set_rgb(self, module_id: int, rgb: Tuple[int, int, int], force: bool = False):
+        self.write([self.encode_rgb(module_id, rgb)], force)
+
+    def set_buzzer(self, module_id: int, freq_hz: int, force: bool = False):
+        self.write([self.encode_buzzer(module_id, freq_hz)], force)
+
+    def get_button(self, module_id: int):
+        cached = self.cached(self.index_for('button', module_id))
+        if cached is not None:
+            return cached.value
+        return self.call(self._master.get_button, self.device_id, module_id,
+                         priority=Priority.SENSOR)
 
-    def set_buzzer(self, module_id: int, freq_hz: int):
-        self._master.set_buzzer(self.device_id, module_id, freq_hz)
+    def get_light(self, module_id: int):
+        cached = self.cached(self.index_for('light', module_id))
+        if cached is not None:
+            return cached.value
+        return self.call(self._master.get_light, self.device_id, module_id,
+                         priority=Priority.SENSOR)
 
     def get_distance(self, module_id: int):
-        return self._master.get_distance(self.device_id, module_id)
+        cached = self.cached(self.index_for('distance', module_id))
+        if cached is not None:
+            return cached.value
+        return self.call(self._master.get_distance, self.device_id, module_id,
+                         priority=Priority.SENSOR)
 
     # Motor helpers
     def set_shaft_cpr(self, cpr: int):
-        self._master.set_shaft_cpr(self.device_id, cpr)
+        self.write([(Index.OutputShaftCPR, cpr)])
 
     def set_shaft_rpm(self, rpm: float):
-        self._master.set_shaft_rpm(self.device_id, rpm)
+        self.write([(Index.OutputShaftRPM, rpm)])
 
     def set_operation_mode(self, mode: OperationMode):
-        self._master.set_operation_mode(self.device_id, mode)
+        self.write([(Index.OperationMode, mode)])
 
     def set_control_parameters_velocity(self, p: float, i: float, d: float):
-        self._master.set_control_parameters_velocity(self.device_id, p, i, d)
+        self.write([(Index.VelocityPGain, p), (Index.VelocityIGain, i), (Index.VelocityDGain, d)])
 
     def set_control_parameters_position(self, p: float, i: float, d: float):
-        self._master.set_control_parameters_position(self.device_id, p, i, d)
+        self.write([(Index.PositionPGain, p), (Index.PositionIGain, i), (Index.PositionDGain, d)])
 
     def set_control_parameters_torque(self, p: float, i: float, d: float):
-        self._master.set_control_parameters_torque(self.device_id, p, i, d)
+        self.write([(Index.TorquePGain, p), (Index.TorqueIGain, i), (Index.TorqueDGain, d)])
 
-    def enable_torque(self, enabled: bool = True):
-        self._master.enable_torque(self.device_id, enabled)
+    def enable_torque(self, enabled: bool = True, force: bool = False):
+        self.write([(Index.TorqueEnable, int(enabled))], force)
 
-    def set_duty_cycle(self, duty: int):
-        self._master.set_duty_cycle(self.device_id, duty)
+    def set_duty_cycle(self, duty: int, force: bool = False):
+        self.write([(Index.SetDutyCycle, duty)], force)
 
     def close(self):
+        self.stop_polling()
+        if self._scheduler is not None:
+            self._scheduler.stop()
+            self._scheduler = None
+        if self._callbacks is not None:
+            self._callbacks.shutdown(wait=False)
+            self._callbacks = None
+        if self._pool is None:
+            self.stop_worker()   # a pool stops its shared worker itself
+        if not self._owns_master:
+            return
         try:
             self._master.close()
         except AttributeError:
@@ -0,0 +1,215 @@
+### lib/telemetry.py
+
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+from smd.red import Red, Index
+
+# struct format character (as used by smd.red variables) → NumPy type
+_NUMPY_TYPES = {
+    'b': 'i1', 'B': 'u1', 'h': 'i2', 'H': 'u2', 'i': 'i4', 'I': 'u4',
+    'l': 'i4', 'L': 'u4', 'q': 'i8', 'Q': 'u8', 'f': 'f4', 'd': 'f8', '?': 'u1',
+}
+_SPILL_GROW_ROWS = 1 << 20
+
+
+def telemetry_dtype(indexes: Iterable[Index]) -> np.dtype:
+    """
+    Row type for a recording: 't' (monotonic seconds), 'mask' (bit k set
+    if field k was read in this row) and one field per Index, named like
+    the Index. Multi-value registers (QTR, joystick) become small arrays.
+    """
+    fields = [('t', 'f8'), ('mask', 'u8')]
+    driver = Red(0)
+    for idx in indexes:
+        fmt = driver.vars[idx].type()
+        types = [np.dtype(_NUMPY_TYPES[c]) for c in fmt]
+        kind = np.result_type(*types)
+        fields.append((Index(int(idx)).name, kind) if len(fmt) == 1 else
+                      (Index(int(idx)).name, kind, (len(fmt),)))
+    return np.dtype(fields)
+
+
+class TelemetryRecorder:
+    """
+    Records gateway snapshots into a preallocated NumPy structured-array
+    ring buffer, without creating Python objects per sample.
+
+    Each row carries the snapshot time and every recorded register;
+    registers missing from a snapshot keep their previous value and have
+    their bit in 'mask' cleared. With `path`, every full chunk of rows is
+    copied to a memory-mapped file by a background thread (the file
+    grows as needed), so recordings can run for hours in fixed memory.
+
+    Usage:
+        rec = TelemetryRecorder([dist, imu, qtr], path="run.tlm")
+        rec.attach(gw)                       # records every read_many()
+        gw.start_polling({dist: 200, imu: 200, qtr: 200})
+        ...
+        rec.close()
+        data = TelemetryRecorder.load("run.tlm")
+        data['Distance_1'], data['t']
+    """
+    def __init__(self, sensors: Iterable[Any], capacity: int = 1 << 16,
+                 chunk: int = 4096, path: Optional[str] = None):
+        indexes: List[Index] = []
+        for sensor in sensors:
+            indexes.extend(sensor.indexes() if hasattr(sensor, 'indexes') else [sensor])
+        self.indexes = list(dict.fromkeys(indexes))
+        if not self.indexes:
+            raise ValueError("TelemetryRecorder needs at least one sensor")
+        if len(self.indexes) > 64:
+            raise ValueError("TelemetryRecorder records at most 64 registers")
+        if chunk < 1 or capacity % chunk or capacity < 2 * chunk:
+            raise ValueError("capacity must be a multiple of chunk and at least two chunks")
+
+        self.dtype = telemetry_dtype(self.indexes)
+        self.capacity = capacity
+        self.chunk = chunk
+        self._ring = np.zeros(capacity, dtype=self.dtype)
+        # held while a row is written and while the spill thread copies
+        # rows out, so it never copies a half-written row
+        self._ring_lock = threading.Lock()
+        self._fields = {idx: (Index(int(idx)).name, np.uint64(1 << k))
+                        for k, idx in enumerate(self.indexes)}
+        self.count = 0       # rows appended since start
+        self.lost = 0        # rows overwritten before they were spilled
+
+        self.path = path
+        self._gateways: List[Any] = []
+        self._spilled = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._spill: Optional[np.memmap] = None
+        self._thread: Optional[threading.Thread] = None
+        if path is not None:
+            self._thread = threading.Thread(target=self._spill_loop, name="TelemetrySpill", daemon=True)
+            self._thread.start()
+
+    # Recording
+    def attach(self, gateway) -> "TelemetryRecorder":
+        """Record every snapshot the gateway reads (polling, snapshot(), ...)."""
+        gateway.add_listener(self.append)
+        self._gateways.append(gateway)
+        return self
+
+    def detach(self):
+        for gw in self._gateways:
+            gw.remove_listener(self.append)
+        self._gateways = []
+
+    def append(self, snapshot):
+        """Add one row from a Snapshot (ignores registers not recorded)."""
+        with self._ring_lock:
+            n = self.count
+            ring = self._ring
+            i = n % self.capacity
+            if n:
+                ring[i] = ring[(n - 1) % self.capacity]   # forward-fill
+            row = ring[i:i + 1]
+            mask = np.uint64(0)
+            for idx in snapshot.indexes():
+                field = self._fields.get(idx)
+                if field is not None:
+                    row[field[0]] = snapshot[idx]
+                    mask |= field[1]
+            row['t'] = snapshot.timestamp
+            row['mask'] = mask
+            self.count = n + 1
+        if self.path is not None and self.count % self.chunk == 0:
+            with self._cond:
+                self._cond.notify()
+
+    def latest(self, n: Optional[int] = None) -> np.ndarray:
+        """Copy of the newest `n` rows (default: all still in the ring), oldest first."""
+        with self._ring_lock:
+            available = min(self.count, self.capacity)
+            n = available if n is None else min(n, available)
+            end = self.count % self.capacity
+            idx = (np.arange(end - n, end)) % self.capacity
+            return self._ring[idx]
+
+    # Spill to disk
+    def _spill_loop(self):
+        while True:
+            with self._cond:
+                while not self._closed and self.count - self._spilled < self.chunk:
+                    self._cond.wait()
+                closed = self._closed
+            self._flush(final=closed)
+            if closed:
+                return
+
+    def _flush(self, final: bool = False):
+        """Copy rows not yet on disk (whole chunks unless final) to the file."""
+        with self._ring_lock:
+            count = self.count
+            end = count if final else count - count % self.chunk
+            start = self._spilled
+            if start < count - self.capacity:
+                # the writer lapped the spill thread; the older rows are gone
+                self.lost += count - self.capacity - start
+                start = self._spilled = count - self.capacity
+            if end <= start:
+                return
+            # a plain copy under the lock; the slower file write is done after
+            rows = self._ring[np.arange(start, end) % self.capacity]
+        self._ensure_spill(end - self.lost)
+        pos = start - self.lost
+        self._spill[pos:pos + len(rows)] = rows
+        self._spill.flush()
+        self._spilled = end
+        self._write_header(pos + len(rows))
+
+    def _ensure_spill(self, rows: int):
+        if self._spill is not None and len(self._spill) >= rows:
+            return
+        size = max(rows, (len(self._spill) if self._spill is not None else 0) + _SPILL_GROW_ROWS)
+        mode = 'r+' if self._spill is not None else 'w+'
+        if self._spill is not None:
+            self._spill.flush()
+            del self._spill
+            with open(self.path, 'r+b') as fh:
+                fh.truncate(size * self.dtype.itemsize)
+        self._spill = np.memmap(self.path, dtype=self.dtype, mode=mode, shape=(size,))
+
+    def _write_header(self, rows: int):
+        header = {'rows': rows, 'lost': self.lost, 'dtype': self.dtype.descr}
+        with open(self.path + '.json', 'w', encoding='utf-8') as fh:
+            json.dump(header, fh)
+
+    def close(self):
+        """Stop recording and write any remaining rows to disk."""
+        self.detach()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.path is not None and self._spill is None:
+            open(self.path, 'wb').close()
+            self._write_header(0)
+        if self._spill is not None:
+            rows = self._spilled - self.lost
+            self._spill.flush()
+            del self._spill
+            self._spill = None
+            # drop the unused preallocated tail
+            with open(self.path, 'r+b') as fh:
+                fh.truncate(rows * self.dtype.itemsize)
+
+    @staticmethod
+    def load(path: str) -> np.ndarray:
+        """Read-only memory map of a recording written with `path`."""
+        with open(path + '.json', 'r', encoding='utf-8') as fh:
+            header = json.load(fh)
+        dtype = np.dtype([tuple(f) if len(f) == 2 else (f[0], f[1], tuple(f[2]))
+                          for f in header['dtype']])
+        if header['rows'] == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=(header['rows'],))
+
+    def stats(self) -> Dict[str, int]:
+        return {'rows': self.count, 'spilled': self._spilled, 'lost': self.lost}
@@ -0,0 +1,203 @@
+### lib/trajectory.py
+
+import math
+import threading
+from typing import List, NamedTuple, Optional, Sequence
+import numpy as np
+from smd.red import OperationMode
+from lib.motor import Motor, StreamReport, stream_setpoints
+
+
+class Trajectory(NamedTuple):
+    """A sampled motion profile; row k is due at t[k] seconds."""
+    t: np.ndarray
+    position: np.ndarray
+    velocity: np.ndarray
+    acceleration: np.ndarray
+    rate_hz: float
+
+    @property
+    def duration(self) -> float:
+        return float(self.t[-1]) if len(self.t) else 0.0
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+
+def _trapezoid_timing(distance: float, v_max: float, a_max: float):
+    """(cruise velocity, total time) of the fastest trapezoid for `distance`."""
+    if distance == 0:
+        return 0.0, 0.0
+    v = min(v_max, math.sqrt(distance * a_max))   # triangle if v_max is not reached
+    return v, distance / v + v / a_max
+
+
+def _cruise_for_duration(distance: float, a_max: float, duration: float) -> float:
+    """Cruise velocity that makes a trapezoid with accel a_max last `duration`."""
+    disc = (a_max * duration) ** 2 - 4 * a_max * distance
+    if disc < 0:
+        raise ValueError(f"A {distance:g} move cannot finish in {duration:g} s at a_max={a_max:g}")
+    return (a_max * duration - math.sqrt(disc)) / 2
+
+
+def _check_limits(**limits):
+    for name, value in limits.items():
+        if value is not None and value <= 0:
+            raise ValueError(f"{name} must be positive, got {value}")
+
+
+def _sampled_trapezoid(distance: float, v: float, a: float, duration: float, rate_hz: float):
+    """Unsigned position of a trapezoid sampled at rate_hz (one vectorized pass)."""
+    # uniform samples; the last one lands on or just after `duration`
+    n = int(math.ceil(duration * rate_hz - 1e-9)) + 1
+    t = np.arange(n) / rate_hz
+    if distance == 0:
+        return t, np.zeros(n)
+    ta = v / a                       # accel (and decel) time
+    tc = duration - 2 * ta           # cruise time
+    td = np.clip(duration - t, 0.0, None)   # time left; 0 once arrived
+    pos = np.where(
+        t < ta, 0.5 * a * t ** 2,
+        np.where(t < ta + tc, 0.5 * a * ta ** 2 + v * (t - ta),
+                 distance - 0.5 * a * td ** 2))
+    return t, pos
+
+
+def trapezoidal(start: float, end: float, v_max: float, a_max: float,
+                rate_hz: float = 100.0, duration: Optional[float] = None) -> Trajectory:
+    """
+    Trapezoidal (acceleration-limited) move from start to end, sampled at
+    rate_hz. `duration` stretches the move to take exactly that long
+    (used to synchronise axes); it must not be shorter than the minimum.
+    """
+    _check_limits(v_max=v_max, a_max=a_max, rate_hz=rate_hz)
+    distance = abs(end - start)
+    v, duration = _trapezoid_plan(distance, v_max, a_max, duration)
+    t, pos = _sampled_trapezoid(distance, v, a_max, duration, rate_hz)
+    return _finish(start, end, t, pos, rate_hz)
+
+
+def _trapezoid_plan(distance: float, v_max: float, a_max: float,
+                    duration: Optional[float] = None):
+    """(cruise velocity, duration) of a trapezoid, stretched to `duration` if given."""
+    v, t_min = _trapezoid_timing(distance, v_max, a_max)
+    if duration is not None and distance:
+        if duration < t_min - 1e-9:
+            raise ValueError(f"duration {duration:g} s is shorter than the minimum {t_min:g} s")
+        return _cruise_for_duration(distance, a_max, duration), duration
+    return v, t_min if duration is None else duration
+
+
+def scurve(start: float, end: float, v_max: float, a_max: float, j_max: float,
+           rate_hz: float = 100.0, duration: Optional[float] = None) -> Trajectory:
+    """
+    Jerk-limited (S-curve) move. Built as a trapezoid convolved with a
+    moving-average window: the result keeps the trapezoid's endpoints,
+    velocity and acceleration limits. The window spans the largest
+    acceleration step divided by j_max (a_max, or 2 * a_max when a short
+    move goes straight from accelerating to braking), rounded up to
+    whole samples, so the jerk never exceeds j_max.
+    """
+    _check_limits(v_max=v_max, a_max=a_max, j_max=j_max, rate_hz=rate_hz)
+    distance = abs(end - start)
+    for step in (a_max, 2 * a_max):
+        window = max(1, int(math.ceil(step / j_max * rate_hz - 1e-9)))
+        tj = (window - 1) / rate_hz
+        trap_duration = None if duration is None else duration - tj
+        if trap_duration is not None and trap_duration <= 0:
+            raise ValueError(f"duration {duration:g} s is shorter than the jerk time {tj:g} s")
+        v, planned = _trapezoid_plan(distance, v_max, a_max, trap_duration)
+        cruise = planned - 2 * v / a_max
+        if not distance or cruise >= window / rate_hz:
+            break
+    base = trapezoidal(0.0, distance, v_max, a_max, rate_hz, trap_duration)
+    pos = base.position
+    if window > 1:
+        # moving average via cumulative sums, padded so both ends stay at rest
+        padded = np.concatenate((np.zeros(window - 1), pos, np.full(window - 1, pos[-1])))
+        csum = np.cumsum(np.concatenate(([0.0], padded)))
+        pos = (csum[window:] - csum[:-window]) / window
+        pos = pos[:len(base) + window - 1]
+    t = np.arange(len(pos)) / rate_hz
+    return _finish(start, end, t, pos, rate_hz)
+
+
+def _finish(start: float, end: float, t: np.ndarray, unsigned_pos: np.ndarray,
+            rate_hz: float) -> Trajectory:
+    direction = 1.0 if end >= start else -1.0
+    position = start + direction * unsigned_pos
+    position[-1] = end
+    if len(t) > 1:
+        # at rest before and after the move: pad with the end positions
+        # rather than take one-sided differences, which overshoot at the edges
+        padded = np.concatenate((np.full(2, position[0]), position, np.full(2, position[-1])))
+        velocity = np.gradient(padded, 1.0 / rate_hz)
+        acceleration = np.gradient(velocity, 1.0 / rate_hz)[2:-2]
+        velocity = velocity[2:-2]
+    else:
+        velocity = acceleration = np.zeros_like(position)
+    return Trajectory(t, position, velocity, acceleration, rate_hz)
+
+
+def synchronized(starts: Sequence[float], ends: Sequence[float], v_max, a_max,
+                 j_max=None, rate_hz: float = 100.0) -> List[Trajectory]:
+    """
+    One profile per axis, all stretched to the slowest axis' duration
+    so every axis starts and arrives together. Limits may be scalars or
+    per-axis sequences; j_max selects S-curves.
+    """
+    n = len(starts)
+    if len(ends) != n:
+        raise ValueError("starts and ends must have the same length")
+    v_max, a_max = np.broadcast_to(v_max, n), np.broadcast_to(a_max, n)
+    j_max = None if j_max is None else np.broadcast_to(j_max, n)
+
+    def make(i, duration=None):
+        if j_max is None:
+            return trapezoidal(starts[i], ends[i], v_max[i], a_max[i], rate_hz, duration)
+        return scurve(starts[i], ends[i], v_max[i], a_max[i], j_max[i], rate_hz, duration)
+
+    fastest = [make(i) for i in range(n)]
+    duration = max(tr.duration for tr in fastest)
+    profiles = [tr if tr.duration == duration else make(i, duration)
+                for i, tr in enumerate(fastest)]
+    # sample counts can differ by one after rounding; hold the end point
+    length = max(len(tr) for tr in profiles)
+    return [_hold(tr, length) for tr in profiles]
+
+
+def _hold(tr: Trajectory, length: int) -> Trajectory:
+    extra = length - len(tr)
+    if extra <= 0:
+        return tr
+    t = np.arange(length) / tr.rate_hz
+    pad = lambda a, v: np.concatenate((a, np.full(extra, v)))
+    return Trajectory(t, pad(tr.position, tr.position[-1]), pad(tr.velocity, 0.0),
+                      pad(tr.acceleration, 0.0), tr.rate_hz)
+
+
+def follow(motors: Sequence[Motor], trajectories: Sequence[Trajectory],
+           stop_event: Optional[threading.Event] = None) -> StreamReport:
+    """
+    Stream synchronised position profiles to several motors: every
+    tick sends each motor its next setpoint, on one absolute schedule.
+    """
+    if len(motors) != len(trajectories):
+        raise ValueError("one trajectory per motor is required")
+    if not trajectories:
+        raise ValueError("nothing to follow")
+    rate_hz = trajectories[0].rate_hz
+    if any(tr.rate_hz != rate_hz or len(tr) != len(trajectories[0]) for tr in trajectories):
+        raise ValueError("trajectories must share rate and length (see synchronized())")
+    senders = []
+    for motor in motors:
+        motor._engage_streaming(OperationMode.Position)
+        senders.append(motor._setpoint_sender(OperationMode.Position))
+    # plain floats: the gateway shadow compares and the SDK packs them
+    columns = np.column_stack([tr.position for tr in trajectories]).tolist()
+
+    def send(row):
+        for sender, sp in zip(senders, row):
+            sender(sp)
+
+    return stream_setpoints(send, columns, rate_hz, stop_event)
@@ -1,11 +1,58 @@
 ### lib/usb_port_finder.py
+import os
+import threading
+import time
 from platform import system
 from serial.tools.list_ports import comports
-from typing import Optional
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+SYSFS_TTY = "/sys/class/tty"
+
+
+class UsbPort(NamedTuple):
+    """A serial port and the USB identity of the adapter behind it."""
+    device: str
+    vid: Optional[int] = None
+    pid: Optional[int] = None
+    serial_number: Optional[str] = None
+    description: str = ""
+    location: Optional[str] = None
+
+
+def _read_attr(path: str) -> Optional[str]:
+    try:
+        with open(path, 'r') as fh:
+            return fh.read().strip()
+    except OSError:
+        return None
+
+
+def _usb_device(name: str) -> Tuple[Optional[str], Optional[str]]:
+    """sysfs (interface, USB device) directories behind tty `name`."""
+    path = os.path.realpath(os.path.join(SYSFS_TTY, name, "device"))
+    # walk up from the interface to the USB device (has idVendor)
+    interface, usb_dev = None, path
+    for _ in range(4):
+        if os.path.exists(os.path.join(usb_dev, "idVendor")):
+            return interface, usb_dev
+        interface, usb_dev = usb_dev, os.path.dirname(usb_dev)
+    return None, None
+
 
 class USBPortFinder:
     """
     Auto-detects the Acrome USB gateway port.
+
+    Ports are matched on USB VID/PID (and serial number, if given);
+    adapters without USB info fall back to the per-OS name tags. On
+    Linux the ports are read straight from sysfs instead of enumerating
+    every tty. Results are cached until a USB serial device is plugged
+    in or removed (or for CACHE_TTL seconds where that cannot be seen).
+
+    Usage:
+        port  = USBPortFinder.first_gateway()
+        ports = USBPortFinder.all_gateways()               # multi-board hosts
+        port  = USBPortFinder.first_gateway(serial="A10K3Z1B")
     """
     CANDIDATES = {
         "Windows": ["USB Serial Port"],
@@ -16,13 +63,144 @@ class USBPortFinder:
             "/dev/cu.usbserial",
         ],
     }
+    # USB-serial bridges used on SMD gateways: FTDI, CP210x, CH340
+    USB_IDS: List[Tuple[int, int]] = [
+        (0x0403, 0x6001), (0x0403, 0x6015),
+        (0x10C4, 0xEA60),
+        (0x1A86, 0x7523),
+    ]
+    CACHE_TTL = 2.0
+
+    _lock = threading.Lock()
+    _cache: Optional[Tuple[object, float, List[UsbPort]]] = None
+
+    @staticmethod
+    def first_gateway(vid: Optional[int] = None, pid: Optional[int] = None,
+                      serial: Optional[str] = None) -> Optional[str]:
+        ports = USBPortFinder.all_gateways(vid, pid, serial)
+        if ports:
+            print(f"✔ USB gateway found on {ports[0]}")
+            return ports[0]
+        return None
+
+    @staticmethod
+    def all_gateways(vid: Optional[int] = None, pid: Optional[int] = None,
+                     serial: Optional[str] = None) -> List[str]:
+        """Device names of every connected gateway, in a stable order."""
+        return [p.device for p in USBPortFinder.gateways(vid, pid, serial)]
+
+    @staticmethod
+    def gateways(vid: Optional[int] = None, pid: Optional[int] = None,
+                 serial: Optional[str] = None) -> List[UsbPort]:
+        """Like all_gateways(), with the USB details of each port."""
+        return [p for p in USBPortFinder.ports()
+                if USBPortFinder._matches(p, vid, pid, serial)]
+
+    @staticmethod
+    def describe(device: str) -> Optional[UsbPort]:
+        """USB details of one port, or None if it is not a USB serial port."""
+        for p in USBPortFinder.ports():
+            if p.device == device:
+                return p
+        return None
+
+    @classmethod
+    def ports(cls, refresh: bool = False) -> List[UsbPort]:
+        """All USB serial ports (cached; see class docstring)."""
+        signature = cls._signature()
+        now = time.monotonic()
+        with cls._lock:
+            cached = cls._cache
+            if (not refresh and cached is not None and cached[0] == signature
+                    and (signature is not None or now - cached[1] < cls.CACHE_TTL)):
+                return cached[2]
+        ports = cls._enumerate()
+        with cls._lock:
+            cls._cache = (signature, now, ports)
+        return ports
+
+    @classmethod
+    def invalidate(cls):
+        """Forget cached ports (e.g. after a hotplug the cache cannot see)."""
+        with cls._lock:
+            cls._cache = None
+
+    @classmethod
+    def _matches(cls, p: UsbPort, vid: Optional[int], pid: Optional[int],
+                 serial: Optional[str]) -> bool:
+        if serial is not None and p.serial_number != serial:
+            return False
+        if vid is not None or pid is not None:
+            return (vid is None or p.vid == vid) and (pid is None or p.pid == pid)
+        if p.vid is not None and (p.vid, p.pid) in cls.USB_IDS:
+            return True
+        return any(tag in p.device or tag in p.description
+                   for tag in cls.CANDIDATES.get(system(), []))
+
+    # Enumeration
+    @staticmethod
+    def _signature() -> Optional[Sequence[str]]:
+        """
+        Cheap fingerprint of the plugged-in USB serial devices. On Linux
+        it includes each adapter's serial and bus/device number, so
+        swapping one adapter for another under the same ttyUSB name
+        still changes it (the device number is new on every plug-in).
+        """
+        try:
+            if os.path.isdir(SYSFS_TTY):
+                sig = []
+                for name in sorted(os.listdir(SYSFS_TTY)):
+                    if not name.startswith(("ttyUSB", "ttyACM")):
+                        continue
+                    _, usb_dev = _usb_device(name)
+                    if usb_dev is None:
+                        sig.append(name)
+                        continue
+                    sig.append("|".join((name,
+                                         _read_attr(os.path.join(usb_dev, "busnum")) or "",
+                                         _read_attr(os.path.join(usb_dev, "devnum")) or "",
+                                         _read_attr(os.path.join(usb_dev, "serial")) or "")))
+                return tuple(sig)
+            if system() == "Darwin":
+                return tuple(sorted(n for n in os.listdir("/dev")
+                                    if n.startswith(("tty.usb", "cu.usb", "tty.SLAB", "tty.wch"))))
+        except OSError:
+            pass
+        return None
+
+    @staticmethod
+    def _enumerate() -> List[UsbPort]:
+        if os.path.isdir(SYSFS_TTY):
+            try:
+                return USBPortFinder._enumerate_sysfs()
+            except OSError:
+                pass
+        return sorted((UsbPort(p.device, p.vid, p.pid, p.serial_number,
+                               p.description or "", p.location)
+                       for p in comports()
+                       if p.vid is not None or any(
+                           tag in p.device or tag in (p.description or "")
+                           for tag in USBPortFinder.CANDIDATES.get(system(), []))),
+                      key=lambda p: p.device)
 
     @staticmethod
-    def first_gateway() -> Optional[str]:
-        os_name = system()
-        for p in comports():
-            if any(tag in p.device or tag in p.description
-                   for tag in USBPortFinder.CANDIDATES.get(os_name, [])):
-                print(f"✔ USB gateway found on {p.device}")
-                return p.device
-        return None
\ No newline at end of file
+    def _enumerate_sysfs() -> List[UsbPort]:
+        ports = []
+        for name in sorted(os.listdir(SYSFS_TTY)):
+            if not name.startswith(("ttyUSB", "ttyACM")):
+                continue
+            interface, usb_dev = _usb_device(name)
+            if usb_dev is None:
+                ports.append(UsbPort(f"/dev/{name}"))
+                continue
+            vid = _read_attr(os.path.join(usb_dev, "idVendor"))
+            pid = _read_attr(os.path.join(usb_dev, "idProduct"))
+            ports.append(UsbPort(
+                device=f"/dev/{name}",
+                vid=int(vid, 16) if vid else None,
+                pid=int(pid, 16) if pid else None,
+                serial_number=_read_attr(os.path.join(usb_dev, "serial")),
+                description=_read_attr(os.path.join(usb_dev, "product")) or name,
+                location=os.path.basename(interface or usb_dev),
+            ))
+        return ports
@@ -1,101 +1,34 @@
 import os, sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import time
 import threading
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
-from serial.tools.list_ports import comports
-from platform import system
-from smd.red import Master, Red
-
-# Morse-code timing
-DOT_DURATION   = 0.2
-DASH_DURATION  = DOT_DURATION * 3
-SYMBOL_PAUSE   = DOT_DURATION
-LETTER_PAUSE   = DOT_DURATION * 3
-WORD_PAUSE     = DOT_DURATION * 7
-
-# Morse lookup
-def build_morse_map():
-    return {
-        'A': '.-', 'B': '-...', 'C': '-.-.', 'D': '-..', 'E': '.',
-        'F': '..-.', 'G': '--.', 'H': '....', 'I': '..', 'J': '.---',
-        'K': '-.-', 'L': '.-..', 'M': '--', 'N': '-.', 'O': '---',
-        'P': '.--.', 'Q': '--.-', 'R': '.-.', 'S': '...', 'T': '-',
-        'U': '..-', 'V': '...-', 'W': '.--', 'X': '-..-', 'Y': '-.--',
-        'Z': '--..',
-        '0': '-----', '1': '.----', '2': '..---', '3': '...--', '4': '....-',
-        '5': '.....', '6': '-....', '7': '--...', '8': '---..', '9': '----.'
-    }
-MORSE_CODE = build_morse_map()
+from lib.usb_port_finder import USBPortFinder
+from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
+from lib.led import Led
+from lib.buzzer import Buzzer
+from lib.morse import MorsePlayer, to_morse_string
 
-# Hardware layer
-def find_usb_port():
-    ports = list(comports())
-    os_name = system()
-    usb_names = {
-        "Windows": ["USB Serial Port"],
-        "Linux": ["/dev/ttyUSB"],
-        "Darwin": ["/dev/tty.usbserial", "/dev/tty.usbmodem", "/dev/cu.usbserial"]
-    }
-    for port, desc, hwid in sorted(ports):
-        if any(name in port or name in desc for name in usb_names.get(os_name, [])):
-            return port
-    return None
+# Morse-code timing (dot = 1.2 / WPM = 0.2 s)
+WPM = 6
 
+# Hardware layer
 class MorseHardware:
-    def __init__(self, port, baud=115200, smd_id=0, led_id=5, buzzer_id=5):
-        self.master = Master(port, baud)
-        self.master.attach(Red(smd_id))
-        self.master.scan_modules(smd_id)
-        self.smd_id = smd_id
-        self.led_id = led_id
-        self.buzzer_id = buzzer_id
-
-    def led_on(self):
-        self.master.set_rgb(self.smd_id, self.led_id, 255, 255, 255)
-
-    def led_off(self):
-        self.master.set_rgb(self.smd_id, self.led_id, 0, 0, 0)
-
-    def beep(self, dur):
-        ms = int(dur * 1000)
-        self.master.set_buzzer(self.smd_id, self.buzzer_id, ms)
-        time.sleep(dur)
-        self.master.set_buzzer(self.smd_id, self.buzzer_id, 0)
+    def __init__(self, port, led_id=5, buzzer_id=5):
+        self.gw = SMDGateway(port, modules_override=DEFAULT_MODULES)
+        self.led = Led(self.gw, module_id=led_id)
+        self.buzzer = Buzzer(self.gw, module_id=buzzer_id)
+        self.player = MorsePlayer(self.led, self.buzzer, wpm=WPM)
 
     def close(self):
-        ser = getattr(self.master, 'serial', None)
-        if ser and hasattr(ser, 'close'):
-            ser.close()
+        self.gw.close()
 
 # Transmission logic
-def transmit_symbol(symbol, hw):
-    dur = DOT_DURATION if symbol == '.' else DASH_DURATION
-    hw.led_on()
-    hw.beep(dur)
-    hw.led_off()
-    time.sleep(SYMBOL_PAUSE)
-
-
 def transmit_message(msg, hw, on_progress=None):
-    cleaned = msg.strip().upper()
-    symbols = [s for ch in cleaned if ch != ' ' for s in MORSE_CODE.get(ch, '')]
-    total = len(symbols)
-    count = 0
-    for word in cleaned.split():
-        for ch in word:
-            for sym in MORSE_CODE.get(ch, ''):
-                transmit_symbol(sym, hw)
-                count += 1
-                if on_progress and total:
-                    on_progress(int(count / total * 100))
-            time.sleep(LETTER_PAUSE - SYMBOL_PAUSE)
-        time.sleep(WORD_PAUSE - LETTER_PAUSE)
-    if on_progress:
-        on_progress(100)
+    # compiled once per message, played on absolute deadlines
+    hw.player.play(msg, on_progress)
 
 # GUI Application
 class MorseGUI(tk.Tk):
@@ -105,7 +38,7 @@ class MorseGUI(tk.Tk):
         self.configure(bg="#2c3e50")
         self.resizable(False, False)
 
-        port = find_usb_port()
+        port = USBPortFinder.first_gateway()
         if not port:
             messagebox.showerror("Error", "No USB gateway detected.")
             self.destroy()
@@ -154,11 +87,7 @@ class MorseGUI(tk.Tk):
         self.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _update_code(self, *_):
-        words = []
-        for w in self.msg_var.get().strip().upper().split():
-            letters = [MORSE_CODE.get(ch, '') for ch in w]
-            words.append(' '.join(filter(None, letters)))
-        self.code_lbl.config(text=' / '.join(words))
+        self.code_lbl.config(text=to_morse_string(self.msg_var.get()))
 
     def _start(self):
         msg = self.msg_var.get().strip()
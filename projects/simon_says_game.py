@@ -5,24 +5,10 @@ import time
 import random
 import tkinter as tk
 from tkinter import messagebox
-from serial.tools.list_ports import comports
-from platform import system
 from smd.red import Master, Red
+from lib.usb_port_finder import USBPortFinder
 
 # ─── Hardware Layer ───────────────────────────────────────────────────────────
-def find_usb_port():
-    ports = list(comports())
-    os_name = system()
-    usb_names = {
-        "Windows": ["USB Serial Port"],
-        "Linux": ["/dev/ttyUSB"],
-        "Darwin": ["/dev/tty.usbserial", "/dev/tty.usbmodem", "/dev/cu.usbserial"]
-    }
-    for port, desc, hwid in sorted(ports):
-        if any(name in port or name in desc for name in usb_names.get(os_name, [])):
-            return port
-    return None
-
 class Device:
     def __init__(self, port, baud=115200, smd_id=0, led_id=5, buzzer_id=5):
         self.master = Master(port, baud)
@@ -161,7 +147,7 @@ class SimonSaysApp(tk.Tk):
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
 if __name__ == '__main__':
-    port = find_usb_port()
+    port = USBPortFinder.first_gateway()
     if not port:
         print("No USB gateway detected.")
         sys.exit(1)
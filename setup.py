@@ -18,6 +18,10 @@ setuptools.setup(
         "pyserial>=3.0",
         "acrome-smd>=1.0"
     ],
+    extras_require={
+        # host-side trajectories, telemetry and vectorized signal processing
+        "numpy": ["numpy>=1.17"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
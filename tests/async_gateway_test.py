@@ -0,0 +1,32 @@
+
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import sys
+import asyncio
+from lib.usb_port_finder import USBPortFinder
+from lib.smd_gateway import DEFAULT_MODULES
+from lib.async_gateway import AsyncSMDGateway
+
+async def run(port):
+    async with await AsyncSMDGateway.open(port, modules_override=DEFAULT_MODULES) as agw:
+        # these reads land in the same tick and share one transaction
+        dist, pressed, lux = await asyncio.gather(
+            agw.read_distance(1), agw.read_button(5), agw.read_light(5))
+        print("Distance:", dist, "Button:", pressed, "Light:", lux)
+
+        # blink and beep concurrently without blocking the loop
+        await asyncio.gather(
+            agw.blink(5, on_rgb=(0, 0, 255), period=0.1, cycles=5),
+            agw.beep(5, freq=1000, duration=0.1, pause=0.1, cycles=5))
+        print(f"Transactions: {agw.transactions}, coalesced reads: {agw.coalesced}")
+
+def main():
+    port = USBPortFinder.first_gateway()
+    if not port:
+        print("No USB gateway.")
+        sys.exit(1)
+    asyncio.run(run(port))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from smd.red import Index
+from lib.usb_port_finder import USBPortFinder
+from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
+from lib.led import Led
+from lib.buzzer import Buzzer
+from lib.motor import Motor
+
+# Updates LED, buzzer and motor together, first one write at a time and
+# then inside gw.batch(), and compares the frames sent.
+# Pass "sim://" as the first argument to run without hardware.
+def update(led, buzz, motor, i):
+    led.on((0, 30 * i, 255 - 30 * i))
+    buzz.on(440 + 110 * i)
+    motor.set_pwm(10 * i)
+    led.on((255, 0, 0) if i % 2 else (0, 0, 255))   # overrides the first colour
+
+def main():
+    port = sys.argv[1] if len(sys.argv) > 1 else USBPortFinder.first_gateway()
+    if not port:
+        print("No USB gateway.")
+        sys.exit(1)
+    gw = SMDGateway(port, modules_override=DEFAULT_MODULES)
+    led, buzz, motor = Led(gw, 5), Buzzer(gw, 5), Motor(gw, cpr=6533)
+
+    frames = gw.frames_written
+    for i in range(1, 5):
+        update(led, buzz, motor, i)
+    print("Unbatched:", gw.frames_written - frames, "frames")
+
+    frames, saved = gw.frames_written, 0
+    for i in range(5, 9):
+        with gw.batch() as batch:
+            update(led, buzz, motor, i)
+        saved += batch.frames_saved
+    print("Batched:  ", gw.frames_written - frames, "frames,", saved, "saved")
+
+    with gw.batch() as batch:
+        led.off()
+        buzz.off()
+        motor.set_pwm(0)
+    print("Stop:", batch.frames, "frame for", batch.writes, "writes")
+
+    # a stop inside a batch goes out at once, even if the block then fails
+    motor.run_pwm(60)
+    try:
+        with gw.batch():
+            motor.stop()
+            led.on((300, 0, 0))
+    except ValueError:
+        pass
+    state = gw.read_many([Index.TorqueEnable, Index.SetDutyCycle])
+    print("After failed batch: torque", state[Index.TorqueEnable], "duty", state[Index.SetDutyCycle])
+
+    # held-back writes go out before a raw SDK call such as goTo
+    sent = []
+    set_variables = gw._master.set_variables
+    def logged(dev_id, pairs, *args, **kwargs):
+        sent.append([Index(int(idx)).name for idx, _ in pairs])
+        return set_variables(dev_id, pairs, *args, **kwargs)
+    gw._master.set_variables = logged
+    with gw.batch():
+        motor.run_position(1000)
+    gw._master.set_variables = set_variables
+    print("Frame order around goTo:", sent)
+    motor.stop()
+    gw.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,18 @@
-### tests/button_test.py
 
 import os, sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import sys
+import time
 from lib.usb_port_finder import USBPortFinder
 from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
 from lib.button import Button
 
+# Press the button a few times within 7 s; the press handler is slow on
+# purpose and must not delay sampling.
+# Pass "sim://" as the first argument to run without hardware.
 def main():
-    port = USBPortFinder.first_gateway()
+    port = sys.argv[1] if len(sys.argv) > 1 else USBPortFinder.first_gateway()
     if not port:
         print("No USB gateway.")
         sys.exit(1)
@@ -20,6 +23,17 @@ def main():
 
     print("Button.is_pressed() →", btn.is_pressed())
 
+    def slow_press(ev):
+        print(f"press    at {ev.timestamp:.3f}, handled {1e3 * (time.monotonic() - ev.timestamp):.0f} ms later")
+        time.sleep(1.0)
+
+    btn.on_press(slow_press)
+    btn.on_release(lambda ev: print(f"release  at {ev.timestamp:.3f}, held {ev.duration:.3f} s"))
+    btn.on_long_press(lambda ev: print(f"long press ({ev.duration:.2f} s)"), hold=0.4)
+    poller = gw.start_polling({btn: 100})
+    time.sleep(7)
+    print(f"Poller: {poller.cycles / 7:.0f} samples/s, callback errors: {btn.callback_errors}")
+
     gw.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import numpy as np
+from lib.usb_port_finder import USBPortFinder
+from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
+from lib.distance import DistanceSensor
+from lib.filters import EMA, Hampel, MovingAverage, RateLimiter, RunningMedian
+
+# Reads the distance sensor raw and filtered for 3 s, then runs every
+# filter over the recorded values with spikes added, in batch mode.
+# Pass "sim://" as the first argument to run without hardware.
+def main():
+    port = sys.argv[1] if len(sys.argv) > 1 else USBPortFinder.first_gateway()
+    if not port:
+        print("No USB gateway.")
+        sys.exit(1)
+    gw = SMDGateway(port, modules_override=DEFAULT_MODULES)
+    smooth = DistanceSensor(gw, module_id=1).filtered(Hampel(7), EMA(0.3))
+
+    raw = []
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < 3.0:
+        cm = smooth.read()
+        raw.append(smooth.raw)
+        time.sleep(0.02)
+    print(f"{len(raw)} samples, last raw {smooth.raw} cm, filtered {cm:.1f} cm")
+    gw.close()
+
+    data = np.array(raw, dtype=float)
+    spiky = data.copy()
+    spikes = np.arange(12, len(data), 25)
+    spiky[spikes] += 200   # ultrasonic echoes
+    for f in (EMA(0.3), MovingAverage(7), RunningMedian(5), Hampel(7), RateLimiter(5.0)):
+        t = time.perf_counter()
+        out = f.process(spiky)
+        dt = time.perf_counter() - t
+        print(f"{type(f).__name__:14s} error at spikes {np.abs(out - data)[spikes].max():6.1f} cm, "
+              f"{dt / len(data) * 1e6:.2f} us/sample")
+
+if __name__ == "__main__":
+    main()
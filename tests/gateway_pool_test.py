@@ -0,0 +1,39 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+from smd.red import Index
+from lib.usb_port_finder import USBPortFinder
+from lib.smd_gateway import DEFAULT_MODULES
+from lib.gateway_pool import GatewayPool
+from lib.led import Led
+
+# Two Red boards chained on one gateway (IDs 0 and 1). Pass "sim://" as
+# the first argument to run without hardware.
+def main():
+    port = sys.argv[1] if len(sys.argv) > 1 else USBPortFinder.first_gateway()
+    if not port:
+        print("No USB gateway.")
+        sys.exit(1)
+    pool = GatewayPool(port, [0, 1], modules_override=DEFAULT_MODULES)
+
+    leds = [Led(gw, module_id=5) for gw in pool]
+    for led in leds:
+        led.on((0, 0, 255))
+    time.sleep(0.5)
+
+    # same register on both boards → one SYNC_WRITE broadcast
+    frames = pool.write({gw.device_id: [(Index.RGB_5, 0x00FF00)] for gw in pool})
+    print("Frames for green on both boards:", frames, "sync frames:", pool.sync_frames)
+    time.sleep(0.5)
+
+    # one I/O worker for the bus, whichever view starts it
+    pool[0].start_worker()
+    print("Shared I/O worker:", pool[0].worker is pool[1].worker)
+
+    pool.write_sync(Index.RGB_5, {0: 0, 1: 0})
+    print("Snapshots:", pool.read_many({gw.device_id: [Index.Button_5] for gw in pool}))
+    pool.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,46 @@
-### tests/imu_test.py
 
 import os, sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import sys
+import time
 from lib.usb_port_finder import USBPortFinder
 from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
 from lib.imu import Imu
 
+# Pass "sim://" as the first argument to run without hardware.
 def main():
-    port = USBPortFinder.first_gateway()
+    port = sys.argv[1] if len(sys.argv) > 1 else USBPortFinder.first_gateway()
     if not port:
         print("No USB gateway.")
         sys.exit(1)
     gw = SMDGateway(port, modules_override=DEFAULT_MODULES)
 
     imu = Imu(gw, module_id=5)
-    print("Accel (g):", imu.read_accel())
-    print("Gyro (°/s):", imu.read_gyro())
+    sample = imu.read()   # one transaction
+    print("Sample:", sample)
 
+    if sample.accel is None or sample.gyro is None:
+        print("This SDK has no raw accel/gyro registers; device angles:", imu.read_angles())
+        gw.close()
+        return
+
+    from lib.orientation import ComplementaryFilter, MadgwickFilter, GyroBias
+    print("Keep the IMU still for 1 s ...")
+    rest = []
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < 1.0:
+        rest.append(imu.read().gyro)
+    bias = GyroBias(rate=0.001)
+    print("Gyro bias (°/s):", bias.calibrate(rest))
+
+    comp, madg = ComplementaryFilter(bias=bias), MadgwickFilter(bias=GyroBias(value=bias.value))
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < 5.0:
+        s = imu.read()
+        c, m = comp.update(s), madg.update(s)
+        print(f"complementary {c.roll:7.2f} {c.pitch:7.2f}   madgwick {m.roll:7.2f} {m.pitch:7.2f}", end="\r")
+    print()
     gw.close()
 
 if __name__ == "__main__":
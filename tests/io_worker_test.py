@@ -0,0 +1,42 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+from lib.usb_port_finder import USBPortFinder
+from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
+from lib.led import Led
+from lib.motor import Motor
+
+# Floods the bus with LED frames from two threads while the main thread
+# drives the motor, then prints per-priority latency. Pass "sim://" as
+# the first argument to run without hardware.
+def main():
+    port = sys.argv[1] if len(sys.argv) > 1 else USBPortFinder.first_gateway()
+    if not port:
+        print("No USB gateway.")
+        sys.exit(1)
+    gw = SMDGateway(port, modules_override=DEFAULT_MODULES)
+    gw.start_worker(maxsize=16)
+    led = Led(gw, module_id=5)
+    motor = Motor(gw, cpr=6533)
+
+    def flood():
+        for i in range(100):
+            led.on((i % 256, 0, 255 - i % 256))
+
+    threads = [threading.Thread(target=flood) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for duty in range(0, 50, 5):
+        motor.run_pwm(duty)
+    motor.stop()
+    for t in threads:
+        t.join()
+    led.off()
+
+    for level, stats in gw.io_stats().items():
+        print(f"{level:7} n={stats['count']:4}  p50={stats['p50_ms']:6.2f} ms  p99={stats['p99_ms']:6.2f} ms")
+    gw.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,35 @@
-### tests/joystick_test.py
 
 import os, sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import sys
+import threading
 from lib.usb_port_finder import USBPortFinder
 from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
 from lib.joystick import Joystick
 
+# Prints the joystick events of the next 5 s.
+# Pass "sim://" as the first argument to run without hardware.
 def main():
-    port = USBPortFinder.first_gateway()
+    port = sys.argv[1] if len(sys.argv) > 1 else USBPortFinder.first_gateway()
     if not port:
         print("No USB gateway.")
         sys.exit(1)
     gw = SMDGateway(port, modules_override=DEFAULT_MODULES)
 
-    joy = Joystick(gw, module_id=5)
+    joy = Joystick(gw, module_id=5, deadzone=0.08, move_threshold=0.1)
     print("Axes (X,Y):", joy.read_axes())
     print("Pressed?:", joy.is_pressed())
+    print("State:", joy.read_state())
+
+    stop = threading.Event()
+    threading.Timer(5.0, stop.set).start()
+    counts = {}
+    for ev in joy.events(rate_hz=100, stop_event=stop):
+        counts[ev.kind] = counts.get(ev.kind, 0) + 1
+        if ev.kind != 'moved':
+            print(f"{ev.kind:8s} at x={ev.state.x:+.2f} y={ev.state.y:+.2f}")
+    print("Events:", counts)
 
     gw.close()
 
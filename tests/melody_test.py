@@ -0,0 +1,47 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+import time
+from lib.usb_port_finder import USBPortFinder
+from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
+from lib.led import Led
+from lib.buzzer import Buzzer
+from lib.melody import MelodyPlayer, load, parse_rtttl
+
+SCALE = "scale:d=8,o=5,b=240:c,d,e,f,g,a,b,c6,4p,c6,b,a,g,f,e,d,4c"
+RESTS = "rests:d=4,o=5,b=120:p,p"
+
+# Loads an RTTTL file twice (the second load hits the cache), compiles it
+# at two tempos, then plays it with the LED following each note.
+# Pass "sim://" as the first argument to run without hardware.
+def main():
+    port = sys.argv[1] if len(sys.argv) > 1 else USBPortFinder.first_gateway()
+    if not port:
+        print("No USB gateway.")
+        sys.exit(1)
+
+    with tempfile.NamedTemporaryFile('w', suffix='.rtttl', delete=False) as fh:
+        fh.write(SCALE)
+    song = load(fh.name)
+    print(f"{len(song)} notes, cached on reload: {load(fh.name) is song}")
+    os.remove(fh.name)
+    print(f"Duration at {song.tempo:.0f} bpm: {song.duration():.2f} s, at 120 bpm: {song.duration(120):.2f} s")
+    print("Legato, one octave up:", song.events(transpose=12, legato=True)['freq'][:8].tolist())
+
+    gw = SMDGateway(port, modules_override=DEFAULT_MODULES)
+    player = MelodyPlayer(Buzzer(gw, 5), Led(gw, 5))
+    events = song.events()
+    frames = gw.scheduler.frames
+    t0 = time.monotonic()
+    handle = player.play(song)
+    print(f"play() returned after {(time.monotonic() - t0) * 1e3:.2f} ms")
+    handle.wait()
+    print(f"Played in {time.monotonic() - t0:.3f} s (expected {events['t'][-1]:.3f} s), "
+          f"{gw.scheduler.frames - frames} frames for {len(events)} events")
+    player.play(parse_rtttl(RESTS)).wait()   # no notes: only silences the buzzer
+    print("All-rest tune events:", len(parse_rtttl(RESTS).events()))
+    gw.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+from lib.usb_port_finder import USBPortFinder
+from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
+from lib.led import Led
+from lib.buzzer import Buzzer
+from lib.morse import MorsePlayer, compile_morse
+
+# Compiles a message, plays it at 20 WPM and reports how late each
+# LED/tone change was against its absolute deadline.
+# Pass "sim://" as the first argument to run without hardware.
+def main():
+    port = sys.argv[1] if len(sys.argv) > 1 else USBPortFinder.first_gateway()
+    if not port:
+        print("No USB gateway.")
+        sys.exit(1)
+    gw = SMDGateway(port, modules_override=DEFAULT_MODULES)
+    player = MorsePlayer(Led(gw, 5), Buzzer(gw, 5), wpm=20)
+
+    t0 = time.perf_counter()
+    timeline = compile_morse("PARIS PARIS", wpm=20)
+    first = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    cached = compile_morse("paris  paris", wpm=20)
+    print(f"{len(timeline)} rows, {timeline['t'][-1]:.2f} s; compile {first * 1e6:.0f} us, "
+          f"cached {(time.perf_counter() - t0) * 1e6:.1f} us (same array: {cached is timeline})")
+
+    reports = []
+    t0 = time.monotonic()
+    player.play("PARIS PARIS", on_progress=reports.append)
+    elapsed = time.monotonic() - t0
+    print(f"Played in {elapsed:.3f} s (expected {player.duration('PARIS PARIS'):.3f} s)")
+    print("Lateness:", {k: round(v, 3) for k, v in player.stats().items()})
+    print(f"{len(reports)} progress callbacks, last {reports[-1]}")
+
+    gw.close()
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import os, sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import sys
+import math
 import time
 
 from lib.usb_port_finder import USBPortFinder
@@ -39,7 +40,15 @@ def main():
         motor.run_pwm(0, duration_s=wait_dur)
 
         time.sleep(wait_dur)
-        
+
+    # Stream a 2 s velocity sine at 100 Hz on absolute deadlines
+    profile = (60 * math.sin(2 * math.pi * k / 100) for k in range(200))
+    report = motor.stream_velocity(profile, rate_hz=100)
+    print(f"Streamed {report.sent} setpoints at {report.achieved_hz:.1f} Hz "
+          f"({report.overruns} overruns, {report.dropped} dropped, "
+          f"worst lateness {report.max_late * 1e3:.1f} ms)")
+    motor.stop()
+
     # Clean up
     gateway.close()
 
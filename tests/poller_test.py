@@ -0,0 +1,39 @@
+
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import sys
+import time
+from lib.usb_port_finder import USBPortFinder
+from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
+from lib.distance import DistanceSensor
+from lib.button import Button
+from lib.light import LightSensor
+
+def main():
+    port = USBPortFinder.first_gateway()
+    if not port:
+        print("No USB gateway.")
+        sys.exit(1)
+    gw = SMDGateway(port, modules_override=DEFAULT_MODULES)
+
+    dist  = DistanceSensor(gw, module_id=1)
+    btn   = Button(gw, 5)
+    light = LightSensor(gw, module_id=5)
+
+    poller = gw.start_polling({dist: 20, btn: 50, light: 5})
+    time.sleep(1.0)
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        dist.read_cm()
+    print(f"1000 cached reads in {(time.perf_counter() - t0) * 1e3:.2f} ms")
+
+    for name, s in (("distance", dist.sample()), ("button", btn.sample()), ("light", light.sample())):
+        print(f"{name}: {s.value} (age {s.age * 1e3:.1f} ms)")
+    print(f"Poll cycles: {poller.cycles}, errors: {poller.errors}")
+
+    gw.close()
+
+if __name__ == "__main__":
+    main()
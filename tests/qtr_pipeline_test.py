@@ -0,0 +1,45 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import numpy as np
+from lib.usb_port_finder import USBPortFinder
+from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
+from lib.qtr import QTRArray
+
+# Calibrates for 3 s (move the array across the line), then tracks the
+# line for 2 s and re-runs the recorded raw values through the batch path.
+# Pass "sim://" as the first argument to run without hardware.
+def main():
+    port = sys.argv[1] if len(sys.argv) > 1 else USBPortFinder.first_gateway()
+    if not port:
+        print("No USB gateway.")
+        sys.exit(1)
+    gw = SMDGateway(port, modules_override=DEFAULT_MODULES)
+    line = QTRArray(gw, module_id=1).line()
+
+    cal = line.calibrate(duration=3.0)
+    print("Calibration min:", cal.minimum, "max:", cal.maximum)
+
+    raws, positions, lost = [], [], 0
+    frames = gw._master.frames if hasattr(gw._master, 'frames') else None
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < 2.0:
+        r = line.read()
+        raws.append(r.raw)
+        positions.append(r.position)
+        lost += r.lost
+        time.sleep(0.01)
+    print(f"{len(raws)} ticks, line lost on {lost}")
+    if frames is not None:
+        print(f"{(gw._master.frames - frames) / len(raws):.2f} frames per tick")
+
+    t0 = time.perf_counter()
+    batch = line.process(np.array(raws))
+    dt = time.perf_counter() - t0
+    print(f"Batch: {len(raws)} ticks in {dt * 1e3:.2f} ms;",
+          "matches live:", bool(np.allclose(batch.position, positions)))
+    gw.close()
+
+if __name__ == "__main__":
+    main()
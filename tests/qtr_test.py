@@ -17,7 +17,7 @@ def main():
 
     qtr = QTRArray(gw, module_id=1)
     print("QTR values:", qtr.read_all())
-    print("QTR position:", qtr.read_position())
+    print("QTR line:", qtr.line().read())
 
     gw.close()
 
@@ -0,0 +1,50 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+from lib.usb_port_finder import USBPortFinder
+from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
+from lib.rules import RuleEngine, value, set_rgb, set_tone
+from lib.distance import DistanceSensor
+from lib.light import LightSensor
+from lib.pot import Potentiometer
+from lib.button import Button
+from lib.led import Led
+from lib.buzzer import Buzzer
+
+# 30 threshold rules over four sensors, 200 ticks at about 20 Hz, then
+# reports bus frames per tick.
+# Pass "sim://" as the first argument to run without hardware.
+def main():
+    port = sys.argv[1] if len(sys.argv) > 1 else USBPortFinder.first_gateway()
+    if not port:
+        print("No USB gateway.")
+        sys.exit(1)
+    gw = SMDGateway(port, modules_override=DEFAULT_MODULES)
+    d, lux = value(DistanceSensor(gw, 1).read_cm), value(LightSensor(gw, 5).read_lux)
+    pot, btn = value(Potentiometer(gw, 5).read), value(Button(gw, 5).is_pressed)
+    led, buzz = Led(gw, 5), Buzzer(gw, 5)
+
+    rules = RuleEngine(gw)
+    for k in range(10):
+        rules.when((d < 15 + 7 * k).hysteresis(3)).then(set_rgb(led, (25 * k, 0, 0)))
+        rules.when((lux > 150 + 30 * k).hysteresis(10)).then(set_rgb(led, (0, 25 * k, 0)))
+        rules.when(btn & (pot > 25 * k)).then(set_tone(buzz, 400 + 100 * k)).otherwise(set_tone(buzz, 0))
+
+    frames = gw._master.frames if hasattr(gw._master, 'frames') else None
+    t0 = time.perf_counter()
+    for _ in range(200):
+        rules.tick()
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - t0
+    stats = rules.stats()
+    print("Rules:", stats)
+    print(f"{stats['ticks']} ticks in {elapsed:.1f} s")
+    print(f"Read frames per tick: 1 ({len(rules.indexes())} indexes), "
+          f"write frames per tick: {stats['frames_written'] / stats['ticks']:.2f}")
+    if frames is not None:
+        print(f"Bus frames per tick: {(gw._master.frames - frames) / stats['ticks']:.2f}")
+    gw.close()
+
+if __name__ == "__main__":
+    main()
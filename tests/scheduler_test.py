@@ -0,0 +1,34 @@
+
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import sys
+import time
+from lib.usb_port_finder import USBPortFinder
+from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
+from lib.led import Led
+from lib.buzzer import Buzzer
+
+def main():
+    port = USBPortFinder.first_gateway()
+    if not port:
+        print("No USB gateway.")
+        sys.exit(1)
+    gw = SMDGateway(port, modules_override=DEFAULT_MODULES)
+
+    led  = Led(gw, module_id=5)
+    buzz = Buzzer(gw, module_id=5)
+
+    # blink forever and beep three times, both without blocking
+    blink = led.blink_async(on_rgb=(0, 255, 0), period=0.25)
+    beep  = buzz.beep_async(freq=800, duration=0.1, pause=0.4, cycles=3)
+    beep.wait()
+    time.sleep(0.5)
+    blink.cancel()
+    blink.wait(1.0)
+    print("Blink cancelled:", blink.cancelled, "frames sent:", gw.scheduler.frames)
+
+    gw.close()
+
+if __name__ == "__main__":
+    main()
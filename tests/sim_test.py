@@ -0,0 +1,34 @@
+
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
+from lib.distance import DistanceSensor
+from lib.button import Button
+from lib.light import LightSensor
+from lib.led import Led
+
+def main():
+    # no hardware needed: "sim://" selects the in-process SimulatedMaster
+    gw = SMDGateway("sim://?scan_time=0", modules_override=DEFAULT_MODULES)
+    sim = gw._master
+    sim.reset_stats()
+
+    dist  = DistanceSensor(gw, module_id=1)
+    btn   = Button(gw, 5)
+    light = LightSensor(gw, module_id=5)
+    led   = Led(gw, module_id=5)
+
+    print("Distance (cm):", dist.read_cm())
+    print("Button:", btn.is_pressed())
+    print("Light (lux):", light.read_lux())
+    print("Snapshot:", gw.snapshot(dist, btn, light))
+    led.on((255, 0, 0))
+
+    print(f"Frames: {sim.frames}, bytes tx/rx: {sim.bytes_tx}/{sim.bytes_rx}, "
+          f"bus time: {sim.bus_time * 1e3:.2f} ms")
+
+    gw.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import sys
+from lib.usb_port_finder import USBPortFinder
+from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
+from lib.button import Button
+from lib.pot import Potentiometer
+from lib.joystick import Joystick
+from lib.imu import Imu
+from lib.qtr import QTRArray
+
+def main():
+    port = USBPortFinder.first_gateway()
+    if not port:
+        print("No USB gateway.")
+        sys.exit(1)
+    gw = SMDGateway(port, modules_override=DEFAULT_MODULES)
+
+    btn = Button(gw, 5)
+    pot = Potentiometer(gw, module_id=5)
+    joy = Joystick(gw, module_id=5)
+    imu = Imu(gw, module_id=5)
+    qtr = QTRArray(gw, module_id=1)
+
+    # one get_variables round trip for every sensor below
+    snap = gw.snapshot(btn, pot, joy, imu, qtr)
+    print(snap)
+    print("Button.is_pressed() →", btn.is_pressed(snap))
+    print("Pot value:", pot.read(snap))
+    print("Joystick axes:", joy.read_axes(snap))
+    # accel/gyro are None when the SDK has no register for them
+    print("IMU:", imu.read(snap))
+    print("QTR values:", qtr.read_all(snap))
+
+    gw.close()
+
+if __name__ == "__main__":
+    main()
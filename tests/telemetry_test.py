@@ -0,0 +1,43 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+import time
+from lib.usb_port_finder import USBPortFinder
+from lib.smd_gateway import SMDGateway, DEFAULT_MODULES
+from lib.telemetry import TelemetryRecorder
+from lib.distance import DistanceSensor
+from lib.light import LightSensor
+from lib.pot import Potentiometer
+from lib.joystick import Joystick
+from lib.qtr import QTRArray
+
+# Records all analog sensors for 5 s, then reads the file back.
+# Pass "sim://" as the first argument to run without hardware.
+def main():
+    port = sys.argv[1] if len(sys.argv) > 1 else USBPortFinder.first_gateway()
+    if not port:
+        print("No USB gateway.")
+        sys.exit(1)
+    gw = SMDGateway(port, modules_override=DEFAULT_MODULES)
+    sensors = [DistanceSensor(gw, 1), LightSensor(gw, 5), Potentiometer(gw, 5),
+               Joystick(gw, 5), QTRArray(gw, 1)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "telemetry_test.tlm")
+        rec = TelemetryRecorder(sensors, path=path).attach(gw)
+        gw.start_polling({s: 1000 for s in sensors})   # as fast as the bus allows
+        time.sleep(5)
+        gw.stop_polling()
+        rec.close()
+        print("Recorder:", rec.stats())
+
+        data = TelemetryRecorder.load(path)
+        rate = (len(data) - 1) / (data['t'][-1] - data['t'][0])
+        print(f"{len(data)} rows at {rate:.0f} rows/s")
+        print("Distance min/max:", data['Distance_1'].min(), data['Distance_1'].max())
+        del data   # release the memory map before the directory goes
+    gw.close()
+
+if __name__ == "__main__":
+    main()
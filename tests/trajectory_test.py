@@ -0,0 +1,45 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from lib.usb_port_finder import USBPortFinder
+from lib.gateway_pool import GatewayPool
+from lib.motor import Motor
+import numpy as np
+from lib.trajectory import scurve, synchronized, follow
+
+# Two SMD Red boards (IDs 0 and 1), one motor each, arriving together.
+# Pass "sim://" as the first argument to run without hardware.
+def check_jerk(j_max=120000):
+    # short (triangular) and long moves alike; the tolerance only absorbs
+    # rounding in the finite differences of large positions
+    for distance in (10, 100, 1000, 6533, 100000):
+        for rate_hz in (100, 1000):
+            profile = scurve(0, distance, 3000, 12000, j_max, rate_hz)
+            jerk = np.abs(np.diff(profile.acceleration)).max() * rate_hz
+            assert jerk <= j_max * (1 + 1e-5), f"{distance} @ {rate_hz} Hz: jerk {jerk:.0f}"
+    print("S-curve jerk within j_max")
+
+def main():
+    check_jerk()
+    port = sys.argv[1] if len(sys.argv) > 1 else USBPortFinder.first_gateway()
+    if not port:
+        print("No USB gateway.")
+        sys.exit(1)
+    pool = GatewayPool(port, [0, 1], modules_override=[])
+    motors = [Motor(gw, cpr=6533) for gw in pool]
+
+    profiles = synchronized(starts=[0, 0], ends=[6533, 2000],
+                            v_max=6000, a_max=12000, j_max=120000, rate_hz=100)
+    print(f"Move takes {profiles[0].duration:.2f} s, {len(profiles[0])} setpoints per axis")
+    report = follow(motors, profiles)
+    print(f"Streamed at {report.achieved_hz:.1f} Hz, {report.overruns} overruns, "
+          f"worst lateness {report.max_late * 1e3:.1f} ms")
+
+    # back to zero with a single-axis trapezoid
+    motors[0].run_position(0, v_max=6000, a_max=12000)
+    for motor in motors:
+        motor.stop()
+    pool.close()
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,9 @@ def main():
         print("Found USB gateway on", port)
     else:
         print("No gateway detected")
+    for p in USBPortFinder.gateways():
+        vid = f"{p.vid:04x}:{p.pid:04x}" if p.vid is not None else "-"
+        print(f"  {p.device}  {vid}  serial={p.serial_number}  {p.description}")
 
 if __name__ == "__main__":
     main()